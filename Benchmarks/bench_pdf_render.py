@@ -0,0 +1,115 @@
+"""Benchmark the shared PDF renderer against the original app2.py implementation.
+
+Usage:
+    python Benchmarks/bench_pdf_render.py --pages 50 --runs 3
+
+A synthetic report of long bullet points is rendered by ``LegacyStyledPDF``
+(a copy of the per-call class app2.py used to define, which re-measures
+the growing line for every word and writes to a temp file) and by
+``report_pdf.generate_pdf_from_text`` (cached font metrics, linear
+wrapping, in-memory output).
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from fpdf import FPDF
+
+from report_pdf import generate_pdf_from_text
+
+WORDS = (
+    "titanium alloy ASTM F136 tensile strength 860-1000 MPa fatigue resistance "
+    "ISO 5832-3 porous coating wear rate polyethylene liner sterilization ethylene "
+    "oxide shelf life five years biocompatibility ISO 10993 surface roughness Ra"
+).split()
+
+
+def synthetic_report(pages):
+    # Roughly 12 bullets of ~60 words each fill one page at 10pt.
+    sections = []
+    for s in range(max(1, pages // 2)):
+        lines = [f"{s + 1}. **Section {s + 1}**"]
+        for b in range(24):
+            words = [WORDS[(s * 31 + b * 7 + i) % len(WORDS)] for i in range(60)]
+            lines.append("- " + " ".join(words))
+        sections.append("\n".join(lines))
+    return "\n\n".join(sections)
+
+
+class LegacyStyledPDF(FPDF):
+    def bullet_text(self, text, level=0):
+        indent = 5 * (level + 1)
+        self.set_x(indent)
+        text_width = self.get_string_width(text) + 2
+        available_width = self.w - self.r_margin - self.x
+        if text_width <= available_width:
+            self.cell(0, 6, text, ln=True)
+        else:
+            words = text.split()
+            line = ""
+            for word in words:
+                test_line = line + " " + word if line else word
+                if self.get_string_width(test_line) < available_width:
+                    line = test_line
+                else:
+                    self.cell(0, 6, line, ln=True)
+                    self.set_x(indent)
+                    line = word
+            if line:
+                self.cell(0, 6, line, ln=True)
+
+
+def legacy_render(text):
+    pdf = LegacyStyledPDF()
+    pdf.set_auto_page_break(auto=True, margin=15)
+    pdf.add_page()
+    pdf.set_font("Helvetica", "", 10)
+    for line in text.split("\n"):
+        line = line.strip()
+        if line.startswith("- "):
+            pdf.bullet_text("* " + line[2:], 0)
+        elif line:
+            pdf.cell(0, 10, line.strip("*0123456789. "), ln=True)
+    temp_pdf = tempfile.NamedTemporaryFile(delete=False, suffix=".pdf")
+    pdf.output(temp_pdf.name)
+    with open(temp_pdf.name, "rb") as f:
+        data = f.read()
+    os.unlink(temp_pdf.name)
+    return data, pdf.page_no()
+
+
+def time_runs(fn, runs):
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--pages", type=int, default=50)
+    arg_parser.add_argument("--runs", type=int, default=3)
+    args = arg_parser.parse_args()
+
+    text = synthetic_report(args.pages)
+    _, legacy_pages = legacy_render(text)
+    new_bytes = generate_pdf_from_text(text, "Benchmark Device")
+
+    legacy_s = time_runs(lambda: legacy_render(text), args.runs)
+    new_s = time_runs(lambda: generate_pdf_from_text(text, "Benchmark Device"), args.runs)
+
+    print(f"input: {len(text):,} chars, legacy output {legacy_pages} pages, new output {len(new_bytes):,} bytes")
+    print(f"legacy (quadratic wrap, temp file): {legacy_s * 1000:8.1f} ms")
+    print(f"report_pdf (cached metrics, bytes): {new_s * 1000:8.1f} ms")
+    print(f"speedup: {legacy_s / new_s:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
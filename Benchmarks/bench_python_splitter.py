@@ -0,0 +1,141 @@
+"""Definition-boundary Python splitting against the recursive Language.PYTHON splitter on a whole repo.
+
+Usage:
+    python Benchmarks/bench_python_splitter.py                       # the Python standard library
+    python Benchmarks/bench_python_splitter.py --root ~/src/django --chunk-size 1500 --chunk-overlap 150
+
+All ``*.py`` files under ``--root`` are read into memory first, then each
+variant splits every file and is timed:
+
+- ``recursive``: ``RecursiveCharacterTextSplitter.from_language(Language.PYTHON)``;
+- ``ast``: ``PythonASTSplitter`` (one ``ast.parse`` per file);
+- ``ast.parse only``: just the parse, the floor for the ``ast`` variant.
+
+``intact`` is the share of functions and classes that fit in ``chunk_size``
+and end up whole inside a single chunk. ``fallback`` counts the files the
+AST splitter could not parse and split by indentation instead.
+"""
+import argparse
+import ast
+import bisect
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Splitters"))
+
+from langchain_text_splitters import Language, RecursiveCharacterTextSplitter
+
+from python_ast_splitter import PythonASTSplitter
+
+DEFS = (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)
+
+
+def load_sources(root):
+    sources = []
+    for directory, subdirectories, names in os.walk(root):
+        subdirectories[:] = sorted(name for name in subdirectories if not name.startswith("."))
+        for name in sorted(names):
+            if not name.endswith(".py"):
+                continue
+            path = os.path.join(directory, name)
+            try:
+                with open(path, encoding="utf-8") as f:
+                    sources.append((path, f.read()))
+            except (UnicodeDecodeError, OSError):
+                continue
+    return sources
+
+
+def definition_spans(text, chunk_size):
+    """Character spans of the functions and classes in ``text`` that fit in ``chunk_size``."""
+    try:
+        tree = ast.parse(text)
+    except (SyntaxError, ValueError):
+        return []
+    lines = text.split("\n")
+    line_starts = [0]
+    for line in lines[:-1]:
+        line_starts.append(line_starts[-1] + len(line) + 1)
+    spans = []
+    for node in ast.walk(tree):
+        if not isinstance(node, DEFS):
+            continue
+        first = min([node.lineno] + [decorator.lineno for decorator in node.decorator_list])
+        start = line_starts[first - 1] + len(lines[first - 1]) - len(lines[first - 1].lstrip())
+        end = line_starts[node.end_lineno - 1] + len(lines[node.end_lineno - 1].rstrip())
+        if end - start <= chunk_size:
+            spans.append((start, end))
+    return spans
+
+
+def count_intact(spans, chunk_ranges):
+    """How many spans lie inside one of ``chunk_ranges`` (sorted by start)."""
+    starts = [start for start, _ in chunk_ranges]
+    reach, furthest = [], -1
+    for _, end in chunk_ranges:
+        furthest = max(furthest, end)
+        reach.append(furthest)
+    intact = 0
+    for start, end in spans:
+        i = bisect.bisect_right(starts, start) - 1
+        intact += i >= 0 and reach[i] >= end
+    return intact
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--root", default=os.path.dirname(ast.__file__), help="Repository to split")
+    arg_parser.add_argument("--chunk-size", type=int, default=1000)
+    arg_parser.add_argument("--chunk-overlap", type=int, default=100)
+    args = arg_parser.parse_args()
+
+    sources = load_sources(args.root)
+    size_mb = sum(len(text.encode("utf-8")) for _, text in sources) / 1024 / 1024
+    print(f"repo: {args.root} ({len(sources)} files, {size_mb:.1f} MiB), chunk_size={args.chunk_size}, "
+          f"overlap={args.chunk_overlap}")
+
+    settings = dict(chunk_size=args.chunk_size, chunk_overlap=args.chunk_overlap, add_start_index=True)
+    recursive = RecursiveCharacterTextSplitter.from_language(Language.PYTHON, **settings)
+    ast_splitter = PythonASTSplitter(**settings)
+
+    def run_recursive(text):
+        return [(doc.metadata["start_index"], doc.page_content) for doc in recursive.create_documents([text])]
+
+    def run_ast(text):
+        return [(metadata["start_index"], chunk) for chunk, metadata in ast_splitter.iter_chunks(text)]
+
+    spans = [definition_spans(text, args.chunk_size) for _, text in sources]
+    total_spans = sum(len(file_spans) for file_spans in spans)
+
+    rows = []
+    for name, split in (("recursive", run_recursive), ("ast", run_ast)):
+        start = time.perf_counter()
+        results = [split(text) for _, text in sources]
+        elapsed = time.perf_counter() - start
+        chunks = sum(len(chunks) for chunks in results)
+        intact = sum(
+            count_intact(file_spans, sorted((index, index + len(chunk)) for index, chunk in chunks))
+            for file_spans, chunks in zip(spans, results)
+        )
+        rows.append((name, chunks, elapsed, intact / total_spans if total_spans else float("nan")))
+
+    start = time.perf_counter()
+    fallback = 0
+    for _, text in sources:
+        try:
+            ast.parse(text)
+        except (SyntaxError, ValueError):
+            fallback += 1
+    rows.append(("ast.parse only", None, time.perf_counter() - start, None))
+
+    print(f"\n{'variant':<16} {'chunks':>8} {'s':>8} {'MB/s':>7} {'intact':>7}")
+    for name, chunks, elapsed, intact in rows:
+        print(f"{name:<16} {chunks if chunks is not None else '-':>8} {elapsed:>8.2f} "
+              f"{size_mb / elapsed if elapsed else float('nan'):>7.2f} "
+              f"{f'{intact:.1%}' if intact is not None else '-':>7}")
+    print(f"\n{total_spans} definitions fit in chunk_size; fallback (unparseable) files: {fallback}")
+
+
+if __name__ == "__main__":
+    main()
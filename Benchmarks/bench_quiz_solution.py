@@ -0,0 +1,110 @@
+"""Compare separate and combined quiz solving in the Study Material Generator.
+
+Usage:
+    python Benchmarks/bench_quiz_solution.py --topics "Newton's Laws" "Photosynthesis" --runs 3
+
+For each topic the explanation is generated once; then both quiz paths are
+timed on that same content against the live Groq model:
+
+- separate: quiz with ``Quizzes``, then the ``prompt4`` solving call
+- combined: one call with ``SolvedQuizzes`` (explanation per question)
+
+Token counts are summed from the usage metadata of every model call.
+``--fake`` runs both paths against the local fake backend (``fake_backend.py``).
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Projects", "Quiz_Generator"))
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+from fake_backend import add_fake_argument, install_from_args
+from model import StudyMaterialGenerator
+
+
+class UsageCollector(BaseCallbackHandler):
+    """Count model calls and sum their token usage."""
+
+    def __init__(self):
+        self.calls = 0
+        self.usage = {}
+
+    def on_llm_end(self, response, **kwargs):
+        self.calls += 1
+        for generations in response.generations:
+            for generation in generations:
+                metadata = getattr(getattr(generation, "message", None), "usage_metadata", None) or {}
+                for key in ("input_tokens", "output_tokens", "total_tokens"):
+                    self.usage[key] = self.usage.get(key, 0) + metadata.get(key, 0)
+
+
+def run_quiz_path(generator, content):
+    collector = UsageCollector()
+    config = {"callbacks": [collector]}
+    quiz = generator.quiz_chain.invoke({"content": content}, config=config)
+    generator.solve_quiz([q.model_dump() for q in quiz.quiz], config=config)
+    return collector
+
+
+def measure(name, generator, contents, runs):
+    timings, tokens, calls, failures = [], [], [], 0
+    for _ in range(runs):
+        for topic, content in contents.items():
+            start = time.perf_counter()
+            try:
+                collector = run_quiz_path(generator, content)
+            except Exception as e:
+                failures += 1
+                print(f"  {name} failed for {topic!r}: {e}")
+                continue
+            timings.append(time.perf_counter() - start)
+            tokens.append(collector.usage.get("total_tokens", 0))
+            calls.append(collector.calls)
+    return {
+        "name": name,
+        "ok": len(timings),
+        "failures": failures,
+        "p50_s": statistics.median(timings) if timings else float("nan"),
+        "max_s": max(timings) if timings else float("nan"),
+        "mean_tokens": statistics.mean(tokens) if tokens else float("nan"),
+        "mean_calls": statistics.mean(calls) if calls else float("nan"),
+    }
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--topics", nargs="+", default=["Newton's Laws", "Photosynthesis", "Binary Search"])
+    arg_parser.add_argument("--runs", type=int, default=1)
+    add_fake_argument(arg_parser)
+    args = arg_parser.parse_args()
+    install_from_args(args)
+
+    separate = StudyMaterialGenerator()
+    combined = StudyMaterialGenerator(combined_solution=True)
+    contents = {topic: separate.content_chain.invoke({"topic": topic}) for topic in args.topics}
+
+    rows = [
+        measure("separate", separate, contents, args.runs),
+        measure("combined", combined, contents, args.runs),
+    ]
+
+    print(f"\n{'path':<10} {'ok':>4} {'fail':>5} {'p50 s':>8} {'max s':>8} {'tokens':>9} {'calls':>6}")
+    for row in rows:
+        print(
+            f"{row['name']:<10} {row['ok']:>4} {row['failures']:>5} {row['p50_s']:>8.2f} "
+            f"{row['max_s']:>8.2f} {row['mean_tokens']:>9.0f} {row['mean_calls']:>6.1f}"
+        )
+    base, new = rows
+    if base["ok"] and new["ok"]:
+        print(
+            f"\ncombined saves {base['p50_s'] - new['p50_s']:.2f}s p50 and "
+            f"{base['mean_tokens'] - new['mean_tokens']:.0f} tokens per topic"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""Compare single-shot and per-section parallel generation of MedicalDeviceReport.
+
+Usage:
+    python Benchmarks/bench_report_sections.py --devices "Hip Implant" "Bone Screw" --runs 3
+
+Both paths call the live Groq model with the response cache disabled, so
+every run pays for real completions. With ``--fake`` they run against the
+local fake backend instead (see ``fake_backend.py``), which isolates the
+orchestration cost of each path from model time.
+"""
+import argparse
+import json
+import os
+import re
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from fake_backend import add_fake_argument, fake_payload, install_from_args
+from report_model import MedicalDeviceReport, build_messages, create_llm, parser
+from report_sections import add_usage, generate_report_parallel
+
+
+def run_single_shot(llm, device_name):
+    response = llm.invoke(build_messages(device_name))
+    content = re.sub(r"<think>.*?</think>", "", response.content, flags=re.DOTALL).strip()
+    parser.parse(content)
+    return {"usage": add_usage({}, response), "calls": 1}
+
+
+def run_parallel(llm, device_name):
+    _, stats = generate_report_parallel(llm, device_name)
+    return stats
+
+
+def measure(name, fn, llm, devices, runs):
+    timings, tokens, calls, failures = [], [], [], 0
+    for _ in range(runs):
+        for device_name in devices:
+            start = time.perf_counter()
+            try:
+                stats = fn(llm, device_name)
+            except Exception as e:
+                failures += 1
+                print(f"  {name} failed for {device_name!r}: {e}")
+                continue
+            timings.append(time.perf_counter() - start)
+            tokens.append(stats["usage"].get("total_tokens", 0))
+            calls.append(stats["calls"])
+    return {
+        "name": name,
+        "ok": len(timings),
+        "failures": failures,
+        "p50_s": statistics.median(timings) if timings else float("nan"),
+        "max_s": max(timings) if timings else float("nan"),
+        "mean_tokens": statistics.mean(tokens) if tokens else float("nan"),
+        "mean_calls": statistics.mean(calls) if calls else float("nan"),
+    }
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--devices", nargs="+", default=["Hip Implant", "Bone Screw", "Coronary Stent"])
+    arg_parser.add_argument("--runs", type=int, default=1)
+    add_fake_argument(arg_parser)
+    args = arg_parser.parse_args()
+
+    # The single-shot path parses free text, so the fake answers with a valid report.
+    backend_stats = install_from_args(args, responder=lambda messages: json.dumps(fake_payload(MedicalDeviceReport)))
+    llm = create_llm(cache=False)
+    rows = [
+        measure("single-shot", run_single_shot, llm, args.devices, args.runs),
+        measure("parallel", run_parallel, llm, args.devices, args.runs),
+    ]
+
+    print(f"\n{'path':<12} {'ok':>4} {'fail':>5} {'p50 s':>8} {'max s':>8} {'tokens':>9} {'calls':>6}")
+    for row in rows:
+        print(
+            f"{row['name']:<12} {row['ok']:>4} {row['failures']:>5} {row['p50_s']:>8.2f} "
+            f"{row['max_s']:>8.2f} {row['mean_tokens']:>9.0f} {row['mean_calls']:>6.1f}"
+        )
+    if backend_stats:
+        print(f"\nfake backend: {backend_stats.snapshot()}")
+
+
+if __name__ == "__main__":
+    main()
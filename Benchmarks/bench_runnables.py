@@ -0,0 +1,285 @@
+"""Benchmark the runnable compositions from Runnables/ and Chains/ against the fake backend.
+
+Usage:
+    python Benchmarks/bench_runnables.py --latencies 0 50 200 --concurrency 1 8 32 --requests 64
+    python Benchmarks/bench_runnables.py --compare Benchmarks/results/runnables-20250101-120000.json
+
+Each composition is rebuilt here exactly as its script wires it (the
+scripts call the model at import time, so they cannot be imported). Every
+(composition, model latency, concurrency) cell sends ``--requests``
+invocations from a thread pool and records per-request latency
+percentiles, throughput and, in a separate tracemalloc pass, peak Python
+memory per request. The 0 ms latency cells measure pure orchestration
+overhead. ``branch`` feeds the branch a report over its 300-word threshold
+(the summarize path, two model calls); ``branch_short`` stays under it.
+
+Results are written to ``Benchmarks/results/runnables-<timestamp>.json``.
+``--compare`` diffs the new run against an earlier file and exits non-zero
+when a p50/p95 latency regresses by more than ``--threshold``.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import langchain_core
+from langchain_core.output_parsers import StrOutputParser
+from langchain_core.prompts import PromptTemplate
+from langchain_core.runnables import (
+    RunnableBranch,
+    RunnableLambda,
+    RunnableParallel,
+    RunnablePassthrough,
+    RunnableSequence,
+)
+
+from fake_backend import FakeChatModel
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+# The fake model writes about 3 words per 4 tokens; 480 tokens is ~360 words, over the branch's 300.
+BRANCH_REPORT_TOKENS = 480
+
+
+# ---------------- Compositions ---------------- #
+
+def build_sequence(llm, parser):
+    # Runnables/runable_sequence.py
+    prompt = PromptTemplate(template="write joke about {topic}", input_variables=["topic"])
+    return RunnableSequence(prompt, llm, parser)
+
+
+def build_parallel(llm, parser):
+    # Runnables/runnable_paralll.py
+    prompt1 = PromptTemplate(template='Generate a tweet about {topic}', input_variables=['topic'])
+    prompt2 = PromptTemplate(template='Generate a Linkedin post about {topic}', input_variables=['topic'])
+    return RunnableParallel({
+        'tweet': RunnableSequence(prompt1, llm, parser),
+        'linkedin': RunnableSequence(prompt2, llm, parser),
+    })
+
+
+def build_branch(llm, parser, report_tokens=BRANCH_REPORT_TOKENS):
+    # Runnables/runnable_branch.py; the report is made long enough (> 300 words) to take the summarize path.
+    report_llm = llm.model_copy(update={"response_tokens": report_tokens})
+    prompt1 = PromptTemplate(template='Write a detailed report on {topic}', input_variables=['topic'])
+    prompt2 = PromptTemplate(template='Summarize the following text \n {text}', input_variables=['text'])
+    branch_chain = RunnableBranch(
+        (lambda x: len(x.split()) > 300, prompt2 | llm | parser),
+        RunnablePassthrough(),
+    )
+    return RunnableSequence(prompt1 | report_llm | parser, branch_chain)
+
+
+def build_branch_short(llm, parser):
+    # The same branch with a report under the threshold: the passthrough path, one model call.
+    return build_branch(llm, parser, report_tokens=llm.response_tokens)
+
+
+def build_passthrough(llm, parser):
+    # Runnables/runnable_passthrough.py
+    prompt1 = PromptTemplate(template="write joke about {topic}", input_variables=["topic"])
+    prompt2 = PromptTemplate(template="Explain joke {joke}", input_variables=["joke"])
+    parallel_chain = RunnableParallel({
+        "joke": RunnablePassthrough(),
+        "exlpain": RunnableSequence(prompt2, llm, parser),
+    })
+    return RunnableSequence(RunnableSequence(prompt1, llm, parser), parallel_chain)
+
+
+def build_lambda(llm, parser):
+    # Runnables/runnable_lambda.py
+    prompt = PromptTemplate(template='Write a joke about {topic}', input_variables=['topic'])
+    parallel_chain = RunnableParallel({
+        'joke': RunnablePassthrough(),
+        'word_count': RunnableLambda(lambda text: len(text.split())),
+    })
+    return RunnableSequence(RunnableSequence(prompt, llm, parser), parallel_chain)
+
+
+def build_chains_parallel(llm, parser):
+    # Chains/parallel_chain.py: content -> (notes || quiz) -> key takeaways, as one chain
+    prompt1 = PromptTemplate(template="Explain this {topic} in simple language with example in detail.", input_variables=["topic"])
+    prompt2 = PromptTemplate(template="Generate a proper notes on the following /n {content}", input_variables=["content"])
+    prompt3 = PromptTemplate(template="Generate a quiz with 4 option  on the following /n {content}", input_variables=["content"])
+    prompt4 = PromptTemplate(
+        template="Solve the following quiz /n {quiz} and generate rembering point on the basis of quiz from this /n {notes}",
+        input_variables=["quiz", "notes"],
+    )
+    notes_quiz_chain = RunnableParallel({
+        'notes': prompt2 | llm | parser,
+        'quiz': prompt3 | llm | parser,
+    })
+    return (
+        prompt1 | llm | parser
+        | RunnableLambda(lambda content: {"content": content})
+        | notes_quiz_chain
+        | prompt4 | llm | parser
+    )
+
+
+COMPOSITIONS = {
+    "sequence": build_sequence,
+    "parallel": build_parallel,
+    "branch": build_branch,
+    "branch_short": build_branch_short,
+    "passthrough": build_passthrough,
+    "lambda": build_lambda,
+    "chains_parallel": build_chains_parallel,
+}
+
+
+# ---------------- Measurement ---------------- #
+
+def percentile(values, q):
+    ordered = sorted(values)
+    if not ordered:
+        return float("nan")
+    index = min(len(ordered) - 1, max(0, round(q / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def run_requests(chain, requests, concurrency):
+    """Invoke ``chain`` ``requests`` times from ``concurrency`` threads; returns (latencies, wall, errors)."""
+    def one(i):
+        start = time.perf_counter()
+        chain.invoke({"topic": f"topic {i}"})
+        return time.perf_counter() - start
+
+    latencies, errors = [], 0
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        futures = [pool.submit(one, i) for i in range(requests)]
+        for future in futures:
+            try:
+                latencies.append(future.result())
+            except Exception:
+                errors += 1
+    return latencies, time.perf_counter() - start, errors
+
+
+def measure_memory(chain, requests, concurrency):
+    """Peak traced allocation (bytes) over a short run, divided by the requests in it."""
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    run_requests(chain, requests, concurrency)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak / requests
+
+
+def measure_cell(name, latency_ms, concurrency, args):
+    llm = FakeChatModel(
+        latency_ms=latency_ms,
+        jitter_ms=args.jitter_ms,
+        distribution=args.distribution,
+        tokens_per_second=args.tokens_per_second,
+        response_tokens=args.response_tokens,
+        seed=args.seed,
+    )
+    chain = COMPOSITIONS[name](llm, StrOutputParser())
+    run_requests(chain, min(concurrency, args.requests), concurrency)  # warm-up
+    latencies, wall, errors = run_requests(chain, args.requests, concurrency)
+    memory = measure_memory(chain, min(args.requests, args.memory_requests), concurrency)
+    return {
+        "composition": name,
+        "model_latency_ms": latency_ms,
+        "concurrency": concurrency,
+        "requests": args.requests,
+        "errors": errors,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "mean_ms": statistics.mean(latencies) * 1000 if latencies else float("nan"),
+        "throughput_rps": len(latencies) / wall if wall else float("nan"),
+        "peak_kib_per_request": memory / 1024,
+    }
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def cell_key(row):
+    return (row["composition"], row["model_latency_ms"], row["concurrency"])
+
+
+def compare(results, baseline_path, threshold):
+    """Print per-cell p50/p95 changes against a baseline file; returns the regressed cells."""
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = {cell_key(row): row for row in json.load(f)["results"]}
+    regressions = []
+    print(f"\nvs {baseline_path} (regression threshold {threshold:.0%})")
+    print(f"{'composition':<16} {'lat ms':>7} {'conc':>5} {'p50 Δ':>8} {'p95 Δ':>8}")
+    for row in results:
+        old = baseline.get(cell_key(row))
+        if old is None:
+            continue
+        deltas = [(row[key] - old[key]) / old[key] if old[key] else 0.0 for key in ("p50_ms", "p95_ms")]
+        flag = " REGRESSION" if max(deltas) > threshold else ""
+        if flag:
+            regressions.append(cell_key(row))
+        print(f"{row['composition']:<16} {row['model_latency_ms']:>7g} {row['concurrency']:>5} "
+              f"{deltas[0]:>+8.1%} {deltas[1]:>+8.1%}{flag}")
+    return regressions
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--compositions", nargs="+", choices=sorted(COMPOSITIONS), default=list(COMPOSITIONS))
+    arg_parser.add_argument("--latencies", nargs="+", type=float, default=[0, 50, 200], help="Model TTFT in ms")
+    arg_parser.add_argument("--concurrency", nargs="+", type=int, default=[1, 8, 32])
+    arg_parser.add_argument("--requests", type=int, default=64, help="Requests per cell")
+    arg_parser.add_argument("--memory-requests", type=int, default=16, help="Requests in the tracemalloc pass")
+    arg_parser.add_argument("--jitter-ms", type=float, default=0.0)
+    arg_parser.add_argument("--distribution", default="fixed", choices=["fixed", "uniform", "normal", "lognormal"])
+    arg_parser.add_argument("--tokens-per-second", type=float, default=0, help="0 returns all tokens at once")
+    arg_parser.add_argument("--response-tokens", type=int, default=120)
+    arg_parser.add_argument("--seed", type=int, default=0)
+    arg_parser.add_argument("--output", help="Results file (default: Benchmarks/results/runnables-<timestamp>.json)")
+    arg_parser.add_argument("--compare", help="Earlier results file to diff against")
+    arg_parser.add_argument("--threshold", type=float, default=0.10, help="Relative p50/p95 increase counted as a regression")
+    args = arg_parser.parse_args()
+
+    results = []
+    print(f"{'composition':<16} {'lat ms':>7} {'conc':>5} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'req/s':>9} {'KiB/req':>9}")
+    for name in args.compositions:
+        for latency_ms in args.latencies:
+            for concurrency in args.concurrency:
+                row = measure_cell(name, latency_ms, concurrency, args)
+                results.append(row)
+                print(f"{name:<16} {latency_ms:>7g} {concurrency:>5} {row['p50_ms']:>9.2f} {row['p95_ms']:>9.2f} "
+                      f"{row['p99_ms']:>9.2f} {row['throughput_rps']:>9.1f} {row['peak_kib_per_request']:>9.1f}")
+
+    output = args.output or os.path.join(RESULTS_DIR, time.strftime("runnables-%Y%m%d-%H%M%S.json"))
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump({
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "git_revision": git_revision(),
+            "python": platform.python_version(),
+            "langchain_core": langchain_core.__version__,
+            "config": {key: value for key, value in vars(args).items() if key not in ("output", "compare")},
+            "results": results,
+        }, f, indent=2)
+    print(f"\nresults written to {output}")
+
+    if args.compare and compare(results, args.compare, args.threshold):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
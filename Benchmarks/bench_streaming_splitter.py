@@ -0,0 +1,134 @@
+"""Throughput and memory of the streaming splitter against RecursiveCharacterTextSplitter.split_text.
+
+Usage:
+    python Benchmarks/bench_streaming_splitter.py --size-mb 64 --chunk-size 1000 --chunk-overlap 100
+    python Benchmarks/bench_streaming_splitter.py --path dump.txt --language markdown
+
+Without ``--path`` a synthetic corpus of ``--size-mb`` is generated from
+paragraphs of the repo's sample texts. Each variant is timed once without
+tracing (MB/s, chunks/s) and once under tracemalloc for peak Python memory.
+The chunk sequences are hashed and compared, so a mismatch with the
+existing splitter is reported.
+"""
+import argparse
+import hashlib
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Splitters"))
+
+from langchain_text_splitters import Language, RecursiveCharacterTextSplitter
+
+from streaming_splitter import DEFAULT_BLOCK_SIZE, StreamingTextSplitter
+
+PARAGRAPHS = [
+    "Space exploration has led to incredible scientific discoveries. From landing on the Moon to exploring Mars, "
+    "humanity continues to push the boundaries of what's possible beyond our planet.",
+    "These missions have not only expanded our knowledge of the universe but have also contributed to advancements "
+    "in technology here on Earth. Satellite communications, GPS, and even certain medical imaging techniques trace "
+    "their roots back to innovations driven by space programs.",
+    "## Features\n\n- Add new students with relevant info\n- View student details\n- Check if a student is passing",
+    "class Student:\n    def __init__(self, name, age, grade):\n        self.name = name\n        self.age = age",
+]
+
+
+def write_corpus(path, size_mb, seed=0):
+    rng = random.Random(seed)
+    target = size_mb * 1024 * 1024
+    written = 0
+    with open(path, "w", encoding="utf-8") as f:
+        while written < target:
+            lines = [rng.choice(PARAGRAPHS) for _ in range(rng.randint(1, 4))]
+            block = "\n".join(lines) + "\n\n"
+            f.write(block)
+            written += len(block)
+
+
+def make_splitter(args):
+    settings = dict(chunk_size=args.chunk_size, chunk_overlap=args.chunk_overlap)
+    if args.language:
+        return RecursiveCharacterTextSplitter.from_language(Language(args.language), **settings)
+    return RecursiveCharacterTextSplitter(**settings)
+
+
+def run_baseline(path, args):
+    with open(path, encoding="utf-8") as f:
+        text = f.read()
+    yield from make_splitter(args).split_text(text)
+
+
+def run_streaming(path, args, use_mmap):
+    splitter = StreamingTextSplitter(make_splitter(args), block_size=args.block_size)
+    yield from splitter.split_file(path, use_mmap=use_mmap)
+
+
+def consume(chunks):
+    digest, count = hashlib.sha256(), 0
+    for chunk in chunks:
+        digest.update(chunk.encode("utf-8"))
+        digest.update(b"\0")
+        count += 1
+    return count, digest.hexdigest()
+
+
+def measure(name, make_chunks, size_bytes):
+    start = time.perf_counter()
+    count, digest = consume(make_chunks())
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    consume(make_chunks())
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "name": name,
+        "chunks": count,
+        "seconds": elapsed,
+        "mb_per_s": size_bytes / 1024 / 1024 / elapsed if elapsed else float("nan"),
+        "chunks_per_s": count / elapsed if elapsed else float("nan"),
+        "peak_mib": peak / 1024 / 1024,
+        "digest": digest,
+    }
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--path", help="Corpus file (default: a generated one)")
+    arg_parser.add_argument("--size-mb", type=int, default=32, help="Size of the generated corpus")
+    arg_parser.add_argument("--chunk-size", type=int, default=1000)
+    arg_parser.add_argument("--chunk-overlap", type=int, default=100)
+    arg_parser.add_argument("--language", choices=[language.value for language in Language])
+    arg_parser.add_argument("--block-size", type=int, default=DEFAULT_BLOCK_SIZE)
+    arg_parser.add_argument("--skip-baseline", action="store_true", help="Only run the streaming variants")
+    args = arg_parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = args.path
+        if path is None:
+            path = os.path.join(tmp, "corpus.txt")
+            write_corpus(path, args.size_mb)
+        size_bytes = os.path.getsize(path)
+        print(f"corpus: {path} ({size_bytes / 1024 / 1024:.1f} MiB), chunk_size={args.chunk_size}, "
+              f"overlap={args.chunk_overlap}, block={args.block_size}")
+
+        variants = [
+            ("streaming", lambda: run_streaming(path, args, use_mmap=False)),
+            ("streaming+mmap", lambda: run_streaming(path, args, use_mmap=True)),
+        ]
+        if not args.skip_baseline:
+            variants.insert(0, ("split_text", lambda: run_baseline(path, args)))
+        rows = [measure(name, make_chunks, size_bytes) for name, make_chunks in variants]
+
+    print(f"\n{'variant':<16} {'chunks':>9} {'s':>8} {'MB/s':>8} {'chunks/s':>10} {'peak MiB':>9} {'same':>5}")
+    reference = rows[0]["digest"]
+    for row in rows:
+        print(f"{row['name']:<16} {row['chunks']:>9} {row['seconds']:>8.2f} {row['mb_per_s']:>8.1f} "
+              f"{row['chunks_per_s']:>10.0f} {row['peak_mib']:>9.1f} {'yes' if row['digest'] == reference else 'NO':>5}")
+
+
+if __name__ == "__main__":
+    main()
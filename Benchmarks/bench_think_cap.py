@@ -0,0 +1,119 @@
+"""Measure what a reasoning budget does to report latency and quality.
+
+Usage:
+    python Benchmarks/bench_think_cap.py --devices "Hip Implant" "Bone Screw" --budgets 0 256 512 1024 --runs 2
+    python Benchmarks/bench_think_cap.py --fake --fake-reasoning-tokens 1500
+
+Every device is streamed through ``think_filter.stream_answer`` once per
+budget (0 = uncapped, the default in the apps) with the response cache
+disabled. For each budget the table shows reasoning and answer time, how
+often the cap fired, how many answers still parsed into a
+``MedicalDeviceReport`` without an LLM re-ask (``direct`` or ``local``
+repair tier), and how close each parsed report is to the uncapped report
+for the same device and run (difflib ratio over the JSON, 1.0 = identical).
+
+A budget is worth enabling only if the valid rate and similarity hold up
+against the uncapped row.
+"""
+import argparse
+import difflib
+import json
+import os
+import statistics
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from langchain_core.messages import AIMessage
+
+from fake_backend import WORDS, add_fake_argument, fake_payload, install_from_args
+from report_model import MedicalDeviceReport, build_messages, create_llm
+from report_repair import parse_with_repair
+from think_filter import ThinkFilter, stream_answer
+
+
+def fake_responder(reasoning_tokens):
+    """Reply like deepseek-r1: a ``<think>`` block, then the report JSON (only the JSON after a prefill)."""
+    reasoning = " ".join(WORDS[i % len(WORDS)] for i in range(reasoning_tokens))
+    answer = json.dumps(fake_payload(MedicalDeviceReport))
+
+    def respond(messages):
+        if isinstance(messages[-1], AIMessage):
+            return answer
+        return f"<think>\n{reasoning}\n</think>\n\n{answer}"
+    return respond
+
+
+def run_once(llm, device_name, budget):
+    think_filter = ThinkFilter(budget_tokens=budget)
+    answer = "".join(stream_answer(llm, build_messages(device_name), think_filter)).strip()
+    try:
+        report, tier = parse_with_repair(answer)
+        report_json = report.model_dump_json()
+    except Exception:
+        report_json, tier = None, "failed"
+    return {**think_filter.stats(), "tier": tier, "report_json": report_json}
+
+
+def similarity(a, b):
+    if a is None or b is None:
+        return 0.0
+    return difflib.SequenceMatcher(None, a, b).ratio()
+
+
+def summarize(budget, rows, baseline):
+    def median(key):
+        values = [row[key] for row in rows if row[key] is not None]
+        return statistics.median(values) if values else float("nan")
+
+    similarities = [similarity(row["report_json"], baseline[key]) for key, row in rows.items()] if budget else [1.0]
+    rows = list(rows.values())
+    return {
+        "budget": budget,
+        "runs": len(rows),
+        "capped": sum(row["capped"] for row in rows),
+        "valid": sum(row["tier"] in ("direct", "local") for row in rows),
+        "reasoning_tokens": statistics.mean(row["reasoning_tokens"] for row in rows),
+        "reasoning_s": median("reasoning_s"),
+        "answer_s": median("answer_s"),
+        "total_s": median("total_s"),
+        "similarity": statistics.mean(similarities),
+    }
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--devices", nargs="+", default=["Hip Implant", "Bone Screw", "Coronary Stent"])
+    arg_parser.add_argument("--budgets", nargs="+", type=int, default=[0, 256, 512, 1024],
+                            help="Reasoning budgets in streamed tokens; 0 is the uncapped baseline")
+    arg_parser.add_argument("--runs", type=int, default=1)
+    add_fake_argument(arg_parser)
+    arg_parser.add_argument("--fake-reasoning-tokens", type=int, default=800, help="Length of the fake <think> block")
+    args = arg_parser.parse_args()
+
+    backend_stats = install_from_args(args, responder=fake_responder(args.fake_reasoning_tokens))
+    llm = create_llm(cache=False)
+    budgets = [0] + [budget for budget in args.budgets if budget]
+
+    results = {budget: {} for budget in budgets}
+    for run in range(args.runs):
+        for device_name in args.devices:
+            for budget in budgets:
+                row = run_once(llm, device_name, budget)
+                results[budget][(run, device_name)] = row
+                print(f"  run {run} {device_name!r} budget {budget or 'off'}: {row['tier']}, "
+                      f"{row['reasoning_tokens']} reasoning tokens{' (capped)' if row['capped'] else ''}, {row['total_s']:.2f}s")
+
+    baseline = {key: row["report_json"] for key, row in results[0].items()}
+    print(f"\n{'budget':>7} {'runs':>5} {'capped':>7} {'valid':>6} {'think tok':>10} "
+          f"{'think s':>8} {'answer s':>9} {'total s':>8} {'similar':>8}")
+    for budget in budgets:
+        row = summarize(budget, results[budget], baseline)
+        print(f"{budget or 'off':>7} {row['runs']:>5} {row['capped']:>7} {row['valid']:>6} {row['reasoning_tokens']:>10.0f} "
+              f"{row['reasoning_s']:>8.2f} {row['answer_s']:>9.2f} {row['total_s']:>8.2f} {row['similarity']:>8.3f}")
+    if backend_stats:
+        print(f"\nfake backend: {backend_stats.snapshot()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""Overhead of token-budget splitting against character splitting.
+
+Usage:
+    python Benchmarks/bench_token_splitter.py --size-mb 4 --chunk-tokens 256 --chunk-overlap 32
+    python Benchmarks/bench_token_splitter.py --path notes.md --model gpt-4o --language markdown
+
+Variants, all on the same corpus:
+
+- ``chars``: ``RecursiveCharacterTextSplitter`` with ``chunk_size`` in
+  characters (``--chars-per-token`` x the token budget);
+- ``from_tiktoken_encoder``: the stock LangChain token splitter, which
+  encodes every piece one call at a time;
+- ``token_budget (cold)``: ``TokenBudgetSplitter`` with an empty memo;
+- ``token_budget (warm)``: the same splitter run again, i.e. with the token
+  counts of the corpus' pieces already memoized.
+
+Every chunk is re-encoded afterwards to report the largest chunk in tokens
+(``over`` counts chunks above the budget) and the mean fill of the budget.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Splitters"))
+
+from langchain_text_splitters import Language, RecursiveCharacterTextSplitter
+
+from token_splitter import DEFAULT_ENCODING, TokenBudgetSplitter, get_encoding
+
+PARAGRAPHS = [
+    "Space exploration has led to incredible scientific discoveries. From landing on the Moon to exploring Mars, "
+    "humanity continues to push the boundaries of what's possible beyond our planet.",
+    "These missions have not only expanded our knowledge of the universe but have also contributed to advancements "
+    "in technology here on Earth. Satellite communications, GPS, and even certain medical imaging techniques trace "
+    "their roots back to innovations driven by space programs.",
+    "## Features\n\n- Add new students with relevant info\n- View student details\n- Check if a student is passing",
+    "class Student:\n    def __init__(self, name, age, grade):\n        self.name = name\n        self.age = age",
+]
+
+
+def make_corpus(size_mb, seed=0):
+    rng = random.Random(seed)
+    target = int(size_mb * 1024 * 1024)
+    blocks, written = [], 0
+    while written < target:
+        # A random id per block keeps the corpus from being one repeated paragraph.
+        lines = [rng.choice(PARAGRAPHS) for _ in range(rng.randint(1, 4))] + [f"ref-{rng.getrandbits(32):08x}"]
+        block = "\n".join(lines) + "\n\n"
+        blocks.append(block)
+        written += len(block)
+    return "".join(blocks)
+
+
+def measure(name, split, text, encoding, budget):
+    start = time.perf_counter()
+    chunks = split(text)
+    elapsed = time.perf_counter() - start
+    sizes = [len(tokens) for tokens in encoding.encode_ordinary_batch(chunks)] or [0]
+    return {
+        "name": name,
+        "chunks": len(chunks),
+        "seconds": elapsed,
+        "mb_per_s": len(text.encode("utf-8")) / 1024 / 1024 / elapsed if elapsed else float("nan"),
+        "max_tokens": max(sizes),
+        "over": sum(size > budget for size in sizes),
+        "fill": sum(sizes) / len(sizes) / budget,
+    }
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--path", help="Corpus file (default: a generated one)")
+    arg_parser.add_argument("--size-mb", type=float, default=4, help="Size of the generated corpus")
+    arg_parser.add_argument("--chunk-tokens", type=int, default=256)
+    arg_parser.add_argument("--chunk-overlap", type=int, default=32, help="Overlap in tokens")
+    arg_parser.add_argument("--chars-per-token", type=float, default=4.0, help="Character budget of the chars variant")
+    arg_parser.add_argument("--encoding", default=DEFAULT_ENCODING)
+    arg_parser.add_argument("--model", help="OpenAI model name; overrides --encoding")
+    arg_parser.add_argument("--language", choices=[language.value for language in Language])
+    arg_parser.add_argument("--skip-stock", action="store_true", help="Skip from_tiktoken_encoder (slow on big corpora)")
+    args = arg_parser.parse_args()
+
+    if args.path:
+        with open(args.path, encoding="utf-8") as f:
+            text = f.read()
+    else:
+        text = make_corpus(args.size_mb)
+    encoding = get_encoding(args.encoding, args.model)
+    budget, overlap = args.chunk_tokens, args.chunk_overlap
+    print(f"corpus: {len(text.encode('utf-8')) / 1024 / 1024:.1f} MiB, encoding={encoding.name}, "
+          f"budget={budget} tokens, overlap={overlap}")
+
+    language = Language(args.language) if args.language else None
+    separators = RecursiveCharacterTextSplitter.get_separators_for_language(language) if language else None
+    regex = language is not None
+
+    chars = RecursiveCharacterTextSplitter(
+        separators=separators,
+        is_separator_regex=regex,
+        chunk_size=int(budget * args.chars_per_token),
+        chunk_overlap=int(overlap * args.chars_per_token),
+    )
+    token_budget = TokenBudgetSplitter(
+        chunk_size=budget, chunk_overlap=overlap, encoding=encoding, separators=separators, is_separator_regex=regex
+    )
+    variants = [("chars", chars.split_text)]
+    if not args.skip_stock:
+        stock = RecursiveCharacterTextSplitter.from_tiktoken_encoder(
+            encoding_name=encoding.name,
+            model_name=args.model,
+            chunk_size=budget,
+            chunk_overlap=overlap,
+            separators=separators,
+            is_separator_regex=regex,
+        )
+        variants.append(("from_tiktoken_encoder", stock.split_text))
+    variants += [("token_budget (cold)", token_budget.split_text), ("token_budget (warm)", token_budget.split_text)]
+
+    rows = [measure(name, split, text, encoding, budget) for name, split in variants]
+    base = rows[0]["seconds"]
+    print(f"\n{'variant':<22} {'chunks':>8} {'s':>8} {'MB/s':>7} {'x chars':>8} {'max tok':>8} {'over':>6} {'fill':>6}")
+    for row in rows:
+        print(f"{row['name']:<22} {row['chunks']:>8} {row['seconds']:>8.2f} {row['mb_per_s']:>7.2f} "
+              f"{row['seconds'] / base if base else float('nan'):>8.1f} {row['max_tokens']:>8} "
+              f"{row['over']:>6} {row['fill']:>6.0%}")
+    print(f"\nmemo: {token_budget.counter.stats()}")
+
+
+if __name__ == "__main__":
+    main()
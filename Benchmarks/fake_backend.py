@@ -0,0 +1,544 @@
+"""Deterministic offline stand-ins for ChatGroq, ChatOpenAI and VertexAIImageGeneratorChat.
+
+Usage:
+    python Benchmarks/fake_backend.py Runnables/runnable_paralll.py --fake-latency-ms 400
+
+    import fake_backend
+    fake_backend.install(latency_ms=400, tokens_per_second=250, failure_rate=0.05)
+    # ...then import / build chains as usual; every model call is local.
+
+The fakes behave like the real clients from a chain's point of view:
+``invoke``/``ainvoke``/``stream``/``astream``, ``bind_tools`` and therefore
+``with_structured_output`` (tool-call arguments are synthesized from the
+schema and streamed as partial JSON), token usage metadata, and image
+responses as PNG data URLs. Latency is a time-to-first-token drawn from a
+configurable distribution plus output tokens at ``tokens_per_second``.
+
+Every fake records the time it spent "in the model", so a benchmark can
+subtract it from wall time and report orchestration overhead on its own.
+"""
+import asyncio
+import base64
+import hashlib
+import json
+import os
+import random
+import runpy
+import struct
+import sys
+import threading
+import time
+import types
+import zlib
+from typing import Any, Callable, Dict, List, Optional
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from langchain_core.utils.function_calling import convert_to_openai_tool
+from pydantic import ConfigDict, Field, PrivateAttr
+
+WORDS = (
+    "model latency token stream chain prompt parser cache batch schema quiz notes "
+    "report section image topic example explanation answer option result value"
+).split()
+
+
+class FakeBackendError(RuntimeError):
+    """Injected failure raised by a fake model call."""
+
+
+# ---------------- Latency ---------------- #
+
+class LatencyModel:
+    """Seeded sampler for time-to-first-token, in seconds.
+
+    ``distribution`` is one of ``fixed``, ``uniform`` (mean ± jitter),
+    ``normal`` (sd = jitter) or ``lognormal`` (median = mean, sigma = jitter
+    as a fraction of it, at most 1.5), the last giving the long tail real
+    APIs show.
+    """
+
+    def __init__(self, mean_ms=300.0, jitter_ms=100.0, distribution="lognormal", seed=0):
+        self.mean = mean_ms / 1000
+        self.jitter = jitter_ms / 1000
+        self.distribution = distribution
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def sample(self):
+        with self._lock:
+            if self.distribution == "fixed" or self.mean <= 0:
+                value = self.mean
+            elif self.distribution == "uniform":
+                value = self._rng.uniform(self.mean - self.jitter, self.mean + self.jitter)
+            elif self.distribution == "normal":
+                value = self._rng.gauss(self.mean, self.jitter)
+            elif self.distribution == "lognormal":
+                # Capped so a jitter much larger than the mean cannot produce absurd tails.
+                sigma = min(self.jitter / self.mean, 1.5)
+                value = self.mean * self._rng.lognormvariate(0, sigma)
+            else:
+                raise ValueError(f"Unknown latency distribution {self.distribution!r}")
+        return max(0.0, value)
+
+
+class BackendStats:
+    """Thread-safe call counters shared by the fakes from one :func:`install`."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.calls = 0
+            self.failures = 0
+            self.model_seconds = 0.0
+            self.output_tokens = 0
+
+    def record(self, seconds, output_tokens=0, failed=False):
+        with self._lock:
+            self.calls += 1
+            self.failures += int(failed)
+            self.model_seconds += seconds
+            self.output_tokens += output_tokens
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "failures": self.failures,
+                "model_seconds": round(self.model_seconds, 4),
+                "output_tokens": self.output_tokens,
+            }
+
+
+stats = BackendStats()
+
+# ---------------- Schema-driven fake data ---------------- #
+
+def _resolve(schema, root):
+    ref = schema.get("$ref")
+    if ref:
+        node = root
+        for part in ref.lstrip("#/").split("/"):
+            node = node[part]
+        return node
+    return schema
+
+
+def fake_value(schema, rng, root=None, list_items=3, name=""):
+    """Build a value that validates against a JSON schema (objects, arrays, scalars, refs)."""
+    root = root or schema
+    schema = _resolve(schema, root)
+    for key in ("anyOf", "oneOf", "allOf"):
+        if key in schema:
+            options = [s for s in schema[key] if _resolve(s, root).get("type") != "null"]
+            return fake_value(options[0] if options else schema[key][0], rng, root, list_items, name)
+    if "enum" in schema:
+        return schema["enum"][0]
+    kind = schema.get("type", "object" if "properties" in schema else "string")
+    if kind == "object":
+        return {
+            key: fake_value(prop, rng, root, list_items, key)
+            for key, prop in schema.get("properties", {}).items()
+        }
+    if kind == "array":
+        return [fake_value(schema.get("items", {}), rng, root, list_items, name) for _ in range(list_items)]
+    if kind == "integer":
+        return rng.randint(1, 100)
+    if kind == "number":
+        return round(rng.uniform(1, 1000), 2)
+    if kind == "boolean":
+        return rng.random() < 0.5
+    if kind == "null":
+        return None
+    words = " ".join(rng.choice(WORDS) for _ in range(rng.randint(3, 8)))
+    return f"{name.replace('_', ' ')}: {words}" if name else words
+
+
+def fake_payload(model, seed=0, list_items=3, by_alias=True):
+    """Fake data for a pydantic model class, keyed by alias like an LLM response would be."""
+    schema = model.model_json_schema(by_alias=by_alias)
+    return fake_value(schema, random.Random(seed), list_items=list_items)
+
+
+def estimate_tokens(text):
+    # Roughly four characters per token, like the OpenAI/Groq tokenizers on English.
+    return max(1, len(text) // 4)
+
+
+def split_tokens(text):
+    """Split ``text`` into token-sized pieces that join back to the original."""
+    return [text[i:i + 4] for i in range(0, len(text), 4)] or [""]
+
+
+def _message_text(messages):
+    parts = []
+    for message in messages:
+        content = message.content
+        parts.append(content if isinstance(content, str) else json.dumps(content))
+    return "\n".join(parts)
+
+# ---------------- Fake chat model ---------------- #
+
+class FakeChatModel(BaseChatModel):
+    """Offline chat model with seeded latency, token-rate streaming, tool calls and failures.
+
+    Output text comes from ``responder(messages)`` if given, else a
+    deterministic paragraph derived from the prompt hash, ``response_tokens``
+    long. When tools are bound (``bind_tools``/``with_structured_output``),
+    the first tool is "called" with arguments generated from its schema.
+    """
+
+    model_config = ConfigDict(extra="ignore", populate_by_name=True, arbitrary_types_allowed=True)
+
+    model_name: str = Field(default="fake-chat", alias="model")
+    latency_ms: float = 300.0
+    jitter_ms: float = 100.0
+    distribution: str = "lognormal"
+    tokens_per_second: float = 200.0
+    response_tokens: int = 120
+    list_items: int = 5
+    failure_rate: float = 0.0
+    fail_every: int = 0
+    seed: int = 0
+    responder: Optional[Callable[[List[Any]], str]] = None
+    backend_stats: Any = None
+
+    _latency: LatencyModel = PrivateAttr()
+    _rng: random.Random = PrivateAttr()
+    _lock: Any = PrivateAttr()
+    _calls: int = PrivateAttr(default=0)
+
+    def model_post_init(self, __context):
+        self._latency = LatencyModel(self.latency_ms, self.jitter_ms, self.distribution, self.seed)
+        self._rng = random.Random(self.seed)
+        self._lock = threading.Lock()
+
+    @property
+    def _llm_type(self):
+        return "fake-chat"
+
+    @property
+    def _identifying_params(self):
+        return {"model_name": self.model_name, "seed": self.seed}
+
+    @property
+    def _stats(self):
+        return self.backend_stats or stats
+
+    def bind_tools(self, tools, *, tool_choice=None, **kwargs):
+        formatted = [convert_to_openai_tool(tool) for tool in tools]
+        return self.bind(tools=formatted, tool_choice=tool_choice, **kwargs)
+
+    # -- planning one response -- #
+
+    def _plan(self, messages, kwargs):
+        """Decide failure, latency and output (text or tool call) for one call."""
+        with self._lock:
+            self._calls += 1
+            call_number = self._calls
+            fail = (self.fail_every and call_number % self.fail_every == 0) or self._rng.random() < self.failure_rate
+        ttft = self._latency.sample()
+        prompt = _message_text(messages)
+        digest = int(hashlib.sha256(prompt.encode("utf-8")).hexdigest()[:12], 16)
+        rng = random.Random(digest ^ self.seed)
+
+        tools = kwargs.get("tools") or []
+        tool_call = None
+        if tools:
+            function = tools[0]["function"]
+            args = fake_value(function.get("parameters", {}), rng, list_items=self.list_items)
+            tool_call = {"name": function["name"], "args": args, "id": f"call_{digest:x}"}
+            text = ""
+            pieces = split_tokens(json.dumps(args))
+        else:
+            if self.responder is not None:
+                text = self.responder(messages)
+            else:
+                text = " ".join(rng.choice(WORDS) for _ in range(max(1, self.response_tokens * 3 // 4)))
+            pieces = split_tokens(text)
+        usage = {
+            "input_tokens": estimate_tokens(prompt),
+            "output_tokens": len(pieces),
+            "total_tokens": estimate_tokens(prompt) + len(pieces),
+        }
+        return fail, ttft, text, tool_call, pieces, usage
+
+    def _token_delay(self):
+        return 1 / self.tokens_per_second if self.tokens_per_second > 0 else 0.0
+
+    def _message(self, text, tool_call, usage):
+        return AIMessage(
+            content=text,
+            tool_calls=[tool_call] if tool_call else [],
+            usage_metadata=usage,
+            response_metadata={"model_name": self.model_name, "finish_reason": "stop"},
+        )
+
+    def _chunk(self, piece, tool_call, index):
+        if tool_call is None:
+            return ChatGenerationChunk(message=AIMessageChunk(content=piece))
+        return ChatGenerationChunk(message=AIMessageChunk(content="", tool_call_chunks=[{
+            "name": tool_call["name"] if index == 0 else None,
+            "args": piece,
+            "id": tool_call["id"] if index == 0 else None,
+            "index": 0,
+        }]))
+
+    def _fail(self, elapsed):
+        self._stats.record(elapsed, failed=True)
+        raise FakeBackendError(f"{self.model_name}: injected failure")
+
+    # -- sync -- #
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        fail, ttft, text, tool_call, pieces, usage = self._plan(messages, kwargs)
+        if fail:
+            time.sleep(ttft)
+            self._fail(ttft)
+        elapsed = ttft + len(pieces) * self._token_delay()
+        time.sleep(elapsed)
+        self._stats.record(elapsed, len(pieces))
+        return ChatResult(generations=[ChatGeneration(message=self._message(text, tool_call, usage))])
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs):
+        fail, ttft, text, tool_call, pieces, usage = self._plan(messages, kwargs)
+        time.sleep(ttft)
+        if fail:
+            self._fail(ttft)
+        delay = self._token_delay()
+        for index, piece in enumerate(pieces):
+            if index:
+                time.sleep(delay)
+            chunk = self._chunk(piece, tool_call, index)
+            if run_manager and piece:
+                run_manager.on_llm_new_token(piece, chunk=chunk)
+            yield chunk
+        self._stats.record(ttft + (len(pieces) - 1) * delay, len(pieces))
+        yield ChatGenerationChunk(message=AIMessageChunk(content="", usage_metadata=usage))
+
+    # -- async -- #
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+        fail, ttft, text, tool_call, pieces, usage = self._plan(messages, kwargs)
+        if fail:
+            await asyncio.sleep(ttft)
+            self._fail(ttft)
+        elapsed = ttft + len(pieces) * self._token_delay()
+        await asyncio.sleep(elapsed)
+        self._stats.record(elapsed, len(pieces))
+        return ChatResult(generations=[ChatGeneration(message=self._message(text, tool_call, usage))])
+
+    async def _astream(self, messages, stop=None, run_manager=None, **kwargs):
+        fail, ttft, text, tool_call, pieces, usage = self._plan(messages, kwargs)
+        await asyncio.sleep(ttft)
+        if fail:
+            self._fail(ttft)
+        delay = self._token_delay()
+        for index, piece in enumerate(pieces):
+            if index:
+                await asyncio.sleep(delay)
+            chunk = self._chunk(piece, tool_call, index)
+            if run_manager and piece:
+                await run_manager.on_llm_new_token(piece, chunk=chunk)
+            yield chunk
+        self._stats.record(ttft + (len(pieces) - 1) * delay, len(pieces))
+        yield ChatGenerationChunk(message=AIMessageChunk(content="", usage_metadata=usage))
+
+# ---------------- Fake image generator ---------------- #
+
+def make_png(width, height, seed=0):
+    """Encode a small deterministic gradient PNG without PIL."""
+    rng = random.Random(seed)
+    base = [rng.randrange(256) for _ in range(3)]
+    rows = []
+    for y in range(height):
+        row = bytearray(b"\x00")
+        for x in range(width):
+            row += bytes(((base[0] + x) % 256, (base[1] + y) % 256, base[2]))
+        rows.append(bytes(row))
+
+    def chunk(tag, data):
+        return struct.pack(">I", len(data)) + tag + data + struct.pack(">I", zlib.crc32(tag + data) & 0xFFFFFFFF)
+
+    header = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+    return b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", header) + chunk(b"IDAT", zlib.compress(b"".join(rows))) + chunk(b"IEND", b"")
+
+
+class FakeImageGenerator(FakeChatModel):
+    """Offline VertexAIImageGeneratorChat: answers with a PNG data URL after the sampled latency."""
+
+    model_name: str = Field(default="fake-imagen", alias="model")
+    latency_ms: float = 2000.0
+    jitter_ms: float = 500.0
+    image_size: int = 256
+
+    @property
+    def _llm_type(self):
+        return "fake-image"
+
+    def _image_message(self, messages):
+        prompt = _message_text(messages)
+        seed = int(hashlib.sha256(prompt.encode("utf-8")).hexdigest()[:8], 16)
+        png = make_png(self.image_size, self.image_size, seed)
+        url = "data:image/png;base64," + base64.b64encode(png).decode("ascii")
+        return AIMessage(content=[{"type": "image_url", "image_url": {"url": url}}])
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        fail, ttft, *_ = self._plan(messages, {})
+        time.sleep(ttft)
+        if fail:
+            self._fail(ttft)
+        self._stats.record(ttft)
+        return ChatResult(generations=[ChatGeneration(message=self._image_message(messages))])
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+        fail, ttft, *_ = self._plan(messages, {})
+        await asyncio.sleep(ttft)
+        if fail:
+            self._fail(ttft)
+        self._stats.record(ttft)
+        return ChatResult(generations=[ChatGeneration(message=self._image_message(messages))])
+
+# ---------------- Installation ---------------- #
+
+# (module, attribute) pairs replaced by install(); the image fake goes to Vertex.
+TARGETS = [
+    ("langchain_groq", "ChatGroq", "chat"),
+    ("langchain_openai", "ChatOpenAI", "chat"),
+    ("langchain_google_vertexai.vision_models", "VertexAIImageGeneratorChat", "image"),
+]
+
+
+def _fake_class(base, name):
+    # A subclass per target so the fake reports the class name scripts expect.
+    return type(name, (base,), {"__module__": __name__})
+
+
+def install(image_defaults: Optional[Dict] = None, **chat_defaults):
+    """Replace the real model classes with fakes and return the shared :data:`stats`.
+
+    ``chat_defaults`` / ``image_defaults`` override the fake's field
+    defaults (``latency_ms``, ``distribution``, ``tokens_per_second``,
+    ``failure_rate``, ``responder`` ...). Modules that already did
+    ``from langchain_groq import ChatGroq`` are patched too, so this can run
+    after the code under test was imported. Packages that are not installed
+    are registered as stub modules holding only the fake, which lets the
+    whole repo run without provider SDKs or API keys.
+    """
+    fakes = {
+        "chat": _fake_defaults(FakeChatModel, chat_defaults),
+        "image": _fake_defaults(FakeImageGenerator, image_defaults or {}),
+    }
+    replaced = {}
+    for module_name, attribute, kind in TARGETS:
+        fake = _fake_class(fakes[kind], attribute)
+        module = sys.modules.get(module_name)
+        if module is None:
+            try:
+                module = __import__(module_name, fromlist=[attribute])
+            except ImportError:
+                module = _stub_module(module_name)
+        original = getattr(module, attribute, None)
+        setattr(module, attribute, fake)
+        if original is not None:
+            replaced[original] = fake
+
+    # Rebind names that were imported before install().
+    for module in list(sys.modules.values()):
+        namespace = getattr(module, "__dict__", None)
+        if not namespace or module.__name__ == __name__:
+            continue
+        for key, value in list(namespace.items()):
+            if isinstance(value, type) and value in replaced:
+                namespace[key] = replaced[value]
+
+    # The blog generator calls vertexai.init(project=...) at import time.
+    try:
+        import vertexai
+    except ImportError:
+        vertexai = _stub_module("vertexai")
+    vertexai.init = lambda *args, **kwargs: None
+
+    for key in ("GROQ_API_KEY", "OPENAI_API_KEY"):
+        os.environ.setdefault(key, "fake-key")
+    stats.reset()
+    return stats
+
+
+def _fake_defaults(base, overrides):
+    if not overrides:
+        return base
+    annotations = {key: base.model_fields[key].annotation for key in overrides if key in base.model_fields}
+    unknown = set(overrides) - set(annotations)
+    if unknown:
+        raise TypeError(f"Unknown fake backend options: {sorted(unknown)}")
+    return type(base.__name__, (base,), {"__module__": __name__, "__annotations__": annotations, **overrides})
+
+
+def _stub_module(name):
+    parts = name.split(".")
+    for i in range(1, len(parts) + 1):
+        partial = ".".join(parts[:i])
+        if partial not in sys.modules:
+            sys.modules[partial] = types.ModuleType(partial)
+            if i > 1:
+                setattr(sys.modules[".".join(parts[:i - 1])], parts[i - 1], sys.modules[partial])
+    return sys.modules[name]
+
+
+def add_fake_argument(arg_parser):
+    """Add the ``--fake`` flag (and latency knobs) shared by the benchmarks."""
+    group = arg_parser.add_argument_group("offline fake backend")
+    group.add_argument("--fake", action="store_true", help="Use the local fake models instead of live APIs")
+    group.add_argument("--fake-latency-ms", type=float, default=300.0, help="Median time to first token")
+    group.add_argument("--fake-jitter-ms", type=float, default=100.0)
+    group.add_argument("--fake-distribution", default="lognormal", choices=["fixed", "uniform", "normal", "lognormal"])
+    group.add_argument("--fake-tokens-per-second", type=float, default=250.0)
+    group.add_argument("--fake-failure-rate", type=float, default=0.0)
+    return arg_parser
+
+
+def install_from_args(args, **extra):
+    """Call :func:`install` with the ``--fake-*`` options when ``--fake`` was given."""
+    if not getattr(args, "fake", False):
+        return None
+    return install(
+        latency_ms=args.fake_latency_ms,
+        jitter_ms=args.fake_jitter_ms,
+        distribution=args.fake_distribution,
+        tokens_per_second=args.fake_tokens_per_second,
+        failure_rate=args.fake_failure_rate,
+        **extra,
+    )
+
+
+def main():
+    import argparse
+
+    arg_parser = argparse.ArgumentParser(description="Run a repo script against the fake backend and time it")
+    arg_parser.add_argument("script", help="Path of the script to run, e.g. Chains/parallel_chain.py")
+    add_fake_argument(arg_parser)
+    args = arg_parser.parse_args()
+    args.fake = True
+
+    script = os.path.abspath(args.script)
+    sys.path.insert(0, os.path.dirname(script))
+    backend_stats = install_from_args(args)
+    start = time.perf_counter()
+    runpy.run_path(script, run_name="__main__")
+    wall = time.perf_counter() - start
+    snapshot = backend_stats.snapshot()
+    print(f"\n--- fake backend: {args.script} ---")
+    print(f"wall {wall * 1000:.1f} ms, model {snapshot['model_seconds'] * 1000:.1f} ms over {snapshot['calls']} calls, "
+          f"{snapshot['failures']} injected failures")
+    # Model time of concurrent branches overlaps, so only report overhead when it is meaningful.
+    if snapshot["calls"]:
+        print(f"model-time share {snapshot['model_seconds'] / wall:.0%} (above 100% means calls overlapped)")
+
+
+if __name__ == "__main__":
+    main()
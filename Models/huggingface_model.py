@@ -1,18 +1,18 @@
-from langchain_huggingface import ChatHuggingFace, HuggingFacePipeline
+from langchain_openai import ChatOpenAI
 import os
 
-os.environ['HF_HOME'] = 'D:/huggingface_cache'
-
-llm = HuggingFacePipeline.from_model_id(
-    model_id='TinyLlama/TinyLlama-1.1B-Chat-v1.0',
-    task='text-generation',
-    pipeline_kwargs=dict(
-        temperature=0.5,
-        max_new_tokens=100
-    )
+# TinyLlama is served by huggingface_server.py, which keeps the weights loaded
+# between script runs and batches concurrent calls:
+#   python Models/huggingface_server.py
+# HF_HOME (weights cache location) is taken from the environment.
+model = ChatOpenAI(
+    base_url=os.getenv("LOCAL_LLM_BASE_URL", "http://127.0.0.1:8008/v1"),
+    api_key="local",
+    model="TinyLlama/TinyLlama-1.1B-Chat-v1.0",
+    temperature=0.5,
+    max_tokens=100
 )
-model = ChatHuggingFace(llm=llm)
 
 # result = model.invoke("What is the capital of India")
 
-# print(result.content)
\ No newline at end of file
+# print(result.content)
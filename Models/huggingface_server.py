@@ -0,0 +1,331 @@
+"""Local OpenAI-compatible server that keeps TinyLlama loaded and batches concurrent requests.
+
+Usage:
+    python Models/huggingface_server.py --port 8008 --max-batch-size 8 --max-wait-ms 20
+
+    from langchain_openai import ChatOpenAI
+    llm = ChatOpenAI(base_url="http://127.0.0.1:8008/v1", api_key="local",
+                     model="TinyLlama/TinyLlama-1.1B-Chat-v1.0")
+
+The weights are loaded once, from safetensors with ``low_cpu_mem_usage`` so
+the file is memory-mapped instead of copied through a state dict, and stay
+in memory for every later chain run. Everything runs on CPU.
+
+Requests that arrive within ``--max-wait-ms`` of each other (up to
+``--max-batch-size``) are tokenized together, left-padded and decoded in one
+``model.generate`` call; requests with different sampling settings are
+generated as separate groups of the same batch. ``stream=true`` is accepted
+for client compatibility but the completion is sent as a single chunk once
+its batch finishes.
+
+Endpoints: ``POST /v1/chat/completions``, ``GET /v1/models``, ``GET /health``.
+Set ``HF_HOME`` to choose where the weights are cached.
+"""
+import argparse
+import json
+import logging
+import os
+import queue
+import threading
+import time
+import uuid
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MODEL_ID = os.getenv("LOCAL_MODEL_ID", "TinyLlama/TinyLlama-1.1B-Chat-v1.0")
+DEFAULT_MAX_TOKENS = 256
+
+
+class GenerationRequest:
+    """One chat completion waiting for its batch; ``future`` resolves to a result dict."""
+
+    def __init__(self, messages, max_tokens=DEFAULT_MAX_TOKENS, temperature=1.0, top_p=1.0, stop=None):
+        self.messages = messages
+        self.max_tokens = max_tokens
+        self.temperature = temperature
+        self.top_p = top_p
+        self.stop = [stop] if isinstance(stop, str) else list(stop or [])
+        self.future = Future()
+        self.enqueued = time.perf_counter()
+
+    @property
+    def sampling_key(self):
+        """Requests generate together only when they sample the same way."""
+        if self.temperature <= 0:
+            return (False, 0.0, 1.0)
+        return (True, self.temperature, self.top_p)
+
+
+# ---------------- Model ---------------- #
+
+class TinyLlamaEngine:
+    """A causal LM and its tokenizer, loaded once, generating left-padded batches on CPU."""
+
+    def __init__(self, model_id=DEFAULT_MODEL_ID, threads=None):
+        import torch
+        from transformers import AutoModelForCausalLM, AutoTokenizer
+
+        if threads:
+            torch.set_num_threads(threads)
+        self.torch = torch
+        self.model_id = model_id
+        start = time.perf_counter()
+        self.tokenizer = AutoTokenizer.from_pretrained(model_id, padding_side="left")
+        if self.tokenizer.pad_token is None:
+            self.tokenizer.pad_token = self.tokenizer.eos_token
+        self.model = AutoModelForCausalLM.from_pretrained(
+            model_id,
+            use_safetensors=True,
+            low_cpu_mem_usage=True,
+            torch_dtype=torch.float32,
+        )
+        self.model.eval()
+        self.load_seconds = time.perf_counter() - start
+        logger.info("loaded %s in %.1fs", model_id, self.load_seconds)
+
+    def generate(self, requests: List[GenerationRequest]) -> List[Dict]:
+        """Generate completions for requests that share a sampling key."""
+        prompts = [
+            self.tokenizer.apply_chat_template(request.messages, add_generation_prompt=True, tokenize=False)
+            for request in requests
+        ]
+        inputs = self.tokenizer(prompts, return_tensors="pt", padding=True, add_special_tokens=False)
+        do_sample, temperature, top_p = requests[0].sampling_key
+        sampling = dict(do_sample=True, temperature=temperature, top_p=top_p) if do_sample else dict(do_sample=False)
+        with self.torch.inference_mode():
+            output = self.model.generate(
+                **inputs,
+                max_new_tokens=max(request.max_tokens for request in requests),
+                pad_token_id=self.tokenizer.pad_token_id,
+                **sampling,
+            )
+
+        prompt_length = inputs["input_ids"].shape[1]
+        results = []
+        for row, request in enumerate(requests):
+            new_tokens = output[row, prompt_length:prompt_length + request.max_tokens].tolist()
+            finish_reason = "length"
+            if self.tokenizer.eos_token_id in new_tokens:
+                new_tokens = new_tokens[:new_tokens.index(self.tokenizer.eos_token_id)]
+                finish_reason = "stop"
+            text = self.tokenizer.decode(new_tokens, skip_special_tokens=True)
+            for stop in request.stop:
+                if stop and stop in text:
+                    text, finish_reason = text[:text.index(stop)], "stop"
+            results.append({
+                "text": text.strip(),
+                "finish_reason": finish_reason,
+                "prompt_tokens": int(inputs["attention_mask"][row].sum()),
+                "completion_tokens": len(new_tokens),
+            })
+        return results
+
+
+# ---------------- Dynamic batching ---------------- #
+
+class DynamicBatcher:
+    """Collects concurrent requests into batches for a single generation thread.
+
+    The worker blocks for the first request, then keeps accepting more for
+    up to ``max_wait_ms`` or until ``max_batch_size`` are queued, and runs the
+    batch through ``engine.generate`` one sampling group at a time.
+    """
+
+    def __init__(self, engine, max_batch_size=8, max_wait_ms=20.0):
+        self.engine = engine
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self.batches = 0
+        self.requests = 0
+        self.batch_sizes: Dict[int, int] = {}
+        self._thread = threading.Thread(target=self._run, name="hf-batcher", daemon=True)
+        self._thread.start()
+
+    def submit(self, request: GenerationRequest) -> Future:
+        self._queue.put(request)
+        return request.future
+
+    def _collect(self):
+        batch = [self._queue.get()]
+        deadline = time.perf_counter() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            groups: Dict[tuple, List[GenerationRequest]] = {}
+            for request in batch:
+                groups.setdefault(request.sampling_key, []).append(request)
+            for group in groups.values():
+                try:
+                    results = self.engine.generate(group)
+                except Exception as e:
+                    for request in group:
+                        request.future.set_exception(e)
+                    continue
+                for request, result in zip(group, results):
+                    request.future.set_result(result)
+            with self._lock:
+                self.batches += 1
+                self.requests += len(batch)
+                self.batch_sizes[len(batch)] = self.batch_sizes.get(len(batch), 0) + 1
+
+    def stats(self):
+        with self._lock:
+            return {
+                "batches": self.batches,
+                "requests": self.requests,
+                "mean_batch_size": round(self.requests / self.batches, 2) if self.batches else 0.0,
+                "batch_sizes": dict(sorted(self.batch_sizes.items())),
+                "queued": self._queue.qsize(),
+            }
+
+
+# ---------------- OpenAI-compatible HTTP API ---------------- #
+
+def _message_text(content):
+    # OpenAI content may be a list of typed parts; only text parts are used.
+    if isinstance(content, list):
+        return "".join(part.get("text", "") for part in content if isinstance(part, dict))
+    return content or ""
+
+
+def completion_response(model, result, request_id):
+    return {
+        "id": request_id,
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [{
+            "index": 0,
+            "message": {"role": "assistant", "content": result["text"]},
+            "finish_reason": result["finish_reason"],
+        }],
+        "usage": {
+            "prompt_tokens": result["prompt_tokens"],
+            "completion_tokens": result["completion_tokens"],
+            "total_tokens": result["prompt_tokens"] + result["completion_tokens"],
+        },
+    }
+
+
+def stream_chunks(model, result, request_id):
+    base = {"id": request_id, "object": "chat.completion.chunk", "created": int(time.time()), "model": model}
+    yield {**base, "choices": [{"index": 0, "delta": {"role": "assistant", "content": result["text"]}, "finish_reason": None}]}
+    yield {**base, "choices": [{"index": 0, "delta": {}, "finish_reason": result["finish_reason"]}],
+           "usage": completion_response(model, result, request_id)["usage"]}
+
+
+def make_handler(batcher, model_id, timeout=300.0):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def _send_json(self, status, payload):
+            body = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _error(self, status, message, kind="invalid_request_error"):
+            self._send_json(status, {"error": {"message": message, "type": kind}})
+
+        def do_GET(self):
+            if self.path.rstrip("/") == "/v1/models":
+                self._send_json(200, {"object": "list", "data": [{"id": model_id, "object": "model", "owned_by": "local"}]})
+            elif self.path.rstrip("/") == "/health":
+                self._send_json(200, {"status": "ok", "model": model_id, **batcher.stats()})
+            else:
+                self._error(404, f"Unknown path {self.path}")
+
+        def do_POST(self):
+            if self.path.rstrip("/") != "/v1/chat/completions":
+                self._error(404, f"Unknown path {self.path}")
+                return
+            try:
+                body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+                messages = [{"role": m["role"], "content": _message_text(m.get("content"))} for m in body["messages"]]
+            except (ValueError, KeyError, TypeError) as e:
+                self._error(400, f"Invalid request body: {e}")
+                return
+
+            request = GenerationRequest(
+                messages,
+                max_tokens=int(body.get("max_tokens") or body.get("max_completion_tokens") or DEFAULT_MAX_TOKENS),
+                temperature=float(body.get("temperature", 1.0)),
+                top_p=float(body.get("top_p", 1.0)),
+                stop=body.get("stop"),
+            )
+            try:
+                result = batcher.submit(request).result(timeout)
+            except Exception as e:
+                self._error(500, f"{type(e).__name__}: {e}", kind="server_error")
+                return
+
+            request_id = f"chatcmpl-{uuid.uuid4().hex}"
+            if not body.get("stream"):
+                self._send_json(200, completion_response(model_id, result, request_id))
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Cache-Control", "no-cache")
+            self.send_header("Connection", "close")
+            self.end_headers()
+            for chunk in stream_chunks(model_id, result, request_id):
+                self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+            self.wfile.write(b"data: [DONE]\n\n")
+            self.close_connection = True
+
+        def log_message(self, format, *args):
+            logger.debug("%s " + format, self.address_string(), *args)
+
+    return Handler
+
+
+def serve(engine, host="127.0.0.1", port=8008, max_batch_size=8, max_wait_ms=20.0):
+    """Start the HTTP server in front of ``engine`` and block until interrupted."""
+    batcher = DynamicBatcher(engine, max_batch_size=max_batch_size, max_wait_ms=max_wait_ms)
+    server = ThreadingHTTPServer((host, port), make_handler(batcher, engine.model_id))
+    server.daemon_threads = True
+    print(f"serving {engine.model_id} at http://{host}:{port}/v1 (batch <= {max_batch_size}, wait {max_wait_ms:g} ms)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(f"batcher: {batcher.stats()}")
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--model", default=DEFAULT_MODEL_ID)
+    arg_parser.add_argument("--host", default="127.0.0.1")
+    arg_parser.add_argument("--port", type=int, default=int(os.getenv("LOCAL_LLM_PORT", "8008")))
+    arg_parser.add_argument("--max-batch-size", type=int, default=8)
+    arg_parser.add_argument("--max-wait-ms", type=float, default=20.0, help="How long to hold a batch open for more requests")
+    arg_parser.add_argument("--threads", type=int, help="torch CPU threads (default: torch's choice)")
+    args = arg_parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    engine = TinyLlamaEngine(args.model, threads=args.threads)
+    print(f"model loaded in {engine.load_seconds:.1f}s")
+    serve(engine, args.host, args.port, args.max_batch_size, args.max_wait_ms)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,375 @@
+"""Route chat requests across providers by rolling latency and error rate.
+
+Usage:
+    from model_router import create_router
+    llm = create_router()                     # drop-in for ChatGroq / ChatOpenAI
+    chain = prompt | llm | parser
+
+    python Models/model_router.py             # small demo that prints the backend stats
+
+``ModelRouter`` is a chat model, so it works anywhere ``llm`` does: plain
+chains, ``with_structured_output``, ``bind_tools``, streaming and batch.
+For every request it ranks the remote backends by their recent p50 latency
+(weighted by error rate), skipping any whose error rate has tripped the
+breaker. If the chosen backend has not answered within its own p95, one
+duplicate request is sent to the next backend and the first reply wins.
+When every remote backend fails, or every breaker is open, the local
+HuggingFace pipeline answers. It has no tool calling, so requests with
+tools (including ``with_structured_output``) raise the remote error instead.
+
+Backends come from ``MODEL_ROUTER_BACKENDS`` (comma separated
+``provider:model``, default ``groq:llama-3.1-8b-instant,openai:gpt-4o-mini``);
+providers without an API key in the environment are left out.
+"""
+import logging
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, List, Optional
+
+from dotenv import load_dotenv
+from langchain_core.callbacks import CallbackManager
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from langchain_core.utils.function_calling import convert_to_openai_tool
+from pydantic import ConfigDict, PrivateAttr
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BACKENDS = os.getenv("MODEL_ROUTER_BACKENDS", "groq:llama-3.1-8b-instant,openai:gpt-4o-mini")
+LOCAL_MODEL_ID = os.getenv("LOCAL_MODEL_ID", "TinyLlama/TinyLlama-1.1B-Chat-v1.0")
+LOCAL_BASE_URL = os.getenv("LOCAL_LLM_BASE_URL", "http://127.0.0.1:8008/v1")
+FALLBACK = "local"
+
+API_KEYS = {"groq": "GROQ_API_KEY", "openai": "OPENAI_API_KEY"}
+
+
+# ---------------- Rolling stats ---------------- #
+
+class BackendStats:
+    """Latency and outcome of a backend's last ``window`` calls."""
+
+    def __init__(self, window=100):
+        self._calls = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self.opened_at = None
+        self.hedges = 0
+        self.hedge_wins = 0
+
+    def record(self, seconds, ok):
+        with self._lock:
+            self._calls.append((seconds, ok))
+
+    def latencies(self):
+        with self._lock:
+            return sorted(seconds for seconds, ok in self._calls if ok)
+
+    def quantile(self, q):
+        latencies = self.latencies()
+        if not latencies:
+            return None
+        return latencies[min(len(latencies) - 1, int(q * len(latencies)))]
+
+    @property
+    def samples(self):
+        return len(self._calls)
+
+    @property
+    def error_rate(self):
+        with self._lock:
+            if not self._calls:
+                return 0.0
+            return sum(not ok for _, ok in self._calls) / len(self._calls)
+
+    def snapshot(self):
+        p50, p95 = self.quantile(0.5), self.quantile(0.95)
+        return {
+            "samples": self.samples,
+            "error_rate": round(self.error_rate, 3),
+            "p50_s": round(p50, 3) if p50 is not None else None,
+            "p95_s": round(p95, 3) if p95 is not None else None,
+            "hedges": self.hedges,
+            "hedge_wins": self.hedge_wins,
+            "breaker_open": self.opened_at is not None,
+        }
+
+
+# ---------------- Router ---------------- #
+
+class ModelRouter(BaseChatModel):
+    """Chat model that forwards each request to the best-performing backend.
+
+    ``backends`` maps a name to a chat model and is tried in ranked order;
+    ``fallback`` (or ``fallback_factory``, built on first use) answers when
+    all of them fail. Stats are kept per router instance, so share one
+    router across a process to get useful rankings.
+    """
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    backends: Dict[str, Any]
+    fallback: Optional[Any] = None
+    fallback_factory: Optional[Callable[[], Any]] = None
+    hedge_quantile: float = 0.95
+    min_samples: int = 10
+    window: int = 100
+    error_threshold: float = 0.5
+    cooldown_s: float = 30.0
+    max_workers: int = 16
+
+    _stats: Dict[str, BackendStats] = PrivateAttr()
+    _executor: ThreadPoolExecutor = PrivateAttr()
+    _lock: Any = PrivateAttr()
+
+    def model_post_init(self, __context):
+        self._stats = {name: BackendStats(self.window) for name in [*self.backends, FALLBACK]}
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="model-router")
+        self._lock = threading.Lock()
+
+    @property
+    def _llm_type(self):
+        return "model-router"
+
+    @property
+    def _identifying_params(self):
+        return {"backends": list(self.backends)}
+
+    def bind_tools(self, tools, *, tool_choice=None, **kwargs):
+        # Same OpenAI tool format ChatGroq and ChatOpenAI bind themselves.
+        formatted = [convert_to_openai_tool(tool) for tool in tools]
+        if tool_choice == "any":
+            tool_choice = "required"
+        if isinstance(tool_choice, str) and tool_choice not in ("auto", "none", "required"):
+            tool_choice = {"type": "function", "function": {"name": tool_choice}}
+        if tool_choice:
+            kwargs["tool_choice"] = tool_choice
+        return self.bind(tools=formatted, **kwargs)
+
+    def stats(self):
+        """Per-backend rolling stats, for dashboards and benchmarks."""
+        return {name: stats.snapshot() for name, stats in self._stats.items()}
+
+    # -- ranking -- #
+
+    def _available(self, name):
+        stats = self._stats[name]
+        if stats.opened_at is not None:
+            if time.monotonic() - stats.opened_at < self.cooldown_s:
+                return False
+            stats.opened_at = None  # half-open: let the next request probe it
+        return True
+
+    def ranked_backends(self) -> List[str]:
+        """Healthy backends, best first: unmeasured ones, then by error-weighted p50.
+
+        Empty while every breaker is open, so requests go to the fallback until a cooldown ends.
+        """
+        def score(name):
+            stats = self._stats[name]
+            if stats.samples < self.min_samples:
+                return (0, stats.samples)
+            p50 = stats.quantile(0.5)
+            return (1, (p50 if p50 is not None else float("inf")) * (1 + 4 * stats.error_rate))
+
+        return sorted((name for name in self.backends if self._available(name)), key=score)
+
+    def _hedge_after(self, name):
+        stats = self._stats[name]
+        if stats.samples < self.min_samples:
+            return None
+        return stats.quantile(self.hedge_quantile)
+
+    def _record(self, name, seconds, ok):
+        stats = self._stats[name]
+        stats.record(seconds, ok)
+        if not ok and stats.samples >= self.min_samples and stats.error_rate > self.error_threshold:
+            if stats.opened_at is None:
+                logger.warning("model router: opening breaker for %s (error rate %.0f%%)", name, stats.error_rate * 100)
+            stats.opened_at = time.monotonic()
+
+    def _call(self, name, model, messages, stop, config, kwargs):
+        start = time.perf_counter()
+        try:
+            message = model.invoke(messages, config=config, stop=stop, **kwargs)
+        except Exception:
+            self._record(name, time.perf_counter() - start, ok=False)
+            raise
+        self._record(name, time.perf_counter() - start, ok=True)
+        return message
+
+    def _fallback_model(self):
+        with self._lock:
+            if self.fallback is None and self.fallback_factory is not None:
+                self.fallback = self.fallback_factory()
+        return self.fallback
+
+    def _config(self, run_manager, name):
+        config = {"metadata": {"router_backend": name}}
+        if run_manager is not None:
+            # Nest the backend's run under the router's, as a chain does for its steps.
+            callbacks = CallbackManager(handlers=[], parent_run_id=run_manager.run_id)
+            callbacks.set_handlers(run_manager.inheritable_handlers)
+            callbacks.add_tags(run_manager.inheritable_tags)
+            callbacks.add_metadata(run_manager.inheritable_metadata)
+            config["callbacks"] = callbacks
+        return config
+
+    # -- sync -- #
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        queue = self.ranked_backends()
+        pending, errors = {}, []
+        primary = hedge = None
+
+        def submit(name):
+            future = self._executor.submit(
+                self._call, name, self.backends[name], messages, stop, self._config(run_manager, name), kwargs
+            )
+            pending[future] = name
+            return future
+
+        while pending or queue:
+            if not pending:
+                primary, hedge = queue.pop(0), None
+                submit(primary)
+            hedge_after = self._hedge_after(primary) if hedge is None else None
+            done, _ = wait(pending, timeout=hedge_after, return_when=FIRST_COMPLETED)
+            if not done:
+                # Slower than this backend's p95: race one duplicate on the next backend (or the same one).
+                self._stats[primary].hedges += 1
+                hedge = submit(queue.pop(0) if queue else primary)
+                continue
+            for future in done:
+                name = pending.pop(future)
+                try:
+                    message = future.result()
+                except Exception as e:
+                    errors.append((name, e))
+                    continue
+                if future is hedge:
+                    self._stats[primary].hedge_wins += 1
+                message.response_metadata = {**message.response_metadata, "router_backend": name}
+                return ChatResult(generations=[ChatGeneration(message=message)])
+
+        return ChatResult(generations=[ChatGeneration(message=self._invoke_fallback(messages, stop, run_manager, kwargs, errors))])
+
+    def _invoke_fallback(self, messages, stop, run_manager, kwargs, errors):
+        # The local pipeline has no tool calling; answering without the tools would return no tool call.
+        fallback = None if "tools" in kwargs else self._fallback_model()
+        if fallback is None:
+            self._raise(errors)
+        logger.warning("model router: no remote backend answered (%s); using the local model",
+                       ", ".join(f"{name}: {type(e).__name__}" for name, e in errors) or "all breakers open")
+        message = self._call(FALLBACK, fallback, messages, stop, self._config(run_manager, FALLBACK), kwargs)
+        message.response_metadata = {**message.response_metadata, "router_backend": FALLBACK}
+        return message
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs):
+        # Streams are not hedged; a backend that fails before its first chunk is skipped.
+        errors = []
+        for name in [*self.ranked_backends(), FALLBACK]:
+            if name == FALLBACK:
+                # As in _invoke_fallback: the local model cannot answer a request with tools.
+                model = None if "tools" in kwargs else self._fallback_model()
+            else:
+                model = self.backends[name]
+            if model is None:
+                break
+            start, started = time.perf_counter(), False
+            try:
+                for chunk in model.stream(messages, config=self._config(run_manager, name), stop=stop, **kwargs):
+                    started = True
+                    chunk.response_metadata = {**chunk.response_metadata, "router_backend": name}
+                    yield ChatGenerationChunk(message=chunk)
+            except Exception as e:
+                self._record(name, time.perf_counter() - start, ok=False)
+                if started:
+                    raise
+                errors.append((name, e))
+                continue
+            self._record(name, time.perf_counter() - start, ok=True)
+            return
+        self._raise(errors)
+
+    def _raise(self, errors):
+        if errors:
+            raise errors[-1][1]
+        raise ValueError(
+            "ModelRouter has no available backend (none configured, or every breaker is open) "
+            "and no fallback model that can take this request"
+        )
+
+
+# ---------------- Factories ---------------- #
+
+def make_backend(spec, **model_kwargs):
+    """Build a chat model from a ``provider:model`` spec.
+
+    Providers: ``groq``, ``openai`` and ``local`` (the OpenAI-compatible
+    ``huggingface_server.py`` at ``LOCAL_LLM_BASE_URL``).
+    """
+    provider, _, model = spec.partition(":")
+    if provider == "groq":
+        from langchain_groq import ChatGroq
+        return ChatGroq(model=model, **model_kwargs)
+    if provider == "openai":
+        from langchain_openai import ChatOpenAI
+        return ChatOpenAI(model=model, **model_kwargs)
+    if provider == "local":
+        from langchain_openai import ChatOpenAI
+        return ChatOpenAI(model=model or LOCAL_MODEL_ID, base_url=LOCAL_BASE_URL, api_key="local", **model_kwargs)
+    raise ValueError(f"Unknown provider {provider!r} in {spec!r} (expected groq, openai or local)")
+
+
+def local_huggingface_model(model_id=LOCAL_MODEL_ID, max_new_tokens=256, temperature=0.5):
+    """An in-process TinyLlama pipeline; slow to load, so built on demand.
+
+    Prefer a ``local:`` backend pointing at ``huggingface_server.py`` when
+    that server is running; this is the last resort when it is not.
+    """
+    from langchain_huggingface import ChatHuggingFace, HuggingFacePipeline
+
+    llm = HuggingFacePipeline.from_model_id(
+        model_id=model_id,
+        task="text-generation",
+        pipeline_kwargs=dict(temperature=temperature, max_new_tokens=max_new_tokens),
+    )
+    return ChatHuggingFace(llm=llm)
+
+
+def create_router(backends=DEFAULT_BACKENDS, fallback_factory=local_huggingface_model, **router_kwargs):
+    """A ModelRouter over ``backends`` (a spec string or list) with the local model as fallback.
+
+    ``router_kwargs`` go to ``ModelRouter`` except ``temperature``, which is
+    passed to every remote backend.
+    """
+    model_kwargs = {key: router_kwargs.pop(key) for key in ("temperature",) if key in router_kwargs}
+    specs = [spec.strip() for spec in backends.split(",")] if isinstance(backends, str) else list(backends)
+    models = {}
+    for spec in specs:
+        key_name = API_KEYS.get(spec.partition(":")[0])
+        if key_name and not os.getenv(key_name):
+            logger.info("model router: skipping %s (%s not set)", spec, key_name)
+            continue
+        models[spec] = make_backend(spec, **model_kwargs)
+    return ModelRouter(backends=models, fallback_factory=fallback_factory, **router_kwargs)
+
+
+if __name__ == "__main__":
+    from langchain_core.output_parsers import StrOutputParser
+    from langchain_core.prompts import PromptTemplate
+
+    router = create_router()
+    prompt = PromptTemplate(
+        template="Generate 5 facts on the following topic: {topic}",
+        input_variables=["topic"],
+    )
+    chain = prompt | router | StrOutputParser()
+    for topic in ["Milky Way Galaxy", "Black Holes", "Neutron Stars"]:
+        print(chain.invoke({"topic": topic})[:200], "...\n")
+    for name, stats in router.stats().items():
+        print(name, stats)
@@ -1,8 +1,12 @@
 import os
 import streamlit as st
-import asyncio
 from io import BytesIO
 from generator import BlogPostGenerator
+from history_export import cached_export, export_history
+from image_artifact import ImageArtifact
+from resources import get_loop_service, registry
+# Imported after resources, which puts the repository root on sys.path.
+from history_store import HistoryStore, SessionHistory, preview
 import base64
 from io import BytesIO
 
@@ -21,6 +25,21 @@ def load_image_as_base64(image_path):
     with open(image_path, "rb") as img_file:
         return base64.b64encode(img_file.read()).decode()
 
+HISTORY_PAGE_SIZE = 5
+
+def get_history():
+    """This session's history; full entries and images live in the shared on-disk store."""
+    return SessionHistory(st.session_state, registry.get("history_store", HistoryStore))
+
+@st.cache_data(max_entries=64)
+def history_thumbnail(entry_id, _image_bytes):
+    """Thumbnail for a history entry, encoded once per entry id and reused across reruns."""
+    return ImageArtifact(_image_bytes).thumbnail_bytes()
+
+def get_generator():
+    """Build the generator (model clients, prompts, chain) once per process (cached in the registry)."""
+    return registry.get("blog_post_generator", BlogPostGenerator)
+
 # ------------------------------ UI Styling ------------------------------
 st.markdown(
     """
@@ -148,6 +167,10 @@ st.sidebar.markdown(
 
 history_enabled = st.sidebar.checkbox("Enable History Log", value=True)
 
+# Warm-up cost of the shared model clients (paid once per process)
+if registry.warmup_seconds:
+    st.sidebar.caption(f"Model clients warmed up in {registry.total_warmup_seconds():.2f}s")
+
 
 
 # ------------------------------ Title & Subtitle ------------------------------
@@ -225,28 +248,25 @@ col3.markdown(f"**✍️ Word Count:** {word_count}")
 # ------------------------------ Generate Button ------------------------------
 if st.button(" Generate Content"):
     with st.spinner("⏳ Generating..."):
-        generator = BlogPostGenerator()
         try:
-            result = asyncio.run(generator.generate(topic, target_audience, tone, int(word_count)))
+            generator = get_generator()
+            # Runs on the shared loop, overlapping with other sessions' generations
+            result = get_loop_service().run(generator.generate(topic, target_audience, tone, int(word_count)))
             st.session_state['generated_text'] = result.get("text", "")
             st.session_state['generated_image'] = result.get("image", None)
             
             # Log history only when "Generate Content" is clicked
             if history_enabled:
-                if "history" not in st.session_state:
-                    st.session_state["history"] = []
-
                 img_bytes = None
                 if st.session_state['generated_image']:
-                    buffered = BytesIO()
-                    st.session_state['generated_image'].save(buffered, format="PNG")
-                    img_bytes = buffered.getvalue()
-
-                st.session_state["history"].append({
-                    "topic": topic,
-                    "response": st.session_state['generated_text'],
-                    "image_bytes": img_bytes  # Store image bytes in history
-                })
+                    img_bytes = st.session_state['generated_image'].png_bytes
+
+                # Only the summary stays in session state; text and image go to the store
+                get_history().add(
+                    {"topic": topic, "preview": preview(st.session_state['generated_text']), "has_image": img_bytes is not None},
+                    {"topic": topic, "response": st.session_state['generated_text']},
+                    blob=img_bytes,
+                )
                 
         except Exception as e:
             st.error(f"⚠️ An error occurred: {e}")
@@ -255,11 +275,9 @@ if st.button(" Generate Content"):
 # ------------------------------ Display Generated Image ------------------------------
 if "generated_image" in st.session_state and st.session_state['generated_image']:
     st.markdown("### 🖼️ Generated Image")
-    st.image(st.session_state['generated_image'], caption=f"Generated image for '{topic}'")
-
-    buffered = BytesIO()
-    st.session_state['generated_image'].save(buffered, format="PNG")
-    img_bytes = buffered.getvalue()
+    # The artifact's original bytes are shown and downloaded as-is, without re-encoding
+    img_bytes = st.session_state['generated_image'].png_bytes
+    st.image(img_bytes, caption=f"Generated image for '{topic}'")
 
     st.download_button(
         label="⬇️ Download Image",
@@ -276,39 +294,35 @@ if "generated_text" in st.session_state:
 
 
 # ------------------------------ Display History ------------------------------
-if history_enabled and "history" in st.session_state and st.session_state["history"]:
+history = get_history()
+if history_enabled and len(history):
     with st.expander("📜 View Query History"):
-        # Create a ZIP file containing the history text and images
-        import zipfile
-        import io
-
-        zip_buffer = io.BytesIO()
-        with zipfile.ZipFile(zip_buffer, "w", zipfile.ZIP_DEFLATED) as zip_file:
-            history_text = ""
-            # Add images from history if available
-            for idx, entry in enumerate(reversed(st.session_state["history"]), 1):
-                if entry["image_bytes"]:
-                    image_filename = f"history_image_{idx}.png"
-                    zip_file.writestr(image_filename, entry["image_bytes"])
-            # Add text content to the history file         
-            for idx, entry in enumerate(reversed(st.session_state["history"]), 1):
-                history_text += f"Query {idx}:\nTopic: {entry['topic']}\nResponse:\n{entry['response']}\n\n"
-            zip_file.writestr("query_history.txt", history_text)
-
-            
-        zip_buffer.seek(0)
-        
-        st.download_button(
-            label="⬇️ Download History (Text & Images)",
-            data=zip_buffer,
-            file_name="query_history.zip",
-            mime="application/zip"
-        )
-
-        # Display the history log
-        for idx, entry in enumerate(reversed(st.session_state["history"]), 1):
-            if entry["image_bytes"]:
-                st.image(BytesIO(entry["image_bytes"]), caption=f"Image for '{entry['topic']}'")
+        # The ZIP reads every stored entry and image, so it is only built on request and then
+        # reused until the history changes.
+        archive = cached_export(history)
+        if archive is None and st.button("📦 Prepare Download"):
+            with st.spinner("Packing history..."):
+                archive = export_history(history)
+        if archive is not None:
+            st.download_button(
+                label="⬇️ Download History (Text & Images)",
+                data=archive,
+                file_name="query_history.zip",
+                mime="application/zip"
+            )
+
+        # Render one page of the history log per rerun
+        page_count = history.page_count(HISTORY_PAGE_SIZE)
+        page = st.number_input("Page", min_value=1, max_value=page_count, value=1, step=1) if page_count > 1 else 1
+        st.caption(f"{len(history)} queries stored (newest first, at most {history.store.max_entries} kept)")
+
+        offset = (page - 1) * HISTORY_PAGE_SIZE
+        for idx, summary in enumerate(history.page(page, HISTORY_PAGE_SIZE), offset + 1):
+            entry, image_bytes = history.load(summary)
+            if entry is None:
+                continue
+            if image_bytes:
+                st.image(history_thumbnail(summary["id"], image_bytes), caption=f"Image for '{entry['topic']}'")
             st.markdown(f"**Query {idx}:**")
             st.write(f"**Topic:** {entry['topic']}")
             st.write(f"**Response:** {entry['response']}")
@@ -1,14 +1,10 @@
 import asyncio
-from langchain_openai import ChatOpenAI
-from langchain_google_vertexai.vision_models import VertexAIImageGeneratorChat
 from langchain_core.prompts import PromptTemplate
 from vertexai import init
 from langchain_core.output_parsers import StrOutputParser
 from langchain.schema.runnable import RunnableParallel
-from langchain_groq import ChatGroq
-import io
-from PIL import Image
-import base64
+from image_artifact import ImageArtifact
+from resources import get_chat_model, get_image_generator, get_tracer
 from dotenv import load_dotenv
 
 # Load environment variables
@@ -20,17 +16,18 @@ init(project="nomadic-mesh-454105-a2", location="us-central1")
 #  Core logic class
 class BlogPostGenerator:
     """Class to generate a blog post with an image for a given topic."""
-    def __init__(self):
+    def __init__(self, llm=None, image_generator=None):
+        # Model clients default to the process-wide instances in ``resources``
         # Image generation prompt
         self.prompt1 = PromptTemplate(
             template="generate an centered image of {topic}",
             input_variables=["topic"],
         )
         
-        self.generator = VertexAIImageGeneratorChat()
+        self.generator = image_generator or get_image_generator()
         
         # Text generation prompt
-        self.llm = ChatGroq( model="llama-3.3-70b-versatile")
+        self.llm = llm or get_chat_model("llama-3.3-70b-versatile")
    
         self.prompt2 = PromptTemplate(
             template = """
@@ -71,27 +68,33 @@ class BlogPostGenerator:
 
     async def generate(self, topic, target_audience="general", tone="informative", count=500):
         """Runs the async generation logic for image and text."""
-        response = await self.parallel_chain.ainvoke({'topic': topic, 'audience': target_audience, 'tone': tone, 'word_count':count})
+        tracer = get_tracer()
+        with tracer.span("blog.request", topic=topic, audience=target_audience, tone=tone, word_count=count):
+            with tracer.span("blog.generate"):
+                response = await self.parallel_chain.ainvoke(
+                    {'topic': topic, 'audience': target_audience, 'tone': tone, 'word_count':count},
+                    config=tracer.config(),
+                )
 
-        result = {
-            "text": response['text'],
-            "image": None
-        }
+            result = {
+                "text": response['text'],
+                "image": None
+            }
 
-        # Check if image generation was successful
-        if response.get('image'):
-            try:
-                # Extract the image URL or base64 response
-                generated_image = response['image'].content[0]
+            # Check if image generation was successful
+            if response.get('image'):
+                try:
+                    # Extract the image URL or base64 response
+                    generated_image = response['image'].content[0]
 
-                # Extract base64 string
-                img_base64 = generated_image["image_url"]["url"].split(",")[-1]
+                    # Keep the encoded bytes; decode the base64 payload off the event loop
+                    with tracer.span("blog.image_decode") as decode_span:
+                        result['image'] = await asyncio.to_thread(
+                            ImageArtifact.from_data_url, generated_image["image_url"]["url"]
+                        )
+                        decode_span.attributes["bytes"] = len(result['image'])
 
-                # Convert base64 to PIL image
-                img = Image.open(io.BytesIO(base64.decodebytes(bytes(img_base64, "utf-8"))))
-                result['image'] = img
-
-            except Exception as e:
-                print(f"Image processing failed: {e}")
+                except Exception as e:
+                    print(f"Image processing failed: {e}")
 
         return result
@@ -0,0 +1,30 @@
+import zipfile
+
+
+def _format_record(idx, entry):
+    return f"Query {idx}:\nTopic: {entry['topic']}\nResponse:\n{entry['response']}\n\n"
+
+
+def write_history_zip(history, fileobj):
+    """Stream ``history`` into a ZIP with one PNG per entry and ``query_history.txt``.
+
+    Images are written entry by entry as they are read from the store; only
+    the text of the entries is held until the end.
+    """
+    texts = []
+    with zipfile.ZipFile(fileobj, "w", zipfile.ZIP_DEFLATED) as zip_file:
+        for idx, (_, entry, image_bytes) in enumerate(history.store.iter_entries(history.session_id), 1):
+            if image_bytes:
+                zip_file.writestr(f"history_image_{idx}.png", image_bytes)
+            texts.append(_format_record(idx, entry))
+        zip_file.writestr("query_history.txt", "".join(texts))
+
+
+def export_history(history):
+    """Return the history ZIP bytes, rebuilding only when the history version changed."""
+    return history.export(write_history_zip)
+
+
+def cached_export(history):
+    """The cached archive if it is still current, else ``None`` (never builds one)."""
+    return history.cached_export()
@@ -0,0 +1,66 @@
+import base64
+import io
+
+from PIL import Image
+
+THUMBNAIL_SIZE = (256, 256)
+
+
+class ImageArtifact:
+    """A generated image kept as its original encoded bytes.
+
+    The bytes go straight to ``st.image``, the download button and the
+    history store. The PIL view is only decoded when something needs pixels
+    (a thumbnail, or a re-encode for a non-PNG source), and every derived
+    encoding is computed at most once.
+    """
+
+    def __init__(self, data, mime_type="image/png"):
+        self.data = bytes(data)
+        self.mime_type = mime_type
+        self._image = None
+        self._png = None
+        self._thumbnails = {}
+
+    @classmethod
+    def from_data_url(cls, url):
+        """Decode a ``data:<mime>;base64,<payload>`` URL (or a bare base64 payload)."""
+        comma = url.find(",")
+        header = url[:comma] if comma >= 0 else ""
+        mime_type = header[5:].split(";")[0] if header.startswith("data:") else "image/png"
+        # b64decode takes the ASCII str as is; only the payload slice is copied.
+        return cls(base64.b64decode(url[comma + 1:]), mime_type or "image/png")
+
+    @property
+    def image(self):
+        """The decoded PIL image, loaded on first access."""
+        if self._image is None:
+            image = Image.open(io.BytesIO(self.data))
+            image.load()
+            self._image = image
+        return self._image
+
+    @property
+    def png_bytes(self):
+        """PNG-encoded bytes: the original data for PNG sources, otherwise one cached re-encode."""
+        if self.mime_type == "image/png":
+            return self.data
+        if self._png is None:
+            buffered = io.BytesIO()
+            self.image.save(buffered, format="PNG")
+            self._png = buffered.getvalue()
+        return self._png
+
+    def thumbnail_bytes(self, size=THUMBNAIL_SIZE):
+        """A cached PNG thumbnail no larger than ``size``."""
+        thumbnail = self._thumbnails.get(size)
+        if thumbnail is None:
+            image = self.image.copy()
+            image.thumbnail(size)
+            buffered = io.BytesIO()
+            image.save(buffered, format="PNG")
+            thumbnail = self._thumbnails[size] = buffered.getvalue()
+        return thumbnail
+
+    def __len__(self):
+        return len(self.data)
@@ -0,0 +1,17 @@
+import os
+import sys
+
+from langchain_google_vertexai.vision_models import VertexAIImageGeneratorChat
+
+# Shared with the Quiz app: the registry, Groq clients, background loop and tracing at the repository root.
+REPO_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..")
+if REPO_ROOT not in sys.path:
+    sys.path.append(REPO_ROOT)
+
+from resource_registry import get_chat_model, get_loop_service, registry  # noqa: E402
+from tracing import get_tracer  # noqa: E402
+
+
+def get_image_generator():
+    """Return the process-wide Vertex AI image generator (keeps its gRPC channel open)."""
+    return registry.get("image_generator", VertexAIImageGeneratorChat)
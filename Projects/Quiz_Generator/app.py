@@ -1,11 +1,27 @@
 import os
 import streamlit as st
 import base64
-import zipfile
-import io
-import json
+import time
 from io import BytesIO
+from history_export import cached_export, export_history
 from model import StudyMaterialGenerator
+from resources import get_loop_service, registry
+# Imported after resources, which puts the repository root on sys.path.
+from history_store import HistoryStore, SessionHistory, preview
+
+HISTORY_PAGE_SIZE = 5
+
+# ------------------------------ Shared Resources ------------------------------
+def get_generator(combined_solution=False):
+    """Build the generator (LLM clients, prompts, chains) once per process (cached in the registry)."""
+    return registry.get(
+        f"study_material_generator:{combined_solution}",
+        lambda: StudyMaterialGenerator(combined_solution=combined_solution),
+    )
+
+def get_history():
+    """This session's history; full entries live in the shared on-disk store."""
+    return SessionHistory(st.session_state, registry.get("history_store", HistoryStore))
 
 # ------------------------------ Utility Functions ------------------------------
 def load_image_as_base64(image_path):
@@ -111,6 +127,48 @@ def get_answer_letter(quiz_item, answer_text):
     except (ValueError, IndexError):
         return "?"  # Return a placeholder if we can't determine the letter
 
+def stream_study_material(generator, topic):
+    """Run the streaming pipeline, showing partial results; returns (material, timings)."""
+    explanation_box = st.empty()
+    notes_box = st.empty()
+    quiz_box = st.empty()
+    explanation, notes, questions, solved = "", [], [], 0
+    for event in get_loop_service().iter_async(generator.astream_study_material(topic)):
+        stage = event["stage"]
+        if stage == "explanation":
+            explanation += event["delta"]
+            explanation_box.markdown(f"#### 📚 Explanation\n{explanation}")
+        elif stage == "notes":
+            notes.append(event["delta"])
+            notes_box.markdown("#### 📝 Notes\n" + "\n\n".join(notes))
+        elif stage in ("quiz_item", "solution"):
+            if stage == "quiz_item":
+                questions.append(event["item"]["question"])
+            else:
+                solved += 1
+            quiz_box.markdown(
+                f"#### ❓ Quiz ({len(questions)} questions, {solved} solved)\n"
+                + "\n".join(f"- {q}" for q in questions)
+            )
+        elif stage == "done":
+            return event["material"], event["timings"]
+
+def format_stage_timings(timings):
+    """One row per stage with start, first output and end offsets in seconds."""
+    rows = []
+    for stage, marks in timings.items():
+        if stage.startswith("solution_"):
+            continue
+        rows.append({"stage": stage, **marks})
+    solutions = [marks for stage, marks in timings.items() if stage.startswith("solution_")]
+    if solutions:
+        rows.append({
+            "stage": f"per-question solutions ({len(solutions)})",
+            "start": min(marks["start"] for marks in solutions),
+            "end": max(marks["end"] for marks in solutions),
+        })
+    return rows
+
 # ------------------------------ UI Styling ------------------------------
 st.set_page_config(layout="wide")
 st.markdown(
@@ -319,6 +377,22 @@ history_enabled = st.sidebar.checkbox("Enable History Log", value=True)
 # Quiz Attempts Setting
 max_attempts = st.sidebar.slider("Maximum Quiz Attempts", min_value=1, max_value=5, value=3)
 
+# Streaming pipeline toggle
+stream_enabled = st.sidebar.checkbox(
+    "Stream results as they are generated", value=True,
+    help="Overlap explanation, notes, quiz and per-question solutions instead of running them one after another."
+)
+
+# Quiz solutions from the quiz call itself (skips the separate solving call)
+combined_solution = st.sidebar.checkbox(
+    "Solve quiz in the same call", value=False,
+    help="Ask for an explanation per question while generating the quiz, saving one model round-trip."
+)
+
+# Warm-up cost of the shared model clients (paid once per process)
+if registry.warmup_seconds:
+    st.sidebar.caption(f"Model clients warmed up in {registry.total_warmup_seconds():.2f}s")
+
 # ------------------------------ Title & Hero Section ------------------------------
 # Display Hero Image (ensure you have a logo.png in your app folder)
 try:
@@ -360,8 +434,13 @@ topic = st.text_input("Enter the topic:", "Newton's Laws", max_chars=300, key="t
 if st.button("Generate Study Material"):
     with st.spinner("⏳ Generating..."):
         try:
-            generator = StudyMaterialGenerator()
-            material = generator.generate_study_material(topic)
+            generator = get_generator(combined_solution)
+            if stream_enabled:
+                material, timings = stream_study_material(generator, topic)
+                st.session_state['stage_timings'] = timings
+            else:
+                material = generator.generate_study_material(topic)
+                st.session_state.pop('stage_timings', None)
             
             # Handle different types of returns from the generator
             # Ensure each element is converted to string if needed
@@ -393,20 +472,22 @@ if st.button("Generate Study Material"):
 
             # Log history if enabled
             if history_enabled:
-                if "history" not in st.session_state:
-                    st.session_state["history"] = []
-                
                 formatted_quiz = format_quiz_for_history(quiz)
                 formatted_solution = format_quiz_solution(solution)
+                timestamp = time.strftime("%Y-%m-%d %H:%M:%S")
                 
-                st.session_state["history"].append({
-                    "topic": topic,
-                    "explanation": explanation,
-                    "notes": notes,
-                    "quiz": formatted_quiz,
-                    "quiz_solution": formatted_solution,
-                    "timestamp": "Current Session"
-                })
+                # Only the summary stays in session state
+                get_history().add(
+                    {"topic": topic, "timestamp": timestamp, "preview": preview(explanation)},
+                    {
+                        "topic": topic,
+                        "explanation": explanation,
+                        "notes": notes,
+                        "quiz": formatted_quiz,
+                        "quiz_solution": formatted_solution,
+                        "timestamp": timestamp
+                    },
+                )
                 
             st.success("✅ Study material generated successfully!")
             st.rerun()
@@ -423,6 +504,10 @@ if "generated_material" in st.session_state:
     if 'current_attempt' not in st.session_state:
         st.session_state['current_attempt'] = 1
 
+    if st.session_state.get('stage_timings'):
+        with st.expander("⏱️ Latency breakdown"):
+            st.table(format_stage_timings(st.session_state['stage_timings']))
+
     tabs = st.tabs(["📚 Explanation", "📝 Notes", "❓ Quiz", "📜 History"])
     
     with tabs[0]:
@@ -508,59 +593,38 @@ if "generated_material" in st.session_state:
     
     # ------------------------------ History Tab ------------------------------
     with tabs[3]:
-        if history_enabled and "history" in st.session_state and st.session_state["history"]:
+        history = get_history()
+        if history_enabled and len(history):
             st.markdown("### 📜 Study Session History")
             
-            # Create download button for history
-            zip_buffer = io.BytesIO()
-            with zipfile.ZipFile(zip_buffer, "w") as zip_file:
-                history_data = []
-                for idx, entry in enumerate(reversed(st.session_state["history"]), 1):
-                    # Ensure all values are strings
-                    history_data.append({
-                        "id": idx,
-                        "topic": entry['topic'],
-                        "timestamp": entry.get('timestamp', 'Unknown'),
-                        "content": {
-                            "explanation": str(entry['explanation']),
-                            "notes": str(entry['notes']),
-                            "quiz": str(entry['quiz']),
-                            "quiz_solution": str(entry['quiz_solution'])
-                        }
-                    })
-                
-                # Add formatted text file
-                history_text = ""
-                for entry in history_data:
-                    history_text += (
-                        f"=== STUDY SESSION {entry['id']} ===\n"
-                        f"Topic: {entry['topic']}\n"
-                        f"Timestamp: {entry['timestamp']}\n\n"
-                        f"--- EXPLANATION ---\n{entry['content']['explanation']}\n\n"
-                        f"--- NOTES ---\n{entry['content']['notes']}\n\n"
-                        f"--- QUIZ ---\n{entry['content']['quiz']}\n\n"
-                        f"--- QUIZ SOLUTION ---\n{entry['content']['quiz_solution']}\n"
-                        f"=================================\n\n"
-                    )
-                zip_file.writestr("study_history.txt", history_text)
-                
-                # Add JSON file for structured data
-                zip_file.writestr("study_history.json", json.dumps(history_data, indent=2))
-                
-            zip_buffer.seek(0)
-            
+            # The archive is only built on request and reused until the history changes
             col1, col2 = st.columns([1, 4])
             with col1:
-                st.download_button(
-                    label="⬇️ Download History",
-                    data=zip_buffer,
-                    file_name="study_history.zip",
-                    mime="application/zip"
-                )
+                archive = cached_export(history)
+                if archive is None and st.button("📦 Prepare Download"):
+                    with st.spinner("Packing history..."):
+                        archive = export_history(history)
+                if archive is not None:
+                    st.download_button(
+                        label="⬇️ Download History",
+                        data=archive,
+                        file_name="study_history.zip",
+                        mime="application/zip"
+                    )
+            with col2:
+                # Render one page of entries per rerun instead of the whole history
+                page_count = history.page_count(HISTORY_PAGE_SIZE)
+                page = st.number_input("Page", min_value=1, max_value=page_count, value=1, step=1) if page_count > 1 else 1
+                st.caption(f"{len(history)} sessions stored (newest first, at most {history.store.max_entries} kept)")
             
-            # Display each history entry
-            for idx, entry in enumerate(reversed(st.session_state["history"]), 1):
-                with st.expander(f"Study Session {idx}: {entry['topic']}"):
+            # Display the entries on this page, loading each one from the store
+            offset = (page - 1) * HISTORY_PAGE_SIZE
+            for idx, summary in enumerate(history.page(page, HISTORY_PAGE_SIZE), offset + 1):
+                with st.expander(f"Study Session {idx}: {summary['topic']}"):
+                    entry, _ = history.load(summary)
+                    if entry is None:
+                        st.info("This entry has expired from the history store.")
+                        continue
                     st.markdown(f"**Topic:** {entry['topic']}")
                     st.markdown(f"**Timestamp:** {entry.get('timestamp', 'Unknown')}")
                     
@@ -0,0 +1,65 @@
+import json
+import zipfile
+
+
+def _export_record(idx, entry):
+    return {
+        "id": idx,
+        "topic": entry['topic'],
+        "timestamp": entry.get('timestamp', 'Unknown'),
+        "content": {
+            "explanation": str(entry['explanation']),
+            "notes": str(entry['notes']),
+            "quiz": str(entry['quiz']),
+            "quiz_solution": str(entry['quiz_solution'])
+        }
+    }
+
+
+def _format_record(record):
+    return (
+        f"=== STUDY SESSION {record['id']} ===\n"
+        f"Topic: {record['topic']}\n"
+        f"Timestamp: {record['timestamp']}\n\n"
+        f"--- EXPLANATION ---\n{record['content']['explanation']}\n\n"
+        f"--- NOTES ---\n{record['content']['notes']}\n\n"
+        f"--- QUIZ ---\n{record['content']['quiz']}\n\n"
+        f"--- QUIZ SOLUTION ---\n{record['content']['quiz_solution']}\n"
+        f"=================================\n\n"
+    )
+
+
+def iter_records(history):
+    """Yield export records newest first, reading one entry from the store at a time."""
+    for idx, (_, entry, _) in enumerate(history.store.iter_entries(history.session_id), 1):
+        yield _export_record(idx, entry)
+
+
+def write_history_zip(history, fileobj):
+    """Stream ``history`` into a ZIP with ``study_history.txt`` and ``study_history.json``.
+
+    Each member is written entry by entry, so only one entry is held in
+    memory at a time.
+    """
+    with zipfile.ZipFile(fileobj, "w", zipfile.ZIP_DEFLATED) as zip_file:
+        with zip_file.open("study_history.txt", "w") as member:
+            for record in iter_records(history):
+                member.write(_format_record(record).encode("utf-8"))
+
+        with zip_file.open("study_history.json", "w") as member:
+            member.write(b"[")
+            for i, record in enumerate(iter_records(history)):
+                if i:
+                    member.write(b",")
+                member.write(b"\n" + json.dumps(record, indent=2).encode("utf-8"))
+            member.write(b"\n]")
+
+
+def export_history(history):
+    """Return the history ZIP bytes, rebuilding only when the history version changed."""
+    return history.export(write_history_zip)
+
+
+def cached_export(history):
+    """The cached archive if it is still current, else ``None`` (never builds one)."""
+    return history.cached_export()
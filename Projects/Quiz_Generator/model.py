@@ -1,15 +1,21 @@
-from langchain_groq import ChatGroq
 from langchain_core.prompts import PromptTemplate
 from langchain_core.output_parsers import StrOutputParser
+from langchain_core.output_parsers.openai_tools import JsonOutputKeyToolsParser
 from langchain.schema.runnable import RunnableParallel
 from typing import Union
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, ValidationError
 from dotenv import load_dotenv
+from resources import get_chat_model, get_tracer
+import asyncio
+import logging
 import os
+import time
 
 # Load environment variables
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 # -----------------------------------------------
 # ✅ Pydantic Models for Quiz Structure
 class Quiz(BaseModel):
@@ -22,13 +28,46 @@ class Quizzes(BaseModel):
     """Defines a list of quiz questions."""
     quiz: list[Quiz] = Field(description="List of quiz questions")
 
+class SolvedQuiz(Quiz):
+    """A quiz question together with its worked solution."""
+    explanation: str = Field(description="Detailed explanation of why the answer is correct")
+
+class SolvedQuizzes(BaseModel):
+    """Defines a list of quiz questions with their solutions."""
+    quiz: list[SolvedQuiz] = Field(description="List of solved quiz questions")
+
+def format_solutions(quiz_content):
+    """Numbered solution text built from the per-question explanations of a solved quiz."""
+    return "\n\n".join(
+        f"{idx}. {q['question']}\nAnswer: {q['answer']}\n{q['explanation']}"
+        for idx, q in enumerate(quiz_content, 1)
+    )
+
+# Characters of explanation after which the quiz is started from the
+# explanation so far, and the size of each explanation chunk sent to notes.
+EARLY_START_CHARS = 1500
+
+# Timing bucket for events whose name differs from their stage
+EVENT_STAGES = {"quiz_item": "quiz", "solution": "solutions"}
+
 # -----------------------------------------------
 # ✅ Study Material Generator Class
 class StudyMaterialGenerator:
-    def __init__(self):
-        """Initialize the LLM and prompt templates."""
-        self.llm = ChatGroq(model="llama-3.1-8b-instant")
-        self.structured_llm = self.llm.with_structured_output(Quizzes)
+    def __init__(self, llm=None, combined_solution=False):
+        """Initialize the LLM, prompt templates and chains.
+
+        The LLM defaults to the shared client from ``resources``, so building
+        another generator does not open new HTTP connections.
+
+        With ``combined_solution`` the quiz is generated with the
+        ``SolvedQuizzes`` schema, which carries an explanation per question,
+        and the separate solving round-trip (``prompt4``) is skipped.
+        """
+        self.llm = llm or get_chat_model("llama-3.1-8b-instant")
+        self.combined_solution = combined_solution
+        self.quiz_schema = SolvedQuizzes if combined_solution else Quizzes
+        self.quiz_item_schema = SolvedQuiz if combined_solution else Quiz
+        self.structured_llm = self.llm.with_structured_output(self.quiz_schema)
         self.parser = StrOutputParser()
 
         # Prompt Templates
@@ -46,6 +85,12 @@ class StudyMaterialGenerator:
             template="Generate 5 quiz questions with 4 options without (A, B, C, D) based on the following content:\n{content}",
             input_variables=["content"]
         )
+        if combined_solution:
+            self.prompt3 = PromptTemplate(
+                template="Generate 5 quiz questions with 4 options without (A, B, C, D) based on the following content. "
+                         "For each question give the correct answer and a detailed explanation of why it is correct:\n{content}",
+                input_variables=["content"]
+            )
 
         self.prompt4 = PromptTemplate(
             template="Solve the following quiz:\n{quiz}\n"
@@ -53,6 +98,30 @@ class StudyMaterialGenerator:
             input_variables=["quiz"]
         )
 
+        # Compiled once and reused for every topic
+        self.content_chain = self.prompt1 | self.llm | self.parser
+        self.notes_chain = self.prompt2 | self.llm | self.parser
+        self.quiz_chain = self.prompt3 | self.structured_llm
+        self.notes_quiz_chain = RunnableParallel(
+            {
+                'notes': self.notes_chain,
+                'quiz': self.quiz_chain,
+            }
+        )
+        self.solution_quiz_chain = self.prompt4 | self.llm
+
+        # Streaming pipeline: the quiz is requested as a forced tool call so
+        # its JSON arguments can be parsed while they stream, question by question.
+        self.prompt5 = PromptTemplate(
+            template="Solve the following quiz question:\n{question}\n"
+                     "Provide the answer and a detailed explanation.",
+            input_variables=["question"]
+        )
+        self.quiz_stream_chain = self.prompt3 | self.llm.bind_tools(
+            [self.quiz_schema], tool_choice=self.quiz_schema.__name__
+        ) | JsonOutputKeyToolsParser(key_name=self.quiz_schema.__name__, first_tool_only=True)
+        self.solution_question_chain = self.prompt5 | self.llm | self.parser
+
     def generate_study_material(self, topic: str):
         """
         Generates study material for the given topic:
@@ -62,41 +131,172 @@ class StudyMaterialGenerator:
         4. Quiz Solutions
         """
         material = []
+        tracer = get_tracer()
 
-        # ✅ Generate Explanation
-        content_chain = self.prompt1 | self.llm | self.parser
-        content = content_chain.invoke({"topic": topic})
-        material.append(content)
+        with tracer.span("quiz.request", topic=topic, combined_solution=self.combined_solution):
+            # ✅ Generate Explanation
+            with tracer.span("quiz.explanation"):
+                content = self.content_chain.invoke({"topic": topic}, config=tracer.config())
+            material.append(content)
 
-        # ✅ Generate Notes and Quiz in Parallel
-        notes_quiz_chain = RunnableParallel(
-            {
-                'notes': self.prompt2 | self.llm | self.parser,
-                'quiz': self.prompt3 | self.structured_llm,
-            }
-        )
+            # ✅ Generate Notes and Quiz in Parallel
+            with tracer.span("quiz.notes_quiz"):
+                result = self.notes_quiz_chain.invoke({"content": content}, config=tracer.config())
+            material.append(result['notes'])
 
-        result = notes_quiz_chain.invoke({"content": content})
-        material.append(result['notes'])
+            # ✅ Append the quiz questions
+            quiz_content = [q.model_dump() for q in result['quiz'].quiz]
+            material.append(quiz_content)
 
-        # ✅ Append the quiz questions
-        quiz_content = []
-        for q in result['quiz'].quiz:
-            quiz_content.append({
-                "question": q.question,
-                "options": q.options,
-                "answer": q.answer
-            })
-        material.append(quiz_content)
+            # ✅ Generate Quiz Solutions (already in the quiz with combined_solution)
+            with tracer.span("quiz.solution"):
+                material.append(self.solve_quiz(quiz_content, config=tracer.config()))
+
+        return material
 
-        # ✅ Generate Quiz Solutions
+    def solve_quiz(self, quiz_content, config=None):
+        """Return the numbered solution text for ``quiz_content``."""
+        if self.combined_solution:
+            return format_solutions(quiz_content)
         quiz_text = "\n".join(
             [f"{idx + 1}. {q['question']}\nOptions: {', '.join(q['options'])}\nAnswer: {q['answer']}\n"
              for idx, q in enumerate(quiz_content)]
         )
+        return self.solution_quiz_chain.invoke({"quiz": quiz_text}, config=config)
 
-        solution_quiz_chain = self.prompt4 | self.llm
-        solution = solution_quiz_chain.invoke({"quiz": quiz_text})
-        material.append(solution)
+    async def astream_study_material(self, topic: str, early_start_chars: int = EARLY_START_CHARS):
+        """
+        Streaming version of :meth:`generate_study_material` that overlaps the stages.
 
-        return material
+        - the explanation streams token by token
+        - notes are generated per explanation chunk of ``early_start_chars``
+          (split on paragraph breaks) while the explanation is still streaming
+        - the quiz starts once ``early_start_chars`` of explanation exist
+        - each question is solved as soon as its quiz item validates
+
+        Yields event dicts ``{"stage": ..., ...}`` (``explanation``/``notes``
+        deltas, ``quiz_item``, ``solution``) and finally ``{"stage": "done",
+        "material": [...], "timings": {...}}`` where ``material`` has the same
+        shape as :meth:`generate_study_material` and ``timings`` holds the
+        start/first-output/end offset in seconds of every stage.
+        """
+        events = asyncio.Queue()
+        timings = {}
+        start = time.perf_counter()
+
+        def mark(stage, key):
+            timings.setdefault(stage, {}).setdefault(key, round(time.perf_counter() - start, 3))
+
+        def emit(stage, **data):
+            mark(EVENT_STAGES.get(stage, stage), "first_output")
+            events.put_nowait({"stage": stage, **data})
+
+        async def run():
+            try:
+                # Tasks created by the pipeline inherit this span as their parent.
+                with get_tracer().span("quiz.stream", topic=topic, combined_solution=self.combined_solution):
+                    material = await self._run_pipeline(topic, early_start_chars, emit, mark)
+                events.put_nowait({"stage": "done", "material": material, "timings": timings})
+            finally:
+                events.put_nowait(None)
+
+        task = asyncio.create_task(run())
+        try:
+            while (event := await events.get()) is not None:
+                yield event
+            # Re-raise any pipeline error after the events queued before it.
+            await task
+        finally:
+            task.cancel()
+
+    async def _run_pipeline(self, topic, early_start_chars, emit, mark):
+        config = get_tracer().config()
+        notes_tasks = asyncio.Queue()
+        quiz_task = None
+
+        def add_notes_chunk(chunk):
+            mark("notes", "start")
+            notes_tasks.put_nowait(asyncio.create_task(self.notes_chain.ainvoke({"content": chunk}, config=config)))
+
+        async def notes_in_order():
+            # Chunks are summarized concurrently but emitted in explanation order.
+            notes = []
+            while (task := await notes_tasks.get()) is not None:
+                part = await task
+                notes.append(part)
+                emit("notes", delta=part)
+            mark("notes", "end")
+            return "\n\n".join(notes)
+
+        notes_worker = asyncio.create_task(notes_in_order())
+
+        # ✅ Stream the explanation, handing finished chunks to notes and quiz
+        mark("explanation", "start")
+        explanation, pending = [], ""
+        async for delta in self.content_chain.astream({"topic": topic}, config=config):
+            explanation.append(delta)
+            pending += delta
+            emit("explanation", delta=delta)
+            cut = pending.rfind("\n\n")
+            if len(pending) >= early_start_chars and cut > 0:
+                add_notes_chunk(pending[:cut])
+                pending = pending[cut:]
+            if quiz_task is None and sum(map(len, explanation)) >= early_start_chars:
+                quiz_task = asyncio.create_task(self._stream_quiz("".join(explanation), emit, mark))
+        mark("explanation", "end")
+        content = "".join(explanation)
+        if pending.strip():
+            add_notes_chunk(pending)
+        notes_tasks.put_nowait(None)
+        if quiz_task is None:
+            quiz_task = asyncio.create_task(self._stream_quiz(content, emit, mark))
+
+        notes, (quiz_content, solutions) = await asyncio.gather(notes_worker, quiz_task)
+        solution = "\n\n".join(
+            f"{idx}. {q['question']}\n{text}" for idx, (q, text) in enumerate(zip(quiz_content, solutions), 1)
+        )
+        mark("total", "end")
+        return [content, notes, quiz_content, solution]
+
+    async def _stream_quiz(self, content, emit, mark):
+        """Stream the quiz, solving every question as soon as it validates."""
+        mark("quiz", "start")
+        quiz_content, solution_tasks, items = [], [], []
+        # Items handled so far, valid or not; a malformed question is skipped, not retried forever.
+        consumed = 0
+
+        async def solve(idx, q):
+            mark(f"solution_{idx}", "start")
+            if self.combined_solution:
+                text = f"Answer: {q['answer']}\n{q['explanation']}"
+            else:
+                options = ", ".join(q["options"])
+                text = await self.solution_question_chain.ainvoke(
+                    {"question": f"{q['question']}\nOptions: {options}\nAnswer: {q['answer']}"},
+                    config=get_tracer().config(),
+                )
+            mark(f"solution_{idx}", "end")
+            emit("solution", index=idx, text=text)
+            return text
+
+        def accept(items):
+            nonlocal consumed
+            for item in items[consumed:]:
+                consumed += 1
+                try:
+                    q = self.quiz_item_schema.model_validate(item)
+                except ValidationError as e:
+                    logger.warning("Skipping malformed quiz question %d: %s", consumed, e)
+                    continue
+                quiz_content.append(q.model_dump())
+                idx = len(quiz_content)
+                emit("quiz_item", index=idx, item=quiz_content[-1])
+                solution_tasks.append(asyncio.create_task(solve(idx, quiz_content[-1])))
+
+        async for partial in self.quiz_stream_chain.astream({"content": content}, config=get_tracer().config()):
+            items = (partial or {}).get("quiz") or []
+            # Every item but the last is complete once a later one has begun.
+            accept(items[:-1])
+        accept(items)
+        mark("quiz", "end")
+        return quiz_content, await asyncio.gather(*solution_tasks)
@@ -0,0 +1,10 @@
+import os
+import sys
+
+# The registry, the Groq clients, the background loop and tracing come from the repository root.
+REPO_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..")
+if REPO_ROOT not in sys.path:
+    sys.path.append(REPO_ROOT)
+
+from resource_registry import get_chat_model, get_loop_service, registry  # noqa: E402
+from tracing import get_tracer  # noqa: E402
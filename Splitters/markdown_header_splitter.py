@@ -0,0 +1,305 @@
+"""Split Markdown by its header hierarchy, with the section path of every chunk as metadata.
+
+Usage:
+    from markdown_header_splitter import MarkdownHeaderSplitter
+    splitter = MarkdownHeaderSplitter(chunk_size=200, chunk_overlap=20)
+    docs = splitter.split_file("README.md")
+    docs[0].metadata  # {"Header 1": "...", "Header 2": "Features", "breadcrumb": "... > Features", ...}
+
+    python Splitters/markdown_header_splitter.py README.md --chunk-size 200
+
+The text is read line by line, once. The splitter keeps the current header
+path and whether it is inside a fenced code block (````` or ``~~~``), so a
+``# comment`` in a shell snippet is not a header and a fence is never cut
+by a blank line. ATX (``## Title``) and setext (``Title`` over ``===`` /
+``---``) headers are recognised; each one closes the previous section.
+
+A section is a list of blocks: paragraphs (split on blank lines), and fenced
+code blocks kept whole. Blocks are packed into chunks of up to
+``chunk_size``. A block larger than that is cut at line boundaries; a
+fenced block keeps its opening fence on every piece and is closed on each
+one. Only a single line longer than ``chunk_size`` goes through the
+recursive splitter, and ``chunk_overlap`` applies only there.
+
+Every chunk gets ``Header 1`` ... ``Header 6`` for the levels on its path
+(the keys ``MarkdownHeaderTextSplitter`` uses), ``breadcrumb`` (the titles
+joined with `` > ``) and 1-based ``start_line``/``end_line``. Only the
+current section is held in memory, and each line is handled a constant
+number of times, so time and memory are linear in the input.
+"""
+import argparse
+import re
+from dataclasses import dataclass, field
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from langchain_core.documents import Document
+from langchain_text_splitters import RecursiveCharacterTextSplitter, TextSplitter
+
+ATX_HEADER = re.compile(r"^ {0,3}(#{1,6})(?:[ \t]+(.*?))?(?:[ \t]+#+)?[ \t]*$")
+SETEXT_UNDERLINE = re.compile(r"^ {0,3}(=+|-+)[ \t]*$")
+FENCE = re.compile(r"^ {0,3}(`{3,}|~{3,})(.*)$")
+LIST_OR_QUOTE = re.compile(r"^ {0,3}([-+*>]|\d+[.)])(\s|$)")
+
+
+@dataclass
+class _Block:
+    kind: str
+    start_line: int
+    lines: List[str] = field(default_factory=list)
+    fence: Optional[str] = None
+    closed: bool = False
+
+    @property
+    def end_line(self):
+        return self.start_line + len(self.lines) - 1
+
+
+class MarkdownHeaderSplitter(TextSplitter):
+    """One-pass Markdown splitter that tracks headers and code fences."""
+
+    def __init__(
+        self,
+        chunk_size: int = 1000,
+        chunk_overlap: int = 100,
+        max_header_level: int = 6,
+        strip_headers: bool = False,
+        **kwargs,
+    ):
+        super().__init__(chunk_size=chunk_size, chunk_overlap=chunk_overlap, **kwargs)
+        self.max_header_level = max_header_level
+        self.strip_headers = strip_headers
+        self._fallback = RecursiveCharacterTextSplitter(
+            chunk_size=chunk_size,
+            chunk_overlap=chunk_overlap,
+            length_function=self._length_function,
+        )
+
+    def split_lines(self, lines: Iterable[str]) -> Iterator[Tuple[str, dict]]:
+        """Yield ``(chunk, metadata)`` from Markdown lines (trailing newlines are ignored)."""
+        path: List[str] = []
+        blocks: List[_Block] = []
+        block: Optional[_Block] = None
+        fence_re = None
+
+        def close_block():
+            nonlocal block
+            if block is not None and block.kind == "fence" and not block.closed:
+                # A fence left open at the end of the input runs to the last non-blank line.
+                while len(block.lines) > 1 and not block.lines[-1].strip():
+                    block.lines.pop()
+            if block is not None and block.lines:
+                blocks.append(block)
+            block = None
+
+        def flush():
+            close_block()
+            if any(b.kind != "header" for b in blocks):
+                yield from self._pack(blocks, path)
+            blocks.clear()
+
+        for number, line in enumerate(lines, 1):
+            line = line.rstrip("\r\n")
+
+            if fence_re is not None:
+                block.lines.append(line)
+                if fence_re.match(line):
+                    block.closed = True
+                    fence_re = None
+                    close_block()
+                continue
+
+            fence = FENCE.match(line)
+            if fence and not (fence.group(1)[0] == "`" and "`" in fence.group(2)):
+                close_block()
+                block = _Block("fence", number, [line], fence=line)
+                marker = fence.group(1)
+                fence_re = re.compile(rf"^ {{0,3}}{re.escape(marker[0])}{{{len(marker)},}}[ \t]*$")
+                continue
+
+            header = ATX_HEADER.match(line)
+            level = len(header.group(1)) if header else 0
+            title = (header.group(2) or "").strip() if header else ""
+            if not header:
+                underline = SETEXT_UNDERLINE.match(line)
+                # "Title" over "===" or "---" is a header when "Title" is a one-line paragraph.
+                if (
+                    underline
+                    and block is not None
+                    and block.kind == "text"
+                    and len(block.lines) == 1
+                    and not LIST_OR_QUOTE.match(block.lines[0])
+                ):
+                    level = 1 if underline.group(1)[0] == "=" else 2
+                    title = block.lines[0].strip()
+                    start, header_lines = block.start_line, [block.lines[0], line]
+                    block = None
+            else:
+                start, header_lines = number, [line]
+
+            if level and level <= self.max_header_level:
+                yield from flush()
+                del path[level - 1:]
+                path.extend([""] * (level - 1 - len(path)))
+                path.append(title)
+                if not self.strip_headers:
+                    blocks.append(_Block("header", start, header_lines))
+                continue
+            if level:
+                close_block()
+                blocks.append(_Block("text", start, header_lines))
+                continue
+
+            if not line.strip():
+                close_block()
+                continue
+            if block is None:
+                block = _Block("text", number)
+            block.lines.append(line)
+
+        yield from flush()
+
+    def _pack(self, blocks: List[_Block], path: List[str]) -> Iterator[Tuple[str, dict]]:
+        """Pack a section's blocks into chunks of up to ``chunk_size``."""
+        metadata = {f"Header {level}": title for level, title in enumerate(path, 1) if title}
+        metadata["breadcrumb"] = " > ".join(title for title in path if title)
+
+        current: List[str] = []
+        size, start, end = 0, 0, 0
+        for block in blocks:
+            text = "\n".join(block.lines)
+            length = self._length_function(text)
+            # Blocks are joined by the blank lines that separated them in the source.
+            separator = "\n" * (block.start_line - end)
+            if current and size + self._length_function(separator) + length <= self._chunk_size:
+                current.extend((separator, text))
+                size += self._length_function(separator) + length
+                end = block.end_line
+                continue
+            if current:
+                yield "".join(current), dict(metadata, start_line=start, end_line=end)
+                current = []
+            if length <= self._chunk_size:
+                current, size, start, end = [text], length, block.start_line, block.end_line
+                continue
+            for piece, piece_start, end in self._cut_block(block):
+                yield piece, dict(metadata, start_line=piece_start, end_line=end)
+        if current:
+            yield "".join(current), dict(metadata, start_line=start, end_line=end)
+
+    def _cut_block(self, block: _Block) -> List[Tuple[str, int, int]]:
+        """Cut an oversized block at line boundaries; fenced pieces are re-opened and closed."""
+        lines, first, opener, closer = block.lines, block.start_line, "", ""
+        if block.kind == "fence":
+            opener = block.fence
+            closer = lines[-1] if block.closed else opener[:len(opener) - len(opener.lstrip())] + FENCE.match(opener).group(1)
+            lines = lines[1:-1] if block.closed else lines[1:]
+            first += 1
+        wrap = self._length_function(opener + "\n" + "\n" + closer) if opener else 0
+        if 2 * wrap > self._chunk_size:
+            # Fence lines this long would crowd out the code; cut the block like plain text.
+            opener = closer = ""
+            lines, first, wrap = block.lines, block.start_line, 0
+        budget = self._chunk_size - wrap
+        newline = self._length_function("\n")
+        splitter = self._fallback
+        if wrap:
+            splitter = RecursiveCharacterTextSplitter(
+                chunk_size=budget,
+                chunk_overlap=min(self._chunk_overlap, budget // 2),
+                length_function=self._length_function,
+            )
+
+        def wrapped(piece):
+            return f"{opener}\n{piece}\n{closer}" if opener else piece
+
+        pieces: List[Tuple[str, int, int]] = []
+        current: List[str] = []
+        size, start = 0, first
+        for number, line in enumerate(lines, first):
+            length = self._length_function(line)
+            if current and size + newline + length <= budget:
+                current.append(line)
+                size += newline + length
+                continue
+            if current:
+                pieces.append((wrapped("\n".join(current)), start, number - 1))
+                current = []
+            if length <= budget:
+                current, size, start = [line], length, number
+                continue
+            pieces.extend((wrapped(piece), number, number) for piece in splitter.split_text(line))
+        if current:
+            pieces.append((wrapped("\n".join(current)), start, first + len(lines) - 1))
+        if pieces:
+            # The fence lines of the block belong to its first and last pieces.
+            pieces[0] = (pieces[0][0], block.start_line, pieces[0][2])
+            pieces[-1] = (pieces[-1][0], pieces[-1][1], block.end_line)
+        return pieces
+
+    def split_text(self, text: str) -> List[str]:
+        return [chunk for chunk, _ in self.split_lines(text.split("\n"))]
+
+    def create_documents(self, texts: List[str], metadatas: Optional[List[dict]] = None) -> List[Document]:
+        metadatas = metadatas or [{}] * len(texts)
+        return [
+            Document(page_content=chunk, metadata={**base, **metadata})
+            for text, base in zip(texts, metadatas)
+            for chunk, metadata in self.split_lines(text.split("\n"))
+        ]
+
+    def split_file(self, path, encoding="utf-8") -> Iterator[Document]:
+        """Yield the chunks of a Markdown file, reading it line by line."""
+        with open(path, encoding=encoding) as f:
+            for chunk, metadata in self.split_lines(f):
+                yield Document(page_content=chunk, metadata={"source": str(path), **metadata})
+
+
+SAMPLE = """
+# Project Name: Smart Student Tracker
+
+A simple Python-based project to manage and track student data, including their grades, age, and academic status.
+
+
+## Features
+
+- Add new students with relevant info
+- View student details
+- Check if a student is passing
+- Easily extendable class-based design
+
+
+## 🛠 Tech Stack
+
+- Python 3.10+
+- No external dependencies
+
+
+## Getting Started
+
+1. Clone the repo
+   ```bash
+   git clone https://github.com/your-username/student-tracker.git
+
+"""
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("path", nargs="?", help="Markdown file (default: the sample from markdown_splitters.py)")
+    arg_parser.add_argument("--chunk-size", type=int, default=200)
+    arg_parser.add_argument("--chunk-overlap", type=int, default=20)
+    arg_parser.add_argument("--strip-headers", action="store_true")
+    args = arg_parser.parse_args()
+
+    splitter = MarkdownHeaderSplitter(
+        chunk_size=args.chunk_size, chunk_overlap=args.chunk_overlap, strip_headers=args.strip_headers
+    )
+    docs = list(splitter.split_file(args.path)) if args.path else splitter.create_documents([SAMPLE])
+    print(len(docs))
+    for i, doc in enumerate(docs):
+        print(f"Chunk {i + 1}: [{doc.metadata['breadcrumb']}] lines {doc.metadata['start_line']}-{doc.metadata['end_line']}")
+        print(doc.page_content)
+
+
+if __name__ == "__main__":
+    main()
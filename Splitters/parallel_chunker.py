@@ -0,0 +1,343 @@
+"""Chunk every text file under a directory across a process pool.
+
+Usage:
+    python Splitters/parallel_chunker.py docs/ --output chunks.jsonl --workers 8
+    python Splitters/parallel_chunker.py docs/ --output chunks.parquet --chunk-size 1000 --chunk-overlap 100
+    python Splitters/parallel_chunker.py docs/ --output chunks.jsonl --scaling 1 2 4 8
+
+Each file's language is detected from its extension, or from its first
+lines for files without a known one. Python and Markdown use the
+``RecursiveCharacterTextSplitter.from_language`` presets from the other
+scripts in ``Splitters/``; anything else uses the plain recursive splitter.
+Binary files are skipped.
+
+Files are grouped into tasks of about ``--task-mb`` (largest first) and
+each task runs in a worker process. The worker streams its files through
+``StreamingTextSplitter`` and writes its own part file, so no chunk text is
+sent back to the parent. The parent then concatenates the parts in task
+order into one JSONL file or one Parquet file (Parquet needs ``pyarrow``).
+
+Every row holds the file path, detected language, chunk index, character
+``start``/``end`` offsets into the file and the chunk text. The run ends
+with chunks/sec per worker and the parallel efficiency;
+``--scaling`` repeats the run for several worker counts and prints the
+speedup over one worker.
+"""
+import argparse
+import json
+import os
+import re
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional
+
+from langchain_text_splitters import Language, RecursiveCharacterTextSplitter
+
+from streaming_splitter import DEFAULT_BLOCK_SIZE, StreamingTextSplitter, iter_file_blocks
+
+EXTENSIONS = {
+    ".py": Language.PYTHON,
+    ".pyw": Language.PYTHON,
+    ".md": Language.MARKDOWN,
+    ".markdown": Language.MARKDOWN,
+    ".mdx": Language.MARKDOWN,
+}
+PLAIN = "text"
+SKIP_DIRS = {".git", "__pycache__", ".venv", "venv", "node_modules", ".mypy_cache", ".pytest_cache"}
+MARKDOWN_HINT = re.compile(r"^(#{1,6} \S|```|\* \S|- \S)", re.MULTILINE)
+SNIFF_BYTES = 4096
+
+
+# ---------------- Language detection ---------------- #
+
+def detect_language(path, head: bytes) -> Optional[str]:
+    """``Language`` value for ``path`` ("python", "markdown", "text"), or None for binary files."""
+    if b"\0" in head:
+        return None
+    language = EXTENSIONS.get(os.path.splitext(path)[1].lower())
+    if language is not None:
+        return language.value
+    text = head.decode("utf-8", errors="ignore")
+    first_line = text.split("\n", 1)[0]
+    if first_line.startswith("#!") and "python" in first_line:
+        return Language.PYTHON.value
+    if len(MARKDOWN_HINT.findall(text)) >= 2:
+        return Language.MARKDOWN.value
+    return PLAIN
+
+
+def make_splitter(language, chunk_size, chunk_overlap, block_size=DEFAULT_BLOCK_SIZE):
+    if language == PLAIN:
+        splitter = RecursiveCharacterTextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+    else:
+        splitter = RecursiveCharacterTextSplitter.from_language(
+            Language(language), chunk_size=chunk_size, chunk_overlap=chunk_overlap
+        )
+    return StreamingTextSplitter(splitter, block_size=block_size)
+
+
+def discover(root):
+    """All regular files under ``root`` with their sizes, skipping VCS/cache directories."""
+    files = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = sorted(d for d in dirnames if d not in SKIP_DIRS)
+        for name in sorted(filenames):
+            path = os.path.join(dirpath, name)
+            if os.path.isfile(path):
+                files.append((path, os.path.getsize(path)))
+    return files
+
+
+def plan_tasks(files, task_bytes):
+    """Group files into tasks of about ``task_bytes``, largest files first for load balance."""
+    tasks, current, current_bytes = [], [], 0
+    for path, size in sorted(files, key=lambda item: -item[1]):
+        if current and current_bytes + size > task_bytes:
+            tasks.append(current)
+            current, current_bytes = [], 0
+        current.append(path)
+        current_bytes += size
+    if current:
+        tasks.append(current)
+    return tasks
+
+
+# ---------------- Worker ---------------- #
+
+class _OffsetTracker:
+    """Wraps a block iterator and keeps just enough text to locate each chunk's start offset.
+
+    ``window`` starts at absolute offset ``base``; ``cursor`` is the start of
+    the last chunk located in it. Text before the cursor is only dropped
+    when a block is appended or when it is over half the window, so each
+    chunk costs a search rather than a copy of the window.
+    """
+
+    def __init__(self, blocks):
+        self.blocks = blocks
+        self.window = ""
+        self.base = 0
+        self.cursor = 0
+
+    def __iter__(self):
+        for block in self.blocks:
+            self._trim()
+            self.window += block
+            yield block
+
+    def _trim(self):
+        self.window = self.window[self.cursor:]
+        self.base += self.cursor
+        self.cursor = 0
+
+    def locate(self, chunk, search_from):
+        index = max(self.cursor, search_from - self.base)
+        # Usually the chunk starts right there; startswith skips find's per-call needle setup.
+        if not self.window.startswith(chunk, index):
+            index = self.window.find(chunk, index)
+        if index == -1:
+            index = self.window.find(chunk, self.cursor)
+        # Later chunks start at or after this one, so the text before it can go.
+        self.cursor = max(index, self.cursor)
+        start = self.base + self.cursor
+        if self.cursor > len(self.window) // 2:
+            self._trim()
+        return start
+
+
+def iter_file_rows(path, language, chunk_size, chunk_overlap, root):
+    """Rows for every chunk of ``path``: relative path, language, index, start/end offsets, text."""
+    # Undecodable bytes become U+FFFD rather than dropping the rest of the file.
+    tracker = _OffsetTracker(iter_file_blocks(path, encoding="utf-8", errors="replace"))
+    splitter = make_splitter(language, chunk_size, chunk_overlap)
+    relative = os.path.relpath(path, root)
+    start, previous_len = 0, 0
+    for index, chunk in enumerate(splitter.split_blocks(tracker)):
+        # Same search rule as TextSplitter(add_start_index=True).
+        start = tracker.locate(chunk, start + previous_len - chunk_overlap if index else 0)
+        previous_len = len(chunk)
+        yield {"path": relative, "language": language, "index": index,
+               "start": start, "end": start + len(chunk), "text": chunk}
+
+
+def _write_jsonl(rows, part_path):
+    count = 0
+    with open(part_path, "w", encoding="utf-8") as f:
+        for row in rows:
+            f.write(json.dumps(row, ensure_ascii=False, separators=(",", ":")))
+            f.write("\n")
+            count += 1
+    return count
+
+
+def _write_parquet(rows, part_path, batch_rows=50_000):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    count, writer, batch = 0, None, []
+
+    def flush():
+        nonlocal writer
+        table = pa.Table.from_pylist(batch, schema=parquet_schema())
+        if writer is None:
+            writer = pq.ParquetWriter(part_path, table.schema, compression="zstd")
+        writer.write_table(table)
+
+    try:
+        for row in rows:
+            batch.append(row)
+            count += 1
+            if len(batch) >= batch_rows:
+                flush()
+                batch = []
+        if batch or writer is None:
+            flush()
+    finally:
+        if writer is not None:
+            writer.close()
+    return count
+
+
+def parquet_schema():
+    import pyarrow as pa
+
+    return pa.schema([
+        ("path", pa.string()), ("language", pa.string()), ("index", pa.int32()),
+        ("start", pa.int64()), ("end", pa.int64()), ("text", pa.string()),
+    ])
+
+
+def chunk_task(task_id, paths, root, part_dir, output_format, chunk_size, chunk_overlap):
+    """Worker: chunk ``paths`` into one part file; returns stats for the report."""
+    start = time.perf_counter()
+    languages: Dict[str, int] = {}
+    skipped, size = 0, 0
+
+    def rows():
+        nonlocal skipped, size
+        for path in paths:
+            with open(path, "rb") as f:
+                head = f.read(SNIFF_BYTES)
+            language = detect_language(path, head)
+            if language is None:
+                skipped += 1
+                continue
+            languages[language] = languages.get(language, 0) + 1
+            size += os.path.getsize(path)
+            yield from iter_file_rows(path, language, chunk_size, chunk_overlap, root)
+
+    part_path = os.path.join(part_dir, f"part-{task_id:06d}.{output_format}")
+    writer = _write_parquet if output_format == "parquet" else _write_jsonl
+    chunks = writer(rows(), part_path)
+    return {
+        "task": task_id,
+        "pid": os.getpid(),
+        "part": part_path,
+        "files": len(paths) - skipped,
+        "skipped": skipped,
+        "bytes": size,
+        "chunks": chunks,
+        "languages": languages,
+        "seconds": time.perf_counter() - start,
+    }
+
+
+# ---------------- Driver ---------------- #
+
+def merge_parts(parts: List[str], output, output_format):
+    if output_format == "jsonl":
+        with open(output, "wb") as out:
+            for part in parts:
+                with open(part, "rb") as f:
+                    shutil.copyfileobj(f, out, 1 << 20)
+        return
+    import pyarrow.parquet as pq
+
+    with pq.ParquetWriter(output, parquet_schema(), compression="zstd") as writer:
+        for part in parts:
+            table = pq.read_table(part, schema=parquet_schema())
+            if table.num_rows:
+                writer.write_table(table)
+
+
+def chunk_directory(root, output, workers=None, output_format=None, chunk_size=1000, chunk_overlap=100, task_mb=8):
+    """Chunk every file under ``root`` into ``output``; returns the per-task stats and wall time."""
+    output_format = output_format or ("parquet" if output.endswith(".parquet") else "jsonl")
+    workers = workers or os.cpu_count() or 1
+    tasks = plan_tasks(discover(root), task_mb * 1024 * 1024)
+    part_dir = tempfile.mkdtemp(prefix="chunk-parts-", dir=os.path.dirname(os.path.abspath(output)))
+    start = time.perf_counter()
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [
+                pool.submit(chunk_task, task_id, paths, root, part_dir, output_format, chunk_size, chunk_overlap)
+                for task_id, paths in enumerate(tasks)
+            ]
+            results = [future.result() for future in futures]
+        merge_parts([result["part"] for result in results], output, output_format)
+    finally:
+        shutil.rmtree(part_dir, ignore_errors=True)
+    return results, time.perf_counter() - start
+
+
+def report(results, wall, workers):
+    per_worker: Dict[int, Dict[str, float]] = {}
+    for result in results:
+        stats = per_worker.setdefault(result["pid"], {"tasks": 0, "files": 0, "chunks": 0, "bytes": 0, "seconds": 0.0})
+        for key in ("files", "chunks", "bytes", "seconds"):
+            stats[key] += result[key]
+        stats["tasks"] += 1
+
+    print(f"\n{'worker':>8} {'tasks':>6} {'files':>7} {'chunks':>9} {'MiB':>8} {'busy s':>8} {'chunks/s':>10}")
+    for pid, stats in sorted(per_worker.items()):
+        rate = stats["chunks"] / stats["seconds"] if stats["seconds"] else 0.0
+        print(f"{pid:>8} {stats['tasks']:>6} {stats['files']:>7} {stats['chunks']:>9} "
+              f"{stats['bytes'] / 1024 / 1024:>8.1f} {stats['seconds']:>8.2f} {rate:>10.0f}")
+
+    chunks = sum(result["chunks"] for result in results)
+    busy = sum(result["seconds"] for result in results)
+    languages: Dict[str, int] = {}
+    for result in results:
+        for language, count in result["languages"].items():
+            languages[language] = languages.get(language, 0) + count
+    print(f"\n{chunks} chunks from {sum(r['files'] for r in results)} files "
+          f"({sum(r['skipped'] for r in results)} skipped) {languages}")
+    print(f"wall {wall:.2f}s, {chunks / wall if wall else 0:.0f} chunks/s, "
+          f"parallel efficiency {busy / (wall * workers) if wall else 0:.0%} of {workers} workers")
+    return chunks
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("root", help="Directory to chunk")
+    arg_parser.add_argument("--output", required=True, help="Output .jsonl or .parquet file")
+    arg_parser.add_argument("--format", choices=["jsonl", "parquet"], help="Default: from the output extension")
+    arg_parser.add_argument("--workers", type=int, default=os.cpu_count())
+    arg_parser.add_argument("--chunk-size", type=int, default=1000)
+    arg_parser.add_argument("--chunk-overlap", type=int, default=100)
+    arg_parser.add_argument("--task-mb", type=float, default=8, help="Approximate input size per task")
+    arg_parser.add_argument("--scaling", nargs="+", type=int, help="Rerun with these worker counts and print the speedup")
+    args = arg_parser.parse_args()
+
+    settings = dict(output_format=args.format, chunk_size=args.chunk_size,
+                    chunk_overlap=args.chunk_overlap, task_mb=args.task_mb)
+    results, wall = chunk_directory(args.root, args.output, workers=args.workers, **settings)
+    report(results, wall, args.workers)
+    print(f"written to {args.output}")
+
+    if args.scaling:
+        print(f"\n{'workers':>8} {'wall s':>8} {'chunks/s':>10} {'speedup':>8} {'efficiency':>11}")
+        chunks = sum(result["chunks"] for result in results)
+        reference = None
+        for workers in args.scaling:
+            _, wall = chunk_directory(args.root, args.output, workers=workers, **settings)
+            # Speedup relative to the first count, scaled as if that run were linear (exact when it is 1).
+            reference = reference or (workers, wall)
+            speedup = reference[0] * reference[1] / wall if wall else 0.0
+            print(f"{workers:>8} {wall:>8.2f} {chunks / wall:>10.0f} {speedup:>8.2f} {speedup / workers:>11.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,281 @@
+"""Split Python source on function and class boundaries.
+
+Usage:
+    from python_ast_splitter import PythonASTSplitter
+    splitter = PythonASTSplitter(chunk_size=1000, chunk_overlap=100)
+    docs = splitter.split_file("app.py")        # Documents with qualname/line metadata
+    chunks = splitter.split_text(source)        # plain strings
+
+    python Splitters/python_ast_splitter.py app.py --chunk-size 1000
+
+Each file is parsed once with ``ast`` and walked once:
+
+- a class or function that fits in ``chunk_size`` is one chunk, together with
+  its decorators and the comment lines directly above it;
+- a larger class or function is emitted piece by piece: the code between its
+  nested definitions (header, docstring, class attributes, ...) and each
+  nested definition on its own, recursively;
+- a piece that is still too large and has no definitions to split on (a long
+  function body, a big module-level table) is split with the
+  ``Language.PYTHON`` recursive splitter, ``chunk_overlap`` applying only here.
+
+Every chunk carries ``qualname`` (``Student.get_details``,
+``main.<locals>.helper``, ``<module>``), ``kind``, ``defines`` (the
+definitions it contains whole), 1-based ``start_line``/``end_line``, and
+``partial`` when it is only a part of its scope. Files that do not parse
+(like the sample below, which has an unterminated string) fall back to an
+indentation scan for ``def``/``class`` lines; ``parser`` says which was used.
+"""
+import argparse
+import ast
+import bisect
+import re
+from dataclasses import dataclass, field
+from typing import Iterator, List, Optional, Tuple
+
+from langchain_core.documents import Document
+from langchain_text_splitters import Language, RecursiveCharacterTextSplitter, TextSplitter
+
+DEFS = (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)
+BLOCKS = (ast.If, ast.For, ast.AsyncFor, ast.While, ast.With, ast.AsyncWith, ast.Try, ast.ExceptHandler,
+          getattr(ast, "TryStar", ast.Try), getattr(ast, "Match", ast.If), getattr(ast, "match_case", ast.If))
+HEADER = re.compile(r"^([ \t]*)(?:async[ \t]+)?(def|class)[ \t]+(\w+)")
+
+
+@dataclass
+class _Block:
+    kind: str
+    qualname: str
+    start: int
+    end: int
+    header_end: int
+    children: List["_Block"] = field(default_factory=list)
+
+    def names(self) -> List[str]:
+        names = [self.qualname] if self.qualname else []
+        for child in self.children:
+            names.extend(child.names())
+        return names
+
+
+def _child_qualname(parent: _Block, name):
+    if not parent.qualname:
+        return name
+    return f"{parent.qualname}.<locals>.{name}" if parent.kind == "function" else f"{parent.qualname}.{name}"
+
+
+def _ast_blocks(tree: ast.Module, n_lines) -> _Block:
+    """Definition tree from a parsed module (definitions nested in if/try/with bodies included)."""
+
+    def nested_defs(statements):
+        for statement in statements:
+            if isinstance(statement, DEFS):
+                yield statement
+                continue
+            if not isinstance(statement, BLOCKS):
+                continue
+            for name in ("body", "orelse", "finalbody", "handlers", "cases"):
+                inner = getattr(statement, name, None)
+                if isinstance(inner, list):
+                    yield from nested_defs(inner)
+
+    def first_line(node):
+        return min([node.lineno] + [decorator.lineno for decorator in getattr(node, "decorator_list", ())])
+
+    def build(parent: _Block, statements):
+        for node in nested_defs(statements):
+            start = first_line(node)
+            # A one-line "def f(): ..." has no separate body lines to split on.
+            if start <= parent.header_end:
+                continue
+            kind = "class" if isinstance(node, ast.ClassDef) else "function"
+            body_start = first_line(node.body[0])
+            header_end = body_start - 1 if body_start > node.lineno else node.lineno
+            block = _Block(kind, _child_qualname(parent, node.name), start, node.end_lineno, header_end)
+            parent.children.append(block)
+            build(block, node.body)
+
+    module = _Block("module", "", 1, n_lines, 0)
+    build(module, tree.body)
+    return module
+
+
+def _scan_blocks(lines: List[str]) -> _Block:
+    """Definition tree from ``def``/``class`` lines and indentation, for source that does not parse."""
+    module = _Block("module", "", 1, len(lines), 0)
+    stack: List[Tuple[int, _Block]] = [(-1, module)]
+    last_code, decorator_start = 0, None
+    for number, line in enumerate(lines, 1):
+        stripped = line.strip()
+        if not stripped or stripped.startswith("#"):
+            continue
+        indent = len(line) - len(line.lstrip(" \t"))
+        while len(stack) > 1 and indent <= stack[-1][0]:
+            stack.pop()[1].end = last_code
+        match = HEADER.match(line)
+        if match:
+            parent = stack[-1][1]
+            kind = "class" if match.group(2) == "class" else "function"
+            block = _Block(kind, _child_qualname(parent, match.group(3)), decorator_start or number, number, number)
+            parent.children.append(block)
+            stack.append((indent, block))
+        decorator_start = (decorator_start or number) if stripped.startswith("@") else None
+        last_code = number
+    for _, block in stack[1:]:
+        block.end = last_code
+    return module
+
+
+class PythonASTSplitter(TextSplitter):
+    """Chunk Python source at definition boundaries, with qualified names and line ranges as metadata."""
+
+    def __init__(self, chunk_size: int = 1000, chunk_overlap: int = 100, **kwargs):
+        super().__init__(chunk_size=chunk_size, chunk_overlap=chunk_overlap, **kwargs)
+        self._fallback = RecursiveCharacterTextSplitter.from_language(
+            Language.PYTHON,
+            chunk_size=chunk_size,
+            chunk_overlap=chunk_overlap,
+            length_function=self._length_function,
+        )
+
+    def iter_chunks(self, text: str) -> Iterator[Tuple[str, dict]]:
+        """Yield ``(chunk, metadata)`` for one source file."""
+        lines = text.split("\n")
+        if len(lines) > 1 and lines[-1] == "":
+            lines.pop()
+        line_starts = [0]
+        for line in lines[:-1]:
+            line_starts.append(line_starts[-1] + len(line) + 1)
+        try:
+            module, parser = _ast_blocks(ast.parse(text), len(lines)), "ast"
+        except (SyntaxError, ValueError):
+            module, parser = _scan_blocks(lines), "indent"
+
+        def chunk(block: _Block, start, end, defines, partial):
+            while start <= end and not lines[start - 1].strip():
+                start += 1
+            while end >= start and not lines[end - 1].strip():
+                end -= 1
+            if start > end:
+                return
+            offset = line_starts[start - 1]
+            content = text[offset:line_starts[end - 1] + len(lines[end - 1])]
+            metadata = {
+                "qualname": block.qualname or "<module>",
+                "kind": block.kind,
+                "defines": defines,
+                "start_line": start,
+                "end_line": end,
+                "partial": partial,
+                "parser": parser,
+            }
+            if self._length_function(content) <= self._chunk_size:
+                if self._add_start_index:
+                    metadata["start_index"] = offset
+                yield content, metadata
+                return
+            previous_start, previous_end = -1, 0
+            for piece in self._fallback.split_text(content):
+                # Each piece starts within chunk_overlap of the previous end and adds text past it.
+                index = content.find(piece, max(previous_start + 1, previous_end - self._chunk_overlap))
+                while 0 <= index and index + len(piece) <= previous_end:
+                    index = content.find(piece, index + 1)
+                if index < 0:
+                    index = previous_end
+                previous_start, previous_end = index, index + len(piece)
+                first = offset + index
+                piece_metadata = dict(
+                    metadata,
+                    defines=[],
+                    start_line=bisect.bisect_right(line_starts, first),
+                    end_line=bisect.bisect_right(line_starts, first + max(len(piece) - 1, 0)),
+                    partial=True,
+                )
+                if self._add_start_index:
+                    piece_metadata["start_index"] = first
+                yield piece, piece_metadata
+
+        def fits(start, end):
+            return self._length_function(text[line_starts[start - 1]:line_starts[end - 1] + len(lines[end - 1])]) <= self._chunk_size
+
+        def emit(block: _Block, start, end):
+            if not block.children or fits(start, end):
+                yield from chunk(block, start, end, block.names(), False)
+                return
+            cursor = start
+            for child in block.children:
+                # Comment lines directly above a definition go with it, unless they would make it too large.
+                child_start = child.start
+                while child_start > cursor and lines[child_start - 2].lstrip().startswith("#"):
+                    child_start -= 1
+                if child_start < child.start and not fits(child_start, child.end) and fits(child.start, child.end):
+                    child_start = child.start
+                if child_start > cursor:
+                    yield from chunk(block, cursor, child_start - 1, [], True)
+                yield from emit(child, child_start, child.end)
+                cursor = child.end + 1
+            if cursor <= end:
+                yield from chunk(block, cursor, end, [], True)
+
+        yield from emit(module, 1, len(lines))
+
+    def split_text(self, text: str) -> List[str]:
+        return [content for content, _ in self.iter_chunks(text)]
+
+    def create_documents(self, texts: List[str], metadatas: Optional[List[dict]] = None) -> List[Document]:
+        metadatas = metadatas or [{}] * len(texts)
+        return [
+            Document(page_content=content, metadata={**base, **metadata})
+            for text, base in zip(texts, metadatas)
+            for content, metadata in self.iter_chunks(text)
+        ]
+
+    def split_file(self, path, encoding="utf-8") -> List[Document]:
+        with open(path, encoding=encoding) as f:
+            return self.create_documents([f.read()], [{"source": str(path)}])
+
+
+SAMPLE = """
+class Student:
+    def __init__(self, name, age, grade):
+        self.name = name
+        self.age = age
+        self.grade = grade  # Grade is a float (like 8.5 or 9.2)
+
+    def get_details(self):
+        return self.name"
+
+    def is_passing(self):
+        return self.grade >= 6.0
+
+
+# Example usage
+student1 = Student("Aarav", 20, 8.2)
+print(student1.get_details())
+
+if student1.is_passing():
+    print("The student is passing.")
+else:
+    print("The student is not passing.")
+
+"""
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("path", nargs="?", help="Python file (default: the sample from pyhton_code_splitters.py)")
+    arg_parser.add_argument("--chunk-size", type=int, default=200)
+    arg_parser.add_argument("--chunk-overlap", type=int, default=20)
+    args = arg_parser.parse_args()
+
+    splitter = PythonASTSplitter(chunk_size=args.chunk_size, chunk_overlap=args.chunk_overlap)
+    docs = splitter.split_file(args.path) if args.path else splitter.create_documents([SAMPLE])
+    for i, doc in enumerate(docs):
+        meta = doc.metadata
+        print(f"Chunk {i + 1}: {meta['qualname']} ({meta['kind']}) lines {meta['start_line']}-{meta['end_line']}"
+              f"{' [partial]' if meta['partial'] else ''} via {meta['parser']}")
+        print(doc.page_content)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,244 @@
+"""Split arbitrarily large text files into chunks without loading them into memory.
+
+Usage:
+    from streaming_splitter import StreamingTextSplitter
+    splitter = StreamingTextSplitter(chunk_size=1000, chunk_overlap=100)
+    for chunk in splitter.split_file("dump.txt"):            # or use_mmap=True
+        ...
+
+    python Splitters/streaming_splitter.py dump.txt --chunk-size 1000 --chunk-overlap 100
+
+``StreamingTextSplitter`` wraps a ``RecursiveCharacterTextSplitter`` (plain
+or ``from_language``) and produces the same chunks as its ``split_text``,
+but from a stream of text blocks:
+
+- the file is read in ``block_size`` pieces, through buffered I/O or
+  ``mmap`` with an incremental decoder;
+- text is released up to the last top-level separator seen so far, split
+  into pieces, and fed to an incremental version of the splitter's
+  ``_merge_splits``, so chunks are yielded as soon as they are complete;
+- pieces longer than ``chunk_size`` are split recursively on their own, as
+  the wrapped splitter does.
+
+Memory stays around ``block_size`` plus a few chunks. Two cases differ from
+``split_text`` on the whole file: the top-level separator is chosen from the
+first ``probe_chars`` of the file rather than from all of it, and a single
+piece longer than ``max_piece_chars`` (e.g. a file with no blank lines) is
+cut at a lower-level separator before being split.
+"""
+import argparse
+import codecs
+import io
+import mmap
+import re
+import time
+from typing import Iterable, Iterator, List, Optional
+
+from langchain_text_splitters import Language, RecursiveCharacterTextSplitter
+from langchain_text_splitters.character import _split_text_with_regex
+
+DEFAULT_BLOCK_SIZE = 1 << 20
+
+
+def iter_file_blocks(path, block_size=DEFAULT_BLOCK_SIZE, encoding="utf-8", use_mmap=False, errors="strict") -> Iterator[str]:
+    """Yield the decoded text of ``path`` in blocks of about ``block_size`` characters.
+
+    Newlines are normalized to ``\\n`` either way, like ``open(path).read()``.
+    """
+    if not use_mmap:
+        with open(path, encoding=encoding, errors=errors) as f:
+            while block := f.read(block_size):
+                yield block
+        return
+
+    decoder = io.IncrementalNewlineDecoder(codecs.getincrementaldecoder(encoding)(errors), translate=True)
+    with open(path, "rb") as f:
+        if f.seek(0, io.SEEK_END) == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            for offset in range(0, len(mapped), block_size):
+                block = decoder.decode(mapped[offset:offset + block_size])
+                if block:
+                    yield block
+    tail = decoder.decode(b"", final=True)
+    if tail:
+        yield tail
+
+
+class _IncrementalMerge:
+    """``TextSplitter._merge_splits`` fed one split at a time."""
+
+    def __init__(self, splitter, separator):
+        self.splitter = splitter
+        self.separator = separator
+        self.separator_len = splitter._length_function(separator)
+        self.current: List[str] = []
+        self.lengths: List[int] = []
+        self.total = 0
+
+    def add(self, split) -> List[str]:
+        splitter, docs = self.splitter, []
+        length = splitter._length_function(split)
+        if self.total + length + (self.separator_len if self.current else 0) > splitter._chunk_size:
+            if self.current:
+                doc = splitter._join_docs(self.current, self.separator)
+                if doc is not None:
+                    docs.append(doc)
+                while self.total > splitter._chunk_overlap or (
+                    self.total + length + (self.separator_len if self.current else 0) > splitter._chunk_size
+                    and self.total > 0
+                ):
+                    self.total -= self.lengths[0] + (self.separator_len if len(self.current) > 1 else 0)
+                    del self.current[0], self.lengths[0]
+        self.current.append(split)
+        self.lengths.append(length)
+        self.total += length + (self.separator_len if len(self.current) > 1 else 0)
+        return docs
+
+    def flush(self) -> List[str]:
+        doc = self.splitter._join_docs(self.current, self.separator) if self.current else None
+        self.current, self.lengths, self.total = [], [], 0
+        return [doc] if doc is not None else []
+
+
+class StreamingTextSplitter:
+    """Lazily split streamed text with a ``RecursiveCharacterTextSplitter``'s exact settings."""
+
+    def __init__(
+        self,
+        splitter: Optional[RecursiveCharacterTextSplitter] = None,
+        block_size: int = DEFAULT_BLOCK_SIZE,
+        probe_chars: int = DEFAULT_BLOCK_SIZE,
+        max_piece_chars: Optional[int] = None,
+        **splitter_kwargs,
+    ):
+        self.splitter = splitter or RecursiveCharacterTextSplitter(**splitter_kwargs)
+        if self.splitter._keep_separator == "end":
+            raise ValueError("StreamingTextSplitter supports keep_separator=True/'start' or False, not 'end'")
+        self.block_size = block_size
+        self.probe_chars = probe_chars
+        self.max_piece_chars = max_piece_chars or max(4 * block_size, 16 * self.splitter._chunk_size)
+
+    @classmethod
+    def from_language(cls, language: Language, block_size=DEFAULT_BLOCK_SIZE, **kwargs):
+        """Stream with the separators of ``RecursiveCharacterTextSplitter.from_language``."""
+        return cls(RecursiveCharacterTextSplitter.from_language(language, **kwargs), block_size=block_size)
+
+    def _pattern(self, separator):
+        return separator if self.splitter._is_separator_regex else re.escape(separator)
+
+    def _choose_separator(self, text):
+        """The separator ``_split_text`` would pick for ``text``, and the ones left below it."""
+        separators = self.splitter._separators
+        for i, separator in enumerate(separators):
+            if separator == "":
+                return separator, []
+            if re.search(self._pattern(separator), text):
+                return separator, separators[i + 1:]
+        return separators[-1], []
+
+    def split_blocks(self, blocks: Iterable[str]) -> Iterator[str]:
+        """Yield chunks from an iterable of text blocks (any block boundaries)."""
+        splitter = self.splitter
+        blocks = iter(blocks)
+
+        # Buffer up to probe_chars to choose the top-level separator.
+        probe = []
+        probed = 0
+        for block in blocks:
+            probe.append(block)
+            probed += len(block)
+            if probed >= self.probe_chars:
+                break
+        carry = "".join(probe)
+        if not carry:
+            return
+        separator, lower_separators = self._choose_separator(carry)
+        pattern = self._pattern(separator)
+        compiled = re.compile(pattern) if separator else None
+        merge = _IncrementalMerge(splitter, "" if splitter._keep_separator else separator)
+
+        def process(region):
+            for piece in _split_text_with_regex(region, pattern, splitter._keep_separator):
+                if splitter._length_function(piece) < splitter._chunk_size:
+                    yield from merge.add(piece)
+                    continue
+                yield from merge.flush()
+                if lower_separators:
+                    yield from splitter._split_text(piece, lower_separators)
+                else:
+                    yield piece
+
+        def release(buffer, final=False):
+            """Process ``buffer`` up to its last separator; return the unprocessed rest."""
+            if final or compiled is None:
+                yield from process(buffer)
+                return ""
+            last = None
+            for last in compiled.finditer(buffer):
+                pass
+            # The last separator stays in the carry: more text may extend its match.
+            cut = last.start() if last is not None else 0
+            if cut == 0 and len(buffer) > self.max_piece_chars:
+                cut = self._forced_cut(buffer, lower_separators)
+            if cut:
+                yield from process(buffer[:cut])
+            return buffer[cut:]
+
+        carry = yield from release(carry)
+        for block in blocks:
+            carry = yield from release(carry + block)
+        yield from release(carry, final=True)
+        yield from merge.flush()
+
+    def _forced_cut(self, buffer, lower_separators):
+        """Cut point for an over-long piece: the last lower-level separator before ``max_piece_chars``."""
+        head = buffer[:self.max_piece_chars]
+        for separator in lower_separators:
+            if separator == "":
+                break
+            last = None
+            for last in re.finditer(self._pattern(separator), head):
+                pass
+            if last is not None and last.start() > 0:
+                return last.start()
+        return len(head)
+
+    def split_file(self, path, encoding="utf-8", use_mmap=False) -> Iterator[str]:
+        """Yield the chunks of the file at ``path``."""
+        return self.split_blocks(iter_file_blocks(path, self.block_size, encoding, use_mmap))
+
+    def split_text(self, text) -> List[str]:
+        """Split an in-memory string (same output as the wrapped splitter)."""
+        return list(self.split_blocks(text[i:i + self.block_size] for i in range(0, len(text), self.block_size)))
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("path")
+    arg_parser.add_argument("--chunk-size", type=int, default=1000)
+    arg_parser.add_argument("--chunk-overlap", type=int, default=100)
+    arg_parser.add_argument("--language", choices=[language.value for language in Language])
+    arg_parser.add_argument("--block-size", type=int, default=DEFAULT_BLOCK_SIZE)
+    arg_parser.add_argument("--mmap", action="store_true")
+    arg_parser.add_argument("--show", type=int, default=3, help="Print the first N chunks")
+    args = arg_parser.parse_args()
+
+    settings = dict(chunk_size=args.chunk_size, chunk_overlap=args.chunk_overlap)
+    if args.language:
+        splitter = StreamingTextSplitter.from_language(Language(args.language), block_size=args.block_size, **settings)
+    else:
+        splitter = StreamingTextSplitter(block_size=args.block_size, **settings)
+
+    start, count, chars = time.perf_counter(), 0, 0
+    for chunk in splitter.split_file(args.path, use_mmap=args.mmap):
+        if count < args.show:
+            print(f"Chunk {count + 1}:\n{chunk}\n")
+        count += 1
+        chars += len(chunk)
+    elapsed = time.perf_counter() - start
+    print(f"{count} chunks, {chars} chars in {elapsed:.2f}s ({count / elapsed if elapsed else 0:.0f} chunks/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,246 @@
+"""Recursive splitting with ``chunk_size`` measured in model tokens instead of characters.
+
+Usage:
+    from token_splitter import TokenBudgetSplitter
+    splitter = TokenBudgetSplitter(chunk_size=512, chunk_overlap=64, model_name="gpt-4o")
+    chunks = splitter.split_text(text)          # every chunk is <= 512 tokens
+
+    splitter = TokenBudgetSplitter.from_language(Language.PYTHON, chunk_size=256, chunk_overlap=32)
+
+The splitter behaves like ``RecursiveCharacterTextSplitter`` but counts
+length with a tiktoken encoding:
+
+- the encoding is loaded once per name (``get_encoding`` is cached);
+- the separator-split pieces of each level are counted together (through
+  ``encode_ordinary_batch`` threads when they are long), and counts are
+  memoized by piece text, so repeated lines, boilerplate and the recursive
+  passes are not re-encoded;
+- a piece that is still over budget after the last separator is cut into
+  token windows directly (like ``TokenTextSplitter``), instead of falling
+  back to single characters; windows end on UTF-8 character boundaries and
+  are re-counted after decoding;
+- finished chunks are re-counted as a whole and any chunk over the budget
+  (BPE merges across piece boundaries can differ from the sum) is re-cut,
+  so ``chunk_size`` is a hard limit (short of a single character that
+  alone encodes to more tokens than ``chunk_size``).
+
+OpenAI models map to their own encoding via ``model_name``. Groq's Llama
+models use a different tokenizer that tiktoken does not ship, so for them
+``cl100k_base`` is an estimate; leave a margin under the context limit.
+"""
+import functools
+import os
+import re
+from collections import OrderedDict
+from typing import Iterable, List, Optional
+
+import tiktoken
+from langchain_text_splitters import Language, RecursiveCharacterTextSplitter
+from langchain_text_splitters.character import _split_text_with_regex
+
+DEFAULT_ENCODING = "cl100k_base"
+DEFAULT_MEMO_SIZE = 200_000
+# encode_ordinary_batch submits one thread-pool task per text, which costs more than encoding a short
+# piece; it is only used when the pieces average at least this many characters.
+BATCH_MIN_CHARS = 4096
+
+
+@functools.lru_cache(maxsize=None)
+def get_encoding(encoding_name=DEFAULT_ENCODING, model_name=None) -> tiktoken.Encoding:
+    """Load a tiktoken encoding once per process (by model name when given)."""
+    if model_name:
+        try:
+            return tiktoken.encoding_for_model(model_name)
+        except KeyError:
+            pass
+    return tiktoken.get_encoding(encoding_name)
+
+
+class TokenCounter:
+    """Token length function with batched encoding and an LRU memo keyed by text."""
+
+    def __init__(self, encoding: tiktoken.Encoding, memo_size=DEFAULT_MEMO_SIZE, num_threads=None):
+        self.encoding = encoding
+        self.memo_size = memo_size
+        self.num_threads = num_threads or min(4, os.cpu_count() or 1)
+        self._memo: "OrderedDict[str, int]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __call__(self, text: str) -> int:
+        count = self._memo.get(text)
+        if count is not None:
+            self.hits += 1
+            self._memo.move_to_end(text)
+            return count
+        self.misses += 1
+        count = len(self.encoding.encode_ordinary(text))
+        self._store(text, count)
+        return count
+
+    def count_many(self, texts: Iterable[str]) -> List[int]:
+        """Counts for ``texts``; the texts not in the memo are encoded together, once each."""
+        texts = list(texts)
+        missing = list(dict.fromkeys(text for text in texts if text not in self._memo))
+        if missing:
+            self.misses += len(missing)
+            if self.num_threads > 1 and sum(map(len, missing)) >= BATCH_MIN_CHARS * len(missing):
+                encoded = self.encoding.encode_ordinary_batch(missing, num_threads=self.num_threads)
+            else:
+                encoded = [self.encoding.encode_ordinary(text) for text in missing]
+            for text, tokens in zip(missing, encoded):
+                self._store(text, len(tokens))
+        self.hits += len(texts) - len(missing)
+        return [self._memo[text] for text in texts]
+
+    def _store(self, text, count):
+        self._memo[text] = count
+        if len(self._memo) > self.memo_size:
+            self._memo.popitem(last=False)
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "memo": len(self._memo)}
+
+
+class TokenBudgetSplitter(RecursiveCharacterTextSplitter):
+    """``RecursiveCharacterTextSplitter`` whose ``chunk_size``/``chunk_overlap`` are token counts."""
+
+    def __init__(
+        self,
+        chunk_size: int = 512,
+        chunk_overlap: int = 64,
+        encoding_name: str = DEFAULT_ENCODING,
+        model_name: Optional[str] = None,
+        encoding: Optional[tiktoken.Encoding] = None,
+        separators: Optional[List[str]] = None,
+        memo_size: int = DEFAULT_MEMO_SIZE,
+        **kwargs,
+    ):
+        self.encoding = encoding or get_encoding(encoding_name, model_name)
+        self.counter = TokenCounter(self.encoding, memo_size=memo_size)
+        # Over-long pieces are cut into token windows, so the character-level "" separator is not needed.
+        separators = [separator for separator in (separators or ["\n\n", "\n", " "]) if separator != ""]
+        kwargs.setdefault("keep_separator", True)
+        super().__init__(
+            separators=separators,
+            chunk_size=chunk_size,
+            chunk_overlap=chunk_overlap,
+            length_function=self.counter,
+            **kwargs,
+        )
+
+    @classmethod
+    def from_language(cls, language: Language, **kwargs) -> "TokenBudgetSplitter":
+        separators = cls.get_separators_for_language(language)
+        return cls(separators=separators, is_separator_regex=True, **kwargs)
+
+    def _split_text(self, text: str, separators: List[str]) -> List[str]:
+        final_chunks = []
+        separator, new_separators = separators[-1], []
+        for i, _s in enumerate(separators):
+            if re.search(_s if self._is_separator_regex else re.escape(_s), text):
+                separator, new_separators = _s, separators[i + 1:]
+                break
+
+        _separator = separator if self._is_separator_regex else re.escape(separator)
+        splits = _split_text_with_regex(text, _separator, self._keep_separator)
+        # One batched encode for every piece at this level; _merge_splits then hits the memo.
+        counts = self.counter.count_many(splits)
+
+        good_splits = []
+        _separator = "" if self._keep_separator else separator
+        for split, count in zip(splits, counts):
+            if count < self._chunk_size:
+                good_splits.append(split)
+                continue
+            if good_splits:
+                final_chunks.extend(self._merge_splits(good_splits, _separator))
+                good_splits = []
+            if new_separators:
+                final_chunks.extend(self._split_text(split, new_separators))
+            else:
+                final_chunks.extend(self._split_tokens(split))
+        if good_splits:
+            final_chunks.extend(self._merge_splits(good_splits, _separator))
+        return final_chunks
+
+    def _split_tokens(self, text: str) -> List[str]:
+        """Cut ``text`` into windows of at most ``chunk_size`` tokens with ``chunk_overlap`` overlap.
+
+        Window edges are moved back to UTF-8 character boundaries, so a
+        multi-byte character split across byte tokens is never cut in half,
+        and every window is re-counted as text and shrunk until it fits.
+        """
+        tokens = self.encoding.encode_ordinary(text)
+        pieces = self.encoding.decode_tokens_bytes(tokens)
+        offsets = [0]
+        for piece in pieces:
+            offsets.append(offsets[-1] + len(piece))
+        data = b"".join(pieces)
+
+        def on_boundary(i):
+            # UTF-8 continuation bytes look like 0b10xxxxxx.
+            return offsets[i] == len(data) or data[offsets[i]] & 0xC0 != 0x80
+
+        chunks = []
+        start = 0
+        while start < len(tokens):
+            end = min(start + self._chunk_size, len(tokens))
+            while True:
+                cut = end
+                while cut > start and not on_boundary(cut):
+                    cut -= 1
+                if cut == start:
+                    # One character is longer than the budget; it has to go whole.
+                    cut = end
+                    while not on_boundary(cut):
+                        cut += 1
+                    chunk = data[offsets[start]:offsets[cut]].decode("utf-8")
+                    break
+                chunk = data[offsets[start]:offsets[cut]].decode("utf-8")
+                # Re-encoding the window's text can merge differently from the slice it came from.
+                overshoot = self.counter(chunk) - self._chunk_size
+                if overshoot <= 0 or cut - start == 1:
+                    break
+                end = max(start + 1, cut - overshoot)
+            if self._strip_whitespace:
+                chunk = chunk.strip()
+            if chunk:
+                chunks.append(chunk)
+            if cut >= len(tokens):
+                break
+            start = max(start + 1, cut - self._chunk_overlap)
+            while start < cut and not on_boundary(start):
+                start += 1
+        return chunks
+
+    def split_text(self, text: str) -> List[str]:
+        chunks = super().split_text(text)
+        # Enforce the budget on the joined text, not just the sum of its pieces. The re-cut
+        # windows are counted by _split_tokens itself, so one pass is enough.
+        sizes = self.counter.count_many(chunks)
+        if all(size <= self._chunk_size for size in sizes):
+            return chunks
+        checked = []
+        for chunk, size in zip(chunks, sizes):
+            checked.extend([chunk] if size <= self._chunk_size else self._split_tokens(chunk))
+        return checked
+
+    def count_tokens(self, text: str) -> int:
+        return len(self.encoding.encode_ordinary(text))
+
+
+if __name__ == "__main__":
+    text = """
+Space exploration has led to incredible scientific discoveries. From landing on the Moon to exploring Mars, humanity continues to push the boundaries of what’s possible beyond our planet.
+
+These missions have not only expanded our knowledge of the universe but have also contributed to advancements in technology here on Earth. Satellite communications, GPS, and even certain medical imaging techniques trace their roots back to innovations driven by space programs.
+"""
+
+    splitter = TokenBudgetSplitter(chunk_size=25, chunk_overlap=5)
+    chunks = splitter.split_text(text)
+
+    print(len(chunks))
+    for i, chunk in enumerate(chunks):
+        print(f"Chunk {i + 1} ({splitter.count_tokens(chunk)} tokens):")
+        print(chunk)
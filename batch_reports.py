@@ -0,0 +1,179 @@
+"""Generate medical device reports for many devices without the Streamlit UI.
+
+Usage:
+    python batch_reports.py devices.csv --output-dir reports --concurrency 4 --requests-per-minute 30
+
+Device names are read from a CSV (``device_name`` column, or the first
+column) or a JSONL file (``{"device_name": ...}`` objects or bare strings).
+Each validated report is written as ``<name>.json`` and ``<name>.pdf``
+(names that had to be sanitized get a short hash so they cannot collide).
+Finished devices are appended to ``manifest.jsonl`` in the output
+directory, so re-running the same command after a crash skips them.
+"""
+import argparse
+import asyncio
+import csv
+import hashlib
+import json
+import logging
+import os
+import re
+import time
+
+from langchain_core.rate_limiters import InMemoryRateLimiter
+
+from llm_cache import PersistentResponseCache, cache_session
+from report_model import build_messages, create_llm
+from report_pdf import generate_pdf
+from report_repair import parse_with_repair, repair_metrics
+
+logger = logging.getLogger("batch_reports")
+
+MANIFEST_NAME = "manifest.jsonl"
+DEVICE_COLUMNS = ("device_name", "device", "name")
+
+
+def read_device_names(path):
+    """Read device names from a CSV or JSONL file, dropping blanks and duplicates."""
+    names = []
+    with open(path, newline="", encoding="utf-8") as f:
+        if path.endswith(".jsonl"):
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                record = json.loads(line)
+                names.append(record if isinstance(record, str) else record["device_name"])
+        else:
+            reader = csv.reader(f)
+            header = next(reader, None)
+            column = 0
+            columns = [cell.strip().lower() for cell in header or []]
+            for candidate in DEVICE_COLUMNS:
+                if candidate in columns:
+                    column = columns.index(candidate)
+                    break
+            else:
+                # No recognised header: treat the first row as data.
+                if header:
+                    names.append(header[0])
+            for row in reader:
+                if len(row) > column:
+                    names.append(row[column])
+    return list(dict.fromkeys(name.strip() for name in names if name.strip()))
+
+
+def safe_filename(device_name):
+    name = re.sub(r'[^a-zA-Z0-9_]', '_', device_name)
+    if name != device_name:
+        # "Hip Implant" and "Hip-Implant" would both become "Hip_Implant".
+        name += "_" + hashlib.sha1(device_name.encode("utf-8")).hexdigest()[:8]
+    return name
+
+
+class Manifest:
+    """Append-only JSONL checkpoint of finished devices."""
+
+    def __init__(self, output_dir):
+        self.path = os.path.join(output_dir, MANIFEST_NAME)
+        self.done = set()
+        if os.path.exists(self.path):
+            with open(self.path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        # A crash can leave a truncated last line.
+                        continue
+                    if record.get("status") == "done":
+                        self.done.add(record["device_name"])
+
+    def record(self, entry):
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        if entry["status"] == "done":
+            self.done.add(entry["device_name"])
+
+
+def _write_json(path, text):
+    # Write-then-rename so a crash never leaves a half-written report behind.
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+
+async def generate_one(llm, device_name, output_dir, semaphore, manifest, retries):
+    async with semaphore:
+        start = time.perf_counter()
+        entry = {"device_name": device_name}
+        # Replies for a device that fails are dropped from the cache, so a re-run asks the model again.
+        device_llm, session = cache_session(llm)
+        try:
+            response = await device_llm.with_retry(stop_after_attempt=retries + 1).ainvoke(build_messages(device_name))
+            content = re.sub(r"<think>.*?</think>", "", response.content, flags=re.DOTALL).strip()
+            # The repair tiers and PDF rendering are blocking; keep them off the event loop.
+            report, tier = await asyncio.to_thread(parse_with_repair, content, device_llm, device_name)
+
+            base = os.path.join(output_dir, safe_filename(device_name))
+            _write_json(base + ".json", report.model_dump_json(by_alias=True, indent=2))
+            pdf_bytes = await asyncio.to_thread(generate_pdf, report, device_name)
+            with open(base + ".pdf", "wb") as f:
+                f.write(pdf_bytes)
+            entry.update(status="done", tier=tier, json=base + ".json", pdf=base + ".pdf")
+        except Exception as e:
+            logger.warning("Failed to generate report for %r: %s", device_name, e)
+            if session is not None:
+                session.discard()
+            entry.update(status="failed", error=str(e))
+        entry["elapsed_s"] = round(time.perf_counter() - start, 2)
+        manifest.record(entry)
+        logger.info("%s: %s in %.1fs", device_name, entry["status"], entry["elapsed_s"])
+        return entry
+
+
+async def run_batch(device_names, output_dir, concurrency, requests_per_minute, retries, use_cache):
+    os.makedirs(output_dir, exist_ok=True)
+    manifest = Manifest(output_dir)
+    pending = [name for name in device_names if name not in manifest.done]
+    logger.info("%d devices, %d already done, %d to generate", len(device_names), len(device_names) - len(pending), len(pending))
+
+    rate_limiter = InMemoryRateLimiter(
+        requests_per_second=requests_per_minute / 60,
+        check_every_n_seconds=0.1,
+        max_bucket_size=concurrency,
+    )
+    llm = create_llm(cache=PersistentResponseCache() if use_cache else None, rate_limiter=rate_limiter)
+    semaphore = asyncio.Semaphore(concurrency)
+    return await asyncio.gather(*(
+        generate_one(llm, name, output_dir, semaphore, manifest, retries) for name in pending
+    ))
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("input", help="CSV or JSONL file with device names")
+    arg_parser.add_argument("--output-dir", default="reports")
+    arg_parser.add_argument("--concurrency", type=int, default=4, help="Maximum in-flight generations")
+    arg_parser.add_argument("--requests-per-minute", type=float, default=30, help="Groq request budget")
+    arg_parser.add_argument("--retries", type=int, default=2, help="Retries per failed model request")
+    arg_parser.add_argument("--no-cache", action="store_true", help="Bypass the on-disk response cache")
+    args = arg_parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    device_names = read_device_names(args.input)
+    results = asyncio.run(run_batch(
+        device_names, args.output_dir, args.concurrency, args.requests_per_minute, args.retries, not args.no_cache
+    ))
+
+    failed = [r["device_name"] for r in results if r["status"] != "done"]
+    print(f"Generated {len(results) - len(failed)}/{len(results)} reports into {args.output_dir}")
+    print(f"Repair tiers: {repair_metrics.snapshot()['counts']}")
+    if failed:
+        print("Failed (re-run to retry):", ", ".join(failed))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,204 @@
+"""Bounded on-disk session history shared by the Quiz and Blog Post generator apps.
+
+Usage:
+    from history_store import HistoryStore, SessionHistory
+    history = SessionHistory(st.session_state, registry.get("history_store", HistoryStore))
+    history.add({"topic": topic}, payload, blob=image_bytes)
+
+The projects reach this module through their ``resources.py``, which puts
+the repository root on ``sys.path``.
+"""
+import io
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+import zlib
+
+DEFAULT_HISTORY_PATH = os.getenv("HISTORY_DB_PATH", ".history/history.sqlite3")
+DEFAULT_MAX_ENTRIES = int(os.getenv("HISTORY_MAX_ENTRIES", 50))
+DEFAULT_TTL_SECONDS = float(os.getenv("HISTORY_TTL", 24 * 3600))
+DEFAULT_PURGE_INTERVAL = float(os.getenv("HISTORY_PURGE_INTERVAL", 600))
+PREVIEW_CHARS = 160
+EXPORT_STATE_KEY = "history_export"
+
+
+class HistoryStore:
+    """Bounded, compressed store for full history entries.
+
+    Entries are zlib-compressed JSON rows keyed by session. Each session keeps
+    at most ``max_entries`` (oldest dropped first). Sessions that have not
+    added an entry for ``ttl_seconds`` are purged when the store is opened and
+    then from :meth:`add`, at most once every ``purge_interval`` seconds, so
+    the file does not grow with every visitor of a long-running server.
+    """
+
+    def __init__(
+        self,
+        path=DEFAULT_HISTORY_PATH,
+        max_entries=DEFAULT_MAX_ENTRIES,
+        ttl_seconds=DEFAULT_TTL_SECONDS,
+        purge_interval=DEFAULT_PURGE_INTERVAL,
+    ):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.purge_interval = purge_interval
+        self._last_purge = 0.0
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        # Shared by every Streamlit session thread, so guarded by a lock.
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS entries (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                session_id TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                payload BLOB NOT NULL,
+                blob BLOB
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_entries_session ON entries (session_id, id)")
+        self._conn.commit()
+        with self._lock:
+            self._purge_expired()
+
+    def _purge_expired(self):
+        """Drop sessions whose newest entry is older than ``ttl_seconds``; caller holds the lock."""
+        now = time.time()
+        self._last_purge = now
+        if not self.ttl_seconds:
+            return
+        self._conn.execute(
+            """
+            DELETE FROM entries WHERE session_id IN (
+                SELECT session_id FROM entries GROUP BY session_id HAVING MAX(created_at) < ?
+            )
+            """,
+            (now - self.ttl_seconds,),
+        )
+        self._conn.commit()
+
+    def add(self, session_id, payload, blob=None):
+        """Store one entry; returns ``(entry_id, evicted_ids)``."""
+        data = zlib.compress(json.dumps(payload).encode("utf-8"))
+        with self._lock:
+            if time.time() - self._last_purge >= self.purge_interval:
+                self._purge_expired()
+            cursor = self._conn.execute(
+                "INSERT INTO entries (session_id, created_at, payload, blob) VALUES (?, ?, ?, ?)",
+                (session_id, time.time(), data, blob),
+            )
+            evicted = [row[0] for row in self._conn.execute(
+                "SELECT id FROM entries WHERE session_id = ? ORDER BY id DESC LIMIT -1 OFFSET ?",
+                (session_id, self.max_entries),
+            )]
+            if evicted:
+                self._conn.executemany("DELETE FROM entries WHERE id = ?", [(i,) for i in evicted])
+            self._conn.commit()
+        return cursor.lastrowid, evicted
+
+    def get(self, entry_id):
+        """Return ``(payload, blob)`` for an entry, or ``(None, None)`` if it is gone."""
+        with self._lock:
+            row = self._conn.execute("SELECT payload, blob FROM entries WHERE id = ?", (entry_id,)).fetchone()
+        if row is None:
+            return None, None
+        return json.loads(zlib.decompress(row[0])), row[1]
+
+    def iter_entries(self, session_id):
+        """Yield ``(entry_id, payload, blob)`` for a session, newest first, one row at a time."""
+        with self._lock:
+            ids = [row[0] for row in self._conn.execute(
+                "SELECT id FROM entries WHERE session_id = ? ORDER BY id DESC", (session_id,)
+            )]
+        for entry_id in ids:
+            payload, blob = self.get(entry_id)
+            if payload is not None:
+                yield entry_id, payload, blob
+
+    def clear(self, session_id):
+        with self._lock:
+            self._conn.execute("DELETE FROM entries WHERE session_id = ?", (session_id,))
+            self._conn.commit()
+
+
+def preview(text, limit=PREVIEW_CHARS):
+    text = " ".join(str(text).split())
+    return text if len(text) <= limit else text[:limit - 1] + "…"
+
+
+class SessionHistory:
+    """One Streamlit session's history: summaries in ``state``, full entries in a HistoryStore.
+
+    ``state`` is ``st.session_state`` (any mutable mapping works). Only the
+    summary dicts live there; :meth:`load` fetches the full entry on demand.
+    """
+
+    def __init__(self, state, store):
+        self.store = store
+        self.state = state
+        if "history_session_id" not in state:
+            state["history_session_id"] = uuid.uuid4().hex
+        self.session_id = state["history_session_id"]
+        self.summaries = state.setdefault("history", [])
+
+    def add(self, summary, payload, blob=None):
+        entry_id, evicted = self.store.add(self.session_id, payload, blob)
+        self.summaries.append({**summary, "id": entry_id})
+        if evicted:
+            evicted = set(evicted)
+            self.summaries[:] = [s for s in self.summaries if s["id"] not in evicted]
+        self.state["history_version"] = entry_id
+        return entry_id
+
+    def load(self, summary):
+        return self.store.get(summary["id"])
+
+    def page(self, page, page_size):
+        """Summaries on 1-based ``page``, newest first."""
+        newest_first = self.summaries[::-1]
+        start = (page - 1) * page_size
+        return newest_first[start:start + page_size]
+
+    def page_count(self, page_size):
+        return max(1, -(-len(self.summaries) // page_size))
+
+    def clear(self):
+        self.store.clear(self.session_id)
+        self.summaries.clear()
+        self.state["history_version"] = None
+
+    def export(self, write_zip):
+        """Return archive bytes written by ``write_zip(history, fileobj)``, rebuilt only when the version changed.
+
+        The last archive is cached in ``state`` next to the version it was
+        built from; reruns that do not add or clear entries reuse it.
+        """
+        cached = self.cached_export()
+        if cached is not None:
+            return cached
+        buffer = io.BytesIO()
+        write_zip(self, buffer)
+        data = buffer.getvalue()
+        self.state[EXPORT_STATE_KEY] = (self.state.get("history_version"), data)
+        return data
+
+    def cached_export(self):
+        """The cached archive if it is still current, else ``None`` (never builds one)."""
+        cached = self.state.get(EXPORT_STATE_KEY)
+        if cached is not None and cached[0] == self.state.get("history_version"):
+            return cached[1]
+        return None
+
+    def __len__(self):
+        return len(self.summaries)
@@ -0,0 +1,249 @@
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Iterator, Optional
+
+from langchain_core.caches import RETURN_VAL_TYPE, BaseCache
+from langchain_core.load import dumps, loads
+from langchain_core.messages import message_chunk_to_message
+from langchain_core.outputs import ChatGeneration
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_PATH = os.getenv("LLM_CACHE_PATH", ".llm_cache/responses.sqlite3")
+DEFAULT_TTL_SECONDS = float(os.getenv("LLM_CACHE_TTL", 7 * 24 * 3600))
+DEFAULT_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", 1000))
+
+
+class PersistentResponseCache(BaseCache):
+    """On-disk, content-addressed cache for chat model responses.
+
+    LangChain hands every cache call the serialized messages (``prompt``) and
+    the serialized model configuration (``llm_string``), which carries the
+    model name and temperature. Both are hashed into a single key, so a repeat
+    request for the same device returns the stored generation instead of
+    calling the model again.
+
+    Entries older than ``ttl_seconds`` are treated as misses and removed.
+    Once more than ``max_entries`` rows are stored, the least recently read
+    ones are evicted. The SQLite file survives Streamlit reruns and process
+    restarts. :meth:`invalidate` drops one entry, e.g. a reply that failed
+    validation (see :class:`CacheSession`).
+    """
+
+    def __init__(
+        self,
+        path: str = DEFAULT_CACHE_PATH,
+        ttl_seconds: Optional[float] = DEFAULT_TTL_SECONDS,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+    ):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        # Streamlit serves sessions from several threads, so one connection
+        # is shared behind a lock.
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_responses_last_access ON responses (last_access)"
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(prompt: str, llm_string: str) -> str:
+        """Hash the model configuration and the formatted messages into one key."""
+        digest = hashlib.sha256()
+        digest.update(llm_string.encode("utf-8"))
+        digest.update(b"\x00")
+        digest.update(prompt.encode("utf-8"))
+        return digest.hexdigest()
+
+    def lookup(self, prompt: str, llm_string: str) -> Optional[RETURN_VAL_TYPE]:
+        key = self.make_key(prompt, llm_string)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None and self._is_expired(row[1], now):
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._conn.commit()
+                row = None
+            if row is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self._conn.execute(
+                    "UPDATE responses SET last_access = ? WHERE key = ?", (now, key)
+                )
+                self._conn.commit()
+
+        if row is None:
+            logger.info("LLM cache miss (hits=%d, misses=%d)", self.hits, self.misses)
+            return None
+        logger.info("LLM cache hit (hits=%d, misses=%d)", self.hits, self.misses)
+        return loads(row[0])
+
+    def update(self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE) -> None:
+        key = self.make_key(prompt, llm_string)
+        value = dumps(list(return_val))
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, value, created_at, last_access) "
+                "VALUES (?, ?, ?, ?)",
+                (key, value, now, now),
+            )
+            self._evict(now)
+            self._conn.commit()
+
+    def invalidate(self, prompt: str, llm_string: str) -> bool:
+        """Drop the entry for ``prompt``/``llm_string``; return whether one was stored."""
+        key = self.make_key(prompt, llm_string)
+        with self._lock:
+            cursor = self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            self._conn.commit()
+        return cursor.rowcount > 0
+
+    def clear(self, **kwargs: Any) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+
+    def stats(self) -> dict:
+        """Return the hit/miss counters and the current number of stored entries."""
+        with self._lock:
+            (entries,) = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": entries,
+        }
+
+    def _is_expired(self, created_at: float, now: float) -> bool:
+        return self.ttl_seconds is not None and now - created_at > self.ttl_seconds
+
+    def _evict(self, now: float) -> None:
+        # Caller holds the lock.
+        if self.ttl_seconds is not None:
+            cursor = self._conn.execute(
+                "DELETE FROM responses WHERE created_at < ?", (now - self.ttl_seconds,)
+            )
+            self.evictions += cursor.rowcount
+        (count,) = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()
+        overflow = count - self.max_entries
+        if overflow > 0:
+            cursor = self._conn.execute(
+                "DELETE FROM responses WHERE key IN "
+                "(SELECT key FROM responses ORDER BY last_access ASC LIMIT ?)",
+                (overflow,),
+            )
+            self.evictions += cursor.rowcount
+
+
+class CacheSession(BaseCache):
+    """View of a response cache that remembers every key it served or stored.
+
+    A reply is cached before anyone knows whether it validates. Run one unit
+    of work (a report, a section) through a session and call
+    :meth:`discard` when its output turns out unusable, so the next
+    attempt asks the model again instead of replaying the bad reply. With
+    ``refresh=True`` lookups always miss and new replies overwrite the
+    stored ones, which is what a retry after a validation failure needs.
+    """
+
+    def __init__(self, cache: BaseCache, refresh: bool = False):
+        self.cache = cache
+        self.refresh = refresh
+        self.keys = set()
+        self._lock = threading.Lock()
+
+    def _remember(self, prompt: str, llm_string: str) -> None:
+        with self._lock:
+            self.keys.add((prompt, llm_string))
+
+    def lookup(self, prompt: str, llm_string: str) -> Optional[RETURN_VAL_TYPE]:
+        self._remember(prompt, llm_string)
+        return None if self.refresh else self.cache.lookup(prompt, llm_string)
+
+    def update(self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE) -> None:
+        self._remember(prompt, llm_string)
+        self.cache.update(prompt, llm_string, return_val)
+
+    def clear(self, **kwargs: Any) -> None:
+        self.cache.clear(**kwargs)
+
+    def invalidate(self, prompt: str, llm_string: str) -> bool:
+        return bool(hasattr(self.cache, "invalidate") and self.cache.invalidate(prompt, llm_string))
+
+    def discard(self) -> int:
+        """Drop every entry this session touched from the underlying cache."""
+        with self._lock:
+            keys, self.keys = self.keys, set()
+        dropped = sum(self.invalidate(prompt, llm_string) for prompt, llm_string in keys)
+        logger.info("LLM cache: dropped %d unusable entries", dropped)
+        return dropped
+
+
+def cache_session(llm, refresh=False):
+    """Return a copy of ``llm`` that goes through a new :class:`CacheSession`, and the session.
+
+    Without a response cache on ``llm``, ``llm`` itself and ``None`` are returned.
+    """
+    cache = getattr(llm, "cache", None)
+    if not isinstance(cache, BaseCache):
+        return llm, None
+    session = CacheSession(cache, refresh=refresh)
+    return llm.model_copy(update={"cache": session}), session
+
+
+def stream_with_cache(llm, messages, config=None) -> Iterator[str]:
+    """Stream the text of ``llm``'s reply, going through its response cache.
+
+    ``BaseChatModel.stream`` skips the cache, so this helper does the lookup
+    itself: a hit is replayed as a single chunk, and a streamed miss is stored
+    under the same key ``llm.invoke(messages)`` would use. ``config`` (e.g.
+    tracing callbacks) is passed through to ``llm.stream``.
+    """
+    cache = llm.cache if isinstance(llm.cache, BaseCache) else None
+    if cache is None:
+        for chunk in llm.stream(messages, config=config):
+            yield chunk.content
+        return
+
+    prompt = dumps(messages)
+    llm_string = llm._get_llm_string()
+    cached = cache.lookup(prompt, llm_string)
+    if cached:
+        yield cached[0].text
+        return
+
+    full = None
+    for chunk in llm.stream(messages, config=config):
+        full = chunk if full is None else full + chunk
+        yield chunk.content
+    if full is not None:
+        cache.update(prompt, llm_string, [ChatGeneration(message=message_chunk_to_message(full))])
@@ -0,0 +1,92 @@
+"""A shared background event loop for the Streamlit project apps.
+
+Usage:
+    from resource_registry import get_loop_service
+    result = get_loop_service().run(generator.generate(topic))
+    for event in get_loop_service().iter_async(generator.astream_study_material(topic)):
+        ...
+"""
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+
+DEFAULT_WORKERS = 8
+
+
+class LoopService:
+    """A long-lived asyncio event loop in a daemon thread, shared by every Streamlit session.
+
+    Script threads hand coroutines to :meth:`submit` (returns a
+    ``concurrent.futures.Future``) or :meth:`run` (blocks for the result), and
+    async generators to :meth:`iter_async` (yields their items), so
+    generations from several users overlap on one loop instead of each click
+    spinning up its own with ``asyncio.run``. Async HTTP clients created on
+    this loop keep their connection pools for the life of the process.
+
+    Blocking work scheduled from the loop (``asyncio.to_thread``,
+    ``run_in_executor(None, ...)``, LangChain's sync fallbacks such as the
+    Vertex image call, PIL decoding) runs on the service's thread pool.
+    """
+
+    def __init__(self, name="app-event-loop", max_workers=DEFAULT_WORKERS):
+        self.loop = asyncio.new_event_loop()
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=f"{name}-worker")
+        self.loop.set_default_executor(self.executor)
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._thread = threading.Thread(target=self._run_loop, name=name, daemon=True)
+        self._thread.start()
+
+    def _run_loop(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    def submit(self, coro):
+        """Schedule ``coro`` on the loop and return a thread-safe future for its result."""
+        future = asyncio.run_coroutine_threadsafe(coro, self.loop)
+        with self._lock:
+            self._in_flight += 1
+        future.add_done_callback(self._finished)
+        return future
+
+    def _finished(self, future):
+        with self._lock:
+            self._in_flight -= 1
+
+    def run(self, coro, timeout=None):
+        """Run ``coro`` on the loop and wait for its result; cancels it on timeout."""
+        future = self.submit(coro)
+        try:
+            return future.result(timeout)
+        except TimeoutError:
+            future.cancel()
+            raise
+
+    def iter_async(self, async_iterable):
+        """Consume an async iterator on the loop, yielding its items synchronously.
+
+        If the consumer stops early (an exception, or Streamlit abandoning the
+        rerun), the async generator is closed on the loop so its pending tasks
+        and ``finally`` blocks run there.
+        """
+        iterator = async_iterable.__aiter__()
+        try:
+            while True:
+                try:
+                    yield self.run(iterator.__anext__())
+                except StopAsyncIteration:
+                    return
+        finally:
+            aclose = getattr(iterator, "aclose", None)
+            if aclose is not None:
+                self.submit(aclose())
+
+    @property
+    def in_flight(self):
+        """Number of submitted coroutines that have not finished yet."""
+        return self._in_flight
+
+    def shutdown(self, timeout=5):
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join(timeout)
+        self.executor.shutdown(wait=False)
@@ -0,0 +1,136 @@
+import re
+from dataclasses import dataclass, field
+from typing import Iterable, Iterator, List, Optional
+
+# A header is a whole line that is either "1. **Title**" (optionally with a
+# trailing colon) or a Markdown heading such as "#### Title".
+HEADER_PATTERN = re.compile(r'^\s*(?:(?:\d+\.\s+)?\*\*([^*]+)\*\*:?|#{1,6}\s+(.+?))\s*$')
+BULLET_PATTERN = re.compile(r'^([ \t]*)(?:[-*+•]|\d+\.)\s+(.*)$')
+
+
+@dataclass
+class Run:
+    text: str
+    bold: bool = False
+
+
+@dataclass
+class Block:
+    """One content line: a ``bullet`` (with nesting ``level``), plain ``text`` or a ``blank`` line."""
+    kind: str
+    runs: List[Run] = field(default_factory=list)
+    level: int = 0
+
+
+@dataclass
+class Section:
+    title: str
+    blocks: List[Block] = field(default_factory=list)
+
+
+def parse_runs(text) -> List[Run]:
+    """Split ``text`` on ``**`` markers into alternating regular/bold runs."""
+    runs = []
+    for i, part in enumerate(text.split("**")):
+        if part:
+            runs.append(Run(part, bold=i % 2 == 1))
+    return runs
+
+
+class ReportMarkdownParser:
+    """Single-pass tokenizer turning report text into a section/bullet/bold-run tree.
+
+    Lines are consumed one at a time through :meth:`feed`, which returns the
+    previous section once a new header closes it, so the tree can be built
+    from a streaming LLM response as well as from a finished string.
+    Content before the first header goes into an untitled section.
+    """
+
+    def __init__(self):
+        self._current: Optional[Section] = None
+
+    def feed(self, line) -> Optional[Section]:
+        line = line.rstrip("\r\n")
+        header = HEADER_PATTERN.match(line)
+        if header:
+            finished = self._finish(self._current)
+            self._current = Section((header.group(1) or header.group(2)).strip())
+            return finished
+
+        if self._current is None:
+            self._current = Section("")
+        blocks = self._current.blocks
+        if not line.strip():
+            # Collapse runs of blank lines and skip leading ones.
+            if blocks and blocks[-1].kind != "blank":
+                blocks.append(Block("blank"))
+            return None
+
+        bullet = BULLET_PATTERN.match(line)
+        if bullet:
+            # Two spaces or one tab per nesting level.
+            level = min(len(bullet.group(1).expandtabs(2)) // 2, 2)
+            blocks.append(Block("bullet", parse_runs(bullet.group(2).strip()), level))
+        else:
+            blocks.append(Block("text", parse_runs(line.strip())))
+        return None
+
+    def close(self) -> Optional[Section]:
+        """Return the last open section, if it has any content."""
+        finished, self._current = self._finish(self._current), None
+        return finished
+
+    @staticmethod
+    def _finish(section):
+        if section is None or not (section.title or section.blocks):
+            return None
+        while section.blocks and section.blocks[-1].kind == "blank":
+            section.blocks.pop()
+        return section
+
+
+def iter_sections(lines: Iterable[str]) -> Iterator[Section]:
+    """Yield each section as soon as the line that ends it has been read."""
+    parser = ReportMarkdownParser()
+    for line in lines:
+        section = parser.feed(line)
+        if section is not None:
+            yield section
+    last = parser.close()
+    if last is not None:
+        yield last
+
+
+def parse_report(text) -> List[Section]:
+    """Parse finished report text into sections."""
+    sections = list(iter_sections(text.strip().splitlines()))
+    return sections or [Section("Report Content")]
+
+
+def iter_lines(chunks: Iterable[str]) -> Iterator[str]:
+    """Re-split a stream of text chunks into complete lines."""
+    pending = ""
+    for chunk in chunks:
+        pending += chunk
+        *complete, pending = pending.split("\n")
+        yield from complete
+    if pending:
+        yield pending
+
+
+def runs_to_markdown(runs):
+    return "".join(f"**{run.text}**" if run.bold else run.text for run in runs)
+
+
+def section_to_markdown(section: Section) -> str:
+    """Render one section back to Markdown for ``st.markdown``."""
+    lines = [f"#### {section.title}"] if section.title else []
+    for block in section.blocks:
+        if block.kind == "blank":
+            lines.append("")
+        elif block.kind == "bullet":
+            lines.append("  " * block.level + "- " + runs_to_markdown(block.runs))
+        else:
+            lines.append("")
+            lines.append(runs_to_markdown(block.runs))
+    return "\n".join(lines)
@@ -0,0 +1,118 @@
+import os
+from typing import List
+from dotenv import load_dotenv
+from pydantic import BaseModel, Field
+from langchain_groq import ChatGroq
+from langchain.prompts import ChatPromptTemplate
+from langchain.schema import SystemMessage, HumanMessage
+from langchain.output_parsers import PydanticOutputParser
+
+# Load API key
+load_dotenv()
+GROQ_API_KEY = os.getenv("GROQ_API_KEY")
+
+MODEL_NAME = "deepseek-r1-distill-llama-70b"
+
+# ---------------- Pydantic Schema ---------------- #
+
+class PrimaryMaterials(BaseModel):
+    materials: List[str]
+    standards: List[str]
+    
+
+class MechanicalProperties(BaseModel):
+    tensile_strength: str
+    compressive_strength: str
+    shear_strength: str
+    elasticity: str
+    fatigue_resistance: str
+    testing_standards: List[str]
+
+class DegradationProfile(BaseModel):
+    biodegradable: bool
+    absorption_time: str
+    breakdown_mechanism: str
+    by_products: str
+    standards: List[str]
+
+class DimensionIntegrity(BaseModel):
+    physical_dimensions: str
+    surface_finish: str
+    load_capacity: str
+    durability: str
+    standards: List[str]
+
+class PerformanceCriteria(BaseModel):
+    retention_strength: str
+    failure_threshold: str
+    wear_resistance: str
+    shelf_life: str
+    standards: List[str]
+
+class FunctionalPerformance(BaseModel):
+    function: str
+    properties: List[str]
+    performance_standards: List[str]
+    notes: str
+
+class MedicalDeviceReport(BaseModel):
+    primary_materials: PrimaryMaterials = Field(alias="Primary Materials")
+    mechanical_properties: MechanicalProperties = Field(alias="Mechanical Properties")
+    degradation_profile: DegradationProfile = Field(alias="Degradation Profile")
+    dimension_integrity: DimensionIntegrity = Field(alias="Dimension and Structural Integrity")
+    performance_criteria: PerformanceCriteria = Field(alias="Performance Criteria")
+    functional_and_performance_characteristics: FunctionalPerformance = Field(alias="Functional and Performance Characteristics")
+
+# ---------------- LangChain Parser ---------------- #
+
+parser = PydanticOutputParser(pydantic_object=MedicalDeviceReport)
+
+# ---------------- Prompt Setup ---------------- #
+
+system_message = SystemMessage(content=f"""
+You are a regulatory documentation assistant. You will generate a structured medical device report that matches this Pydantic schema exactly:
+
+{parser.get_format_instructions()}
+
+Include all 6 sections:
+1. Primary Materials  
+2. Mechanical Properties  
+3. Degradation Profile  
+4. Dimension and Structural Integrity  
+5. Functional and Performance Characteristics  
+6. Performance Criteria
+
+Respond only with valid JSON. No markdown or commentary.
+""")
+
+human_message_template = "Device: {device_name}"
+
+# Display order of the report sections: (title, MedicalDeviceReport field)
+SECTIONS = [
+    ("Primary Materials", "primary_materials"),
+    ("Mechanical Properties", "mechanical_properties"),
+    ("Degradation Profile", "degradation_profile"),
+    ("Dimension and Structural Integrity", "dimension_integrity"),
+    ("Performance Criteria", "performance_criteria"),
+    ("Functional and Performance Characteristics", "functional_and_performance_characteristics"),
+]
+
+# ---------------- Helpers ---------------- #
+
+def create_llm(temperature=0.2, cache=None, rate_limiter=None):
+    """Create the Groq chat model used for report generation."""
+    return ChatGroq(
+        model=MODEL_NAME,
+        temperature=temperature,
+        api_key=GROQ_API_KEY,
+        cache=cache,
+        rate_limiter=rate_limiter
+    )
+
+def build_messages(device_name):
+    """Format the single-shot report prompt for ``device_name``."""
+    prompt = ChatPromptTemplate.from_messages([
+        system_message,
+        HumanMessage(content=human_message_template.format(device_name=device_name))
+    ])
+    return prompt.format_messages()
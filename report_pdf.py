@@ -0,0 +1,308 @@
+import itertools
+import re
+from datetime import datetime
+from typing import List
+from fpdf import FPDF
+from report_markdown import Run, Section, parse_report
+from report_model import MedicalDeviceReport
+
+# ---------------- Font Metrics ---------------- #
+
+class FontMetrics:
+    """Process-wide cache of string widths for the built-in PDF fonts.
+
+    Widths are measured once per character and font (family, style, size)
+    and once per distinct word, so wrapping a paragraph costs one dict
+    lookup per word instead of re-measuring the growing line.
+    """
+
+    def __init__(self):
+        self._chars = {}
+        self._words = {}
+
+    def _font_key(self, pdf):
+        return (pdf.font_family, pdf.font_style, pdf.font_size_pt)
+
+    def word_width(self, pdf, word):
+        key = self._font_key(pdf)
+        words = self._words.setdefault(key, {})
+        width = words.get(word)
+        if width is None:
+            chars = self._chars.setdefault(key, {})
+            width = 0.0
+            for ch in word:
+                ch_width = chars.get(ch)
+                if ch_width is None:
+                    ch_width = chars[ch] = pdf.get_string_width(ch)
+                width += ch_width
+            if len(words) < 50000:
+                words[word] = width
+        return width
+
+font_metrics = FontMetrics()
+
+
+def to_latin1(text):
+    # The core PDF fonts only cover Latin-1; replace anything else instead of failing on output.
+    return text.encode("latin-1", "replace").decode("latin-1")
+
+
+class WrappingPDF(FPDF):
+    """FPDF with linear-time word wrapping backed by the shared font metrics."""
+
+    def wrap_lines(self, text, width):
+        """Split ``text`` into lines no wider than ``width`` in a single pass over its words.
+
+        Newlines in ``text`` always start a new line, and a word wider than
+        ``width`` on its own is broken between characters.
+        """
+        space = font_metrics.word_width(self, " ")
+        lines = []
+        for paragraph in text.split("\n"):
+            line, line_width = [], 0.0
+            for word in paragraph.split():
+                for piece, piece_width in self.break_word(word, width):
+                    needed = piece_width if not line else line_width + space + piece_width
+                    if line and needed > width:
+                        lines.append(" ".join(line))
+                        line, line_width = [piece], piece_width
+                    else:
+                        line.append(piece)
+                        line_width = needed
+            lines.append(" ".join(line))
+        return lines
+
+    def break_word(self, word, width):
+        """``(piece, width)`` pairs for ``word``: the word itself, or character runs that fit ``width``."""
+        word_width = font_metrics.word_width(self, word)
+        if word_width <= width:
+            return [(word, word_width)]
+        pieces, piece, piece_width = [], "", 0.0
+        for ch in word:
+            ch_width = font_metrics.word_width(self, ch)
+            if piece and piece_width + ch_width > width:
+                pieces.append((piece, piece_width))
+                piece, piece_width = "", 0.0
+            piece += ch
+            piece_width += ch_width
+        pieces.append((piece, piece_width))
+        return pieces
+
+    def write_wrapped(self, text, line_height, indent=None):
+        """Write ``text`` as wrapped lines starting at ``indent`` (defaults to the left margin)."""
+        x = self.l_margin if indent is None else indent
+        width = self.w - self.r_margin - x
+        for line in self.wrap_lines(to_latin1(text), width):
+            self.set_x(x)
+            self.cell(0, line_height, line, ln=True)
+
+    def write_runs(self, runs, line_height, indent=None):
+        """Write regular/bold ``runs`` as wrapped lines, switching font style per run.
+
+        Spaces are kept only where the source had whitespace, so a word made
+        of several runs (``**Bold**ing``) is written and wrapped as one word.
+        """
+        x = self.l_margin if indent is None else indent
+        width = self.w - self.r_margin - x
+        family = self.font_family
+
+        # Words as lists of (style, text, width) fragments; a word continues into the next run
+        # unless whitespace separates them.
+        words, spaces, glued = [], {}, False
+        for run in runs:
+            style = "B" if run.bold else ""
+            self.set_font(family, style)
+            spaces[style] = font_metrics.word_width(self, " ")
+            text = to_latin1(run.text)
+            for match in re.finditer(r"\S+", text):
+                fragment = (style, match.group(), font_metrics.word_width(self, match.group()))
+                if glued and match.start() == 0:
+                    words[-1].append(fragment)
+                else:
+                    words.append([fragment])
+            if text:
+                glued = bool(words) and not text[-1].isspace()
+
+        # Lines as lists of (style, text) segments, spaces included.
+        lines, line, line_width = [], [], 0.0
+        for word in words:
+            word_width = sum(fragment_width for _, _, fragment_width in word)
+            if line:
+                space_style = line[-1][0]
+                if line_width + spaces[space_style] + word_width <= width:
+                    line.append((space_style, " "))
+                    line_width += spaces[space_style]
+                else:
+                    lines.append(line)
+                    line, line_width = [], 0.0
+            if line_width + word_width <= width:
+                line.extend((style, text) for style, text, _ in word)
+                line_width += word_width
+                continue
+            # Wider than a whole line: break it between characters.
+            for style, text, _ in word:
+                self.set_font(family, style)
+                for ch in text:
+                    ch_width = font_metrics.word_width(self, ch)
+                    if line and line_width + ch_width > width:
+                        lines.append(line)
+                        line, line_width = [], 0.0
+                    line.append((style, ch))
+                    line_width += ch_width
+        if line:
+            lines.append(line)
+
+        for line in lines or [[]]:
+            self.set_x(x)
+            # Emit one cell per stretch of segments sharing a style.
+            for style, segments in itertools.groupby(line, key=lambda segment: segment[0]):
+                text = "".join(text for _, text in segments)
+                self.set_font(family, style)
+                self.cell(font_metrics.word_width(self, text), line_height, text, ln=0)
+            self.ln(line_height)
+        self.set_font(family, "")
+
+    def output_bytes(self):
+        """Render the document in memory and return the PDF bytes."""
+        data = self.output(dest="S")
+        # PyFPDF returns a latin-1 str, fpdf2 a bytearray.
+        return data.encode("latin-1") if isinstance(data, str) else bytes(data)
+
+# ---------------- Enhanced PDF Generator ---------------- #
+
+class PDFReport(WrappingPDF):
+    def header(self):
+        # Header with a title and styled text
+        self.set_font('Arial', 'B', 16)
+        self.set_text_color(0, 0, 128)
+        self.cell(0, 10, "Medical Device Report", border=0, ln=True, align='C')
+        self.ln(5)
+
+    def footer(self):
+        # Footer with page numbers
+        self.set_y(-15)
+        self.set_font('Arial', 'I', 8)
+        self.set_text_color(128, 128, 128)
+        self.cell(0, 10, f'Page {self.page_no()}', align='C')
+
+    def add_section(self, title, section):
+        # Section title with a light blue background
+        self.set_font("Arial", "B", 14)
+        self.set_fill_color(200, 220, 255)
+        self.cell(0, 10, to_latin1(title), ln=True, fill=True)
+        self.ln(2)
+        self.set_font("Arial", "", 12)
+        # Add section content
+        for key, value in section.model_dump().items():
+            label = key.replace('_', ' ').capitalize()
+            if isinstance(value, list):
+                self.cell(0, 8, f"{label}:", ln=True)
+                for item in value:
+                    self.write_wrapped(f"- {item}", 8, indent=self.l_margin + 10)  # indent bullet points
+            else:
+                self.write_wrapped(f"{label}: {value}", 8)
+        self.ln(5)
+        # Draw a horizontal line separator
+        self.set_draw_color(0, 0, 0)
+        self.line(self.l_margin, self.get_y(), self.w - self.r_margin, self.get_y())
+        self.ln(5)
+
+def generate_pdf(report: MedicalDeviceReport, device_name: str) -> bytes:
+    pdf = PDFReport()
+    pdf.add_page()
+
+    # Device name header
+    pdf.set_font("Arial", "B", 14)
+    pdf.set_text_color(0, 0, 0)
+    pdf.cell(0, 10, to_latin1(f"Device Name: {device_name}"), ln=True)
+    pdf.ln(5)
+
+    # Add all report sections with enhanced styling
+    pdf.add_section("Primary Materials", report.primary_materials)
+    pdf.add_section("Mechanical Properties", report.mechanical_properties)
+    pdf.add_section("Degradation Profile", report.degradation_profile)
+    pdf.add_section("Dimension and Structural Integrity", report.dimension_integrity)
+    pdf.add_section("Performance Criteria", report.performance_criteria)
+    pdf.add_section("Functional & Performance Characteristics", report.functional_and_performance_characteristics)
+
+    return pdf.output_bytes()
+
+# ---------------- Text Report PDF ---------------- #
+
+class StyledPDF(WrappingPDF):
+    def header(self):
+        # Draw a colored header on each page (except cover)
+        if self.page_no() > 1:
+            self.set_fill_color(0, 102, 204)  # A modern blue shade
+            self.rect(0, 0, self.w, 20, style="F")
+            self.set_y(5)
+            self.set_font("Helvetica", "B", 12)
+            self.set_text_color(255, 255, 255)
+            self.cell(0, 10, "Medical Device Technical Report", border=0, ln=True, align="C")
+
+    def footer(self):
+        # Add a footer with page numbers on each page (except cover)
+        if self.page_no() > 1:
+            self.set_y(-15)
+            self.set_font("Helvetica", "I", 8)
+            self.set_text_color(128, 128, 128)
+            self.cell(0, 10, f"Page {self.page_no()-1}", 0, 0, "C")
+
+    def add_cover_page(self, device_name):
+        # Cover page with a stylish layout
+        self.add_page()
+        self.set_font("Helvetica", "B", 28)
+        self.set_text_color(0, 102, 204)
+        self.cell(0, 60, "", ln=True)  # Vertical spacing
+        self.cell(0, 20, "Medical Device Technical Report", ln=True, align="C")
+        self.ln(10)
+        self.set_font("Helvetica", "", 20)
+        self.set_text_color(64, 64, 64)
+        self.cell(0, 20, to_latin1(f"Device: {device_name}"), ln=True, align="C")
+        self.ln(20)
+        self.set_font("Helvetica", "I", 12)
+        self.cell(0, 20, "Generated by Medical Device Reporter", ln=True, align="C")
+
+        # Add date
+        today = datetime.now().strftime("%B %d, %Y")
+        self.ln(10)
+        self.set_font("Helvetica", "", 10)
+        self.cell(0, 10, f"Date: {today}", ln=True, align="C")
+
+    def section_title(self, title):
+        # Section header with background fill for style
+        self.set_font("Helvetica", "B", 14)
+        self.set_fill_color(230, 240, 255)  # light blue fill
+        self.set_text_color(0, 0, 0)
+        self.cell(0, 10, to_latin1(title), border=0, ln=True, fill=True)
+        self.ln(2)
+
+    def write_block(self, block):
+        if block.kind == "blank":
+            self.ln(2)
+        elif block.kind == "bullet":
+            # Latin-1 compatible bullet markers per nesting level
+            marker = "*-+"[block.level]
+            self.write_runs([Run(f"{marker} ")] + block.runs, 6, indent=5 * (block.level + 1))
+        else:
+            self.write_runs(block.runs, 6, indent=5)
+
+def render_sections_pdf(sections: List[Section], device_name: str) -> bytes:
+    """Render a parsed report tree (see ``report_markdown``) as a styled PDF."""
+    pdf = StyledPDF()
+    pdf.set_auto_page_break(auto=True, margin=15)
+    pdf.add_cover_page(device_name)
+    pdf.add_page()
+
+    for section in sections:
+        if section.title:
+            pdf.section_title(section.title)
+        pdf.set_font("Helvetica", "", 10)
+        for block in section.blocks:
+            pdf.write_block(block)
+        pdf.ln(3)
+
+    return pdf.output_bytes()
+
+def generate_pdf_from_text(text: str, device_name: str) -> bytes:
+    return render_sections_pdf(parse_report(text), device_name)
@@ -0,0 +1,228 @@
+import ast
+import json
+import logging
+import re
+import threading
+from typing import Dict, Tuple
+
+from langchain.prompts import ChatPromptTemplate
+from pydantic import BaseModel, ValidationError
+
+from report_model import MedicalDeviceReport, parser
+from report_sections import SECTION_SYSTEM_PROMPT, build_section_chain
+
+logger = logging.getLogger(__name__)
+
+TIERS = ("direct", "local", "llm", "failed")
+
+REPAIR_SYSTEM_PROMPT = SECTION_SYSTEM_PROMPT + """
+Your previous answer for this section did not match the schema:
+
+{previous}
+
+Validation errors:
+{errors}
+
+Return a corrected version of this section only.
+"""
+
+repair_prompt = ChatPromptTemplate.from_messages([
+    ("system", REPAIR_SYSTEM_PROMPT),
+    ("human", "Device: {device_name}"),
+])
+
+
+class RepairMetrics:
+    """Thread-safe counters of which recovery tier produced each report."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counts = dict.fromkeys(TIERS, 0)
+        self.sections_reasked = 0
+
+    def record(self, tier, sections_reasked=0):
+        with self._lock:
+            self.counts[tier] += 1
+            self.sections_reasked += sections_reasked
+            total = sum(self.counts.values())
+        logger.info("Report recovery tier: %s (%s, total=%d)", tier, self.counts, total)
+
+    def snapshot(self) -> Dict:
+        """Return the counts plus the share of reports each tier handled."""
+        with self._lock:
+            counts = dict(self.counts)
+            sections_reasked = self.sections_reasked
+        total = sum(counts.values())
+        rates = {tier: (count / total if total else 0.0) for tier, count in counts.items()}
+        return {"counts": counts, "rates": rates, "total": total, "sections_reasked": sections_reasked}
+
+
+repair_metrics = RepairMetrics()
+
+
+# ---------------- Tier 1: local fixes ---------------- #
+
+def _normalize_key(key):
+    key = key.replace("&", " and ")
+    return re.sub(r"[^a-z0-9]", "", key.lower())
+
+
+def _key_map(model):
+    # Normalized alias/field name -> the key pydantic expects when validating.
+    mapping = {}
+    for name, field in model.model_fields.items():
+        target = field.alias or name
+        mapping[_normalize_key(name)] = target
+        if field.alias:
+            mapping[_normalize_key(field.alias)] = target
+    return mapping
+
+
+_REPORT_KEYS = _key_map(MedicalDeviceReport)
+_SECTION_KEYS = {
+    field.alias or name: (field.annotation, _key_map(field.annotation))
+    for name, field in MedicalDeviceReport.model_fields.items()
+}
+
+
+def strip_wrappers(text):
+    """Drop the ``<think>`` block and Markdown fences and cut to the outermost JSON object."""
+    text = re.sub(r"<think>.*?</think>", "", text, flags=re.DOTALL)
+    if "</think>" in text:
+        # Opening tag missing or truncated; keep what follows the last close tag.
+        text = text.rsplit("</think>", 1)[1]
+    text = re.sub(r"```(?:json)?", "", text)
+    start, end = text.find("{"), text.rfind("}")
+    if start != -1 and end > start:
+        text = text[start:end + 1]
+    return text.strip()
+
+
+def lenient_json_loads(text):
+    """Parse JSON that may carry trailing commas, smart quotes, comments or Python literals."""
+    try:
+        return json.loads(text)
+    except ValueError:
+        pass
+    fixed = (
+        text.replace("“", '"').replace("”", '"')
+        .replace("‘", "'").replace("’", "'")
+    )
+    fixed = re.sub(r"^\s*//.*$", "", fixed, flags=re.MULTILINE)
+    fixed = re.sub(r",\s*([}\]])", r"\1", fixed)
+    try:
+        return json.loads(fixed)
+    except ValueError:
+        pass
+    # Single-quoted keys/strings: fall back to Python literal syntax.
+    python_literal = re.sub(r"\btrue\b", "True", fixed)
+    python_literal = re.sub(r"\bfalse\b", "False", python_literal)
+    python_literal = re.sub(r"\bnull\b", "None", python_literal)
+    try:
+        value = ast.literal_eval(python_literal)
+    except (ValueError, SyntaxError) as e:
+        raise ValueError(f"Could not parse JSON leniently: {e}") from e
+    if not isinstance(value, dict):
+        raise ValueError("Expected a JSON object")
+    return value
+
+
+def remap_keys(data):
+    """Rename report and section keys such as ``"primary_materials"`` to the schema's aliases."""
+    if not isinstance(data, dict):
+        raise ValueError("Expected a JSON object")
+    remapped = {}
+    for key, value in data.items():
+        target = _REPORT_KEYS.get(_normalize_key(str(key)), key)
+        if target in _SECTION_KEYS and isinstance(value, dict):
+            _, section_keys = _SECTION_KEYS[target]
+            value = {section_keys.get(_normalize_key(str(k)), k): v for k, v in value.items()}
+        remapped[target] = value
+    return remapped
+
+
+def _invalid_sections(error: ValidationError):
+    """Map each report alias that failed validation to its error messages."""
+    invalid = {}
+    for err in error.errors():
+        alias = err["loc"][0] if err["loc"] else None
+        if alias not in _SECTION_KEYS:
+            continue
+        location = ".".join(str(part) for part in err["loc"][1:]) or "(section)"
+        invalid.setdefault(alias, []).append(f"{location}: {err['msg']}")
+    return invalid
+
+
+# ---------------- Tier 2: re-ask only the invalid sections ---------------- #
+
+def reask_sections(llm, device_name, data, invalid) -> Dict[str, BaseModel]:
+    """Ask the model again for the sections in ``invalid``, including their validation errors."""
+    fields = {}
+    for name, field in MedicalDeviceReport.model_fields.items():
+        if field.alias in invalid:
+            fields[name] = field.alias
+    partials = {
+        name: {
+            "previous": json.dumps(data.get(alias), indent=2, default=str),
+            "errors": "\n".join(f"- {message}" for message in invalid[alias]),
+        }
+        for name, alias in fields.items()
+    }
+    chain = build_section_chain(llm, list(fields), prompt=repair_prompt, partials=partials)
+    results = chain.invoke({"device_name": device_name})
+
+    repaired = {}
+    for name, result in results.items():
+        if result["parsed"] is None or result["parsing_error"] is not None:
+            raise ValueError(f"Re-asked section {name} is still invalid: {result['parsing_error']}")
+        repaired[fields[name]] = result["parsed"]
+    return repaired
+
+
+def parse_with_repair(content, llm=None, device_name=None) -> Tuple[MedicalDeviceReport, str]:
+    """Parse a model reply into a MedicalDeviceReport, escalating through recovery tiers.
+
+    1. ``direct``: ``PydanticOutputParser.parse`` on the reply as-is.
+    2. ``local``: strip ``<think>``/fences, lenient JSON, alias remapping. No LLM call.
+    3. ``llm``: re-ask the model for the invalid sections only (needs ``llm``).
+
+    Returns the report and the name of the tier that produced it. The
+    outcome is recorded in ``repair_metrics``; the last error is re-raised
+    when every tier fails.
+    """
+    try:
+        report = parser.parse(content)
+        repair_metrics.record("direct")
+        return report, "direct"
+    except Exception as e:
+        last_error = e
+
+    data = None
+    try:
+        data = remap_keys(lenient_json_loads(strip_wrappers(content)))
+        report = MedicalDeviceReport.model_validate(data)
+        repair_metrics.record("local")
+        return report, "local"
+    except ValidationError as e:
+        last_error = e
+        invalid = _invalid_sections(e) or None
+    except ValueError as e:
+        last_error = e
+        data = {}
+        invalid = None
+
+    if llm is not None and device_name:
+        if invalid is None:
+            # Nothing usable locally: every section has to be re-asked.
+            invalid = {field.alias: ["section missing or unparseable"] for field in MedicalDeviceReport.model_fields.values()}
+        try:
+            data = dict(data)
+            data.update(reask_sections(llm, device_name, data, invalid))
+            report = MedicalDeviceReport.model_validate(data)
+            repair_metrics.record("llm", sections_reasked=len(invalid))
+            return report, "llm"
+        except Exception as e:
+            last_error = e
+
+    repair_metrics.record("failed")
+    raise last_error
@@ -0,0 +1,111 @@
+from typing import Dict, Tuple
+
+from langchain.prompts import ChatPromptTemplate
+from langchain.schema.runnable import RunnableLambda, RunnableParallel
+
+from llm_cache import cache_session
+from report_model import MedicalDeviceReport, SECTIONS
+
+SECTION_SYSTEM_PROMPT = """
+You are a regulatory documentation assistant. Fill in only the "{section}" section
+of a technical report for the medical device below.
+
+- Use real ASTM/ISO/FDA standards where possible.
+- Include approximate or typical ranges (e.g., 860-1000 MPa) where applicable.
+- Do NOT hallucinate or fill in unknown data.
+"""
+
+section_prompt = ChatPromptTemplate.from_messages([
+    ("system", SECTION_SYSTEM_PROMPT),
+    ("human", "Device: {device_name}"),
+])
+
+
+def _failed_call(inputs):
+    # Fallback branch: report the exception instead of failing the whole parallel run.
+    return {"raw": None, "parsed": None, "parsing_error": inputs["error"]}
+
+
+def build_section_chain(llm, fields=None, prompt=section_prompt, partials=None):
+    """Build a RunnableParallel with one structured-output call per report section.
+
+    Every branch returns the ``include_raw`` dict of ``with_structured_output``,
+    so validation failures and token usage can be inspected per section. Request
+    errors are turned into a ``parsing_error`` by a fallback, which keeps one bad
+    section from discarding the others.
+
+    ``partials`` optionally maps a field name to extra prompt variables that
+    only that section's branch receives. ``llm`` may also be a dict from
+    field name to the model for that section.
+    """
+    branches = {}
+    for title, field in SECTIONS:
+        if fields is not None and field not in fields:
+            continue
+        section_model = MedicalDeviceReport.model_fields[field].annotation
+        field_llm = llm[field] if isinstance(llm, dict) else llm
+        structured_llm = field_llm.with_structured_output(section_model, include_raw=True)
+        chain = (
+            prompt.partial(section=title, **(partials or {}).get(field, {}))
+            | structured_llm
+        ).with_fallbacks([RunnableLambda(_failed_call)], exception_key="error")
+        branches[field] = chain
+    return RunnableParallel(branches)
+
+
+def add_usage(usage, message):
+    """Accumulate the token usage reported on an AIMessage into ``usage``."""
+    metadata = getattr(message, "usage_metadata", None) or {}
+    for key in ("input_tokens", "output_tokens", "total_tokens"):
+        usage[key] = usage.get(key, 0) + metadata.get(key, 0)
+    return usage
+
+
+def generate_report_parallel(llm, device_name, max_retries=2) -> Tuple[MedicalDeviceReport, Dict]:
+    """Generate every section concurrently and merge them into a MedicalDeviceReport.
+
+    Sections whose output fails validation are re-requested on their own, up to
+    ``max_retries`` extra rounds; sections that already validated are kept.
+    A failed section's reply is dropped from the response cache and retries
+    skip the cache lookup, so a retry really asks the model again.
+
+    Returns:
+        The merged report and a stats dict with token usage, the number of
+        model calls, and the sections that needed a retry.
+    """
+    sections = {}
+    errors = {}
+    usage = {}
+    stats = {"usage": usage, "calls": 0, "retried": []}
+    pending = [field for _, field in SECTIONS]
+
+    for attempt in range(max_retries + 1):
+        sessions = {field: cache_session(llm, refresh=attempt > 0) for field in pending}
+        section_llms = {field: section_llm for field, (section_llm, _) in sessions.items()}
+        results = build_section_chain(section_llms, pending).invoke({"device_name": device_name})
+        stats["calls"] += len(pending)
+        for field, result in results.items():
+            if result["raw"] is not None:
+                add_usage(usage, result["raw"])
+            if result["parsed"] is not None and result["parsing_error"] is None:
+                sections[field] = result["parsed"]
+                errors.pop(field, None)
+            else:
+                errors[field] = result["parsing_error"]
+                session = sessions[field][1]
+                if session is not None:
+                    session.discard()
+        pending = [field for field in pending if field not in sections]
+        if not pending or attempt == max_retries:
+            break
+        stats["retried"].extend(field for field in pending if field not in stats["retried"])
+
+    if pending:
+        details = "; ".join(f"{field}: {errors.get(field)}" for field in pending)
+        raise ValueError(f"Sections failed validation after {max_retries} retries: {details}")
+
+    report = MedicalDeviceReport.model_validate({
+        MedicalDeviceReport.model_fields[field].alias: section
+        for field, section in sections.items()
+    })
+    return report, stats
@@ -0,0 +1,159 @@
+import json
+from typing import Dict, List, Optional, Tuple, Type
+
+from pydantic import BaseModel, ValidationError
+
+
+class SectionStreamParser:
+    """Incrementally scan a streamed JSON report and emit each section as it closes.
+
+    The model's reply is fed in chunk by chunk. Anything before the first
+    ``{`` (a ``<think>`` block, a Markdown fence) is skipped. Once a top-level
+    value has been fully received it is decoded and validated against the
+    matching sub-model of ``report_model``, so the UI can render that section
+    long before the rest of the document arrives.
+
+    Each call to :meth:`feed` scans only the characters it has not seen yet,
+    so the total work is linear in the length of the response.
+    """
+
+    def __init__(self, report_model: Type[BaseModel]):
+        self.report_model = report_model
+        # Accept both the alias the prompt asks for and the Python field name.
+        self._fields: Dict[str, str] = {}
+        for name, field in report_model.model_fields.items():
+            self._fields[name] = name
+            if field.alias:
+                self._fields[field.alias] = name
+
+        self.sections: Dict[str, BaseModel] = {}
+        self.errors: Dict[str, Exception] = {}
+        self.done = False
+
+        self._raw = ""
+        self._start: Optional[int] = None
+        # Where _find_start resumes, and whether it is inside / past a leading <think> block.
+        self._scan = 0
+        self._in_think = False
+        self._after_think = False
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._expect_key = False
+        self._key_start: Optional[int] = None
+        self._key: Optional[str] = None
+        self._value_start: Optional[int] = None
+
+    @property
+    def started(self) -> bool:
+        """True once the opening brace of the JSON document has arrived."""
+        return self._start is not None
+
+    @property
+    def text(self) -> str:
+        """The JSON received so far, without any leading reasoning or fences."""
+        if self._start is None:
+            return ""
+        return self._raw[self._start:self._pos]
+
+    def feed(self, chunk: str) -> List[Tuple[str, BaseModel]]:
+        """Consume the next chunk and return the ``(field_name, section)`` pairs it completed."""
+        self._raw += chunk
+        if self.done:
+            return []
+        if self._start is None:
+            self._start = self._find_start()
+            if self._start is None:
+                return []
+            self._pos = self._start
+
+        completed = []
+        raw = self._raw
+        for i in range(self._pos, len(raw)):
+            ch = raw[i]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                    if self._key_start is not None:
+                        self._key = json.loads(raw[self._key_start:i + 1])
+                        self._key_start = None
+                continue
+
+            if ch == '"':
+                self._in_string = True
+                if self._depth == 1 and self._expect_key:
+                    self._key_start = i
+                    self._expect_key = False
+                elif self._depth == 1 and self._value_start is None:
+                    self._value_start = i
+            elif ch in "{[":
+                if self._depth == 1 and self._value_start is None:
+                    self._value_start = i
+                self._depth += 1
+                if self._depth == 1:
+                    self._expect_key = True
+            elif ch in "}]":
+                self._depth -= 1
+                if self._depth == 1 and self._value_start is not None:
+                    completed.extend(self._close_value(raw[self._value_start:i + 1]))
+                elif self._depth == 0:
+                    if self._value_start is not None:
+                        completed.extend(self._close_value(raw[self._value_start:i]))
+                    self.done = True
+                    self._pos = i + 1
+                    return completed
+            elif self._depth == 1:
+                if ch == ",":
+                    if self._value_start is not None:
+                        completed.extend(self._close_value(raw[self._value_start:i]))
+                    self._expect_key = True
+                elif ch == ":":
+                    pass
+                elif not ch.isspace() and self._value_start is None and self._key is not None:
+                    # Start of a bare literal (number, true/false/null).
+                    self._value_start = i
+
+        self._pos = len(raw)
+        return completed
+
+    def _find_start(self) -> Optional[int]:
+        """Index of the document's opening brace, searching only text not scanned before."""
+        raw = self._raw
+        if self._in_think:
+            think_close = raw.find("</think>", self._scan)
+            if think_close == -1:
+                # The closing tag may be cut across chunks; keep its possible start.
+                self._scan = max(self._scan, len(raw) - len("</think>") + 1)
+                return None
+            self._in_think, self._after_think = False, True
+            self._scan = think_close + len("</think>")
+        brace = raw.find("{", self._scan)
+        if not self._after_think:
+            think_open = raw.find("<think>", self._scan)
+            if think_open != -1 and (brace == -1 or think_open < brace):
+                self._in_think = True
+                self._scan = think_open + len("<think>")
+                return self._find_start()
+        if brace == -1:
+            self._scan = len(raw) if self._after_think else max(self._scan, len(raw) - len("<think>") + 1)
+            return None
+        return brace
+
+    def _close_value(self, value_text: str) -> List[Tuple[str, BaseModel]]:
+        key, self._key, self._value_start = self._key, None, None
+        field_name = self._fields.get(key) if key is not None else None
+        if field_name is None:
+            return []
+        section_model = self.report_model.model_fields[field_name].annotation
+        try:
+            section = section_model.model_validate(json.loads(value_text))
+        except (ValueError, ValidationError) as e:
+            self.errors[field_name] = e
+            return []
+        self.sections[field_name] = section
+        return [(field_name, section)]
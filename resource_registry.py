@@ -0,0 +1,86 @@
+"""Process-wide registry for the expensive objects of the Streamlit project apps.
+
+Usage:
+    from resource_registry import get_chat_model, get_loop_service, registry
+    llm = get_chat_model("llama-3.1-8b-instant")
+    result = get_loop_service().run(llm.ainvoke("Hello"))
+    generator = registry.get("blog_post_generator", BlogPostGenerator)
+    registry.total_warmup_seconds()
+
+The projects reach this module through their ``resources.py``, which puts
+the repository root on ``sys.path`` and adds the getters only that app
+needs. The registry is the only cache layer for these objects; the apps do
+not wrap them in ``st.cache_resource`` too.
+"""
+import threading
+import time
+
+import httpx
+from langchain_groq import ChatGroq
+
+from loop_service import LoopService
+
+
+class ResourceRegistry:
+    """Process-wide store for expensive objects: model clients, HTTP pools, compiled chains.
+
+    Each resource is built once by its factory on first use and shared by
+    every Streamlit session afterwards. Build times are kept so the app can
+    show what warm-up cost.
+    """
+
+    def __init__(self):
+        # Re-entrant: factories may fetch other resources (e.g. the HTTP pool).
+        self._lock = threading.RLock()
+        self._resources = {}
+        self.warmup_seconds = {}
+
+    def get(self, name, factory):
+        resource = self._resources.get(name)
+        if resource is not None:
+            return resource
+        with self._lock:
+            # Another thread may have built it while we waited for the lock.
+            if name not in self._resources:
+                start = time.perf_counter()
+                self._resources[name] = factory()
+                self.warmup_seconds[name] = time.perf_counter() - start
+            return self._resources[name]
+
+    def total_warmup_seconds(self):
+        return sum(self.warmup_seconds.values())
+
+
+registry = ResourceRegistry()
+
+
+def get_http_client():
+    """Shared keep-alive connection pool for the synchronous Groq client."""
+    return registry.get("http_client", lambda: httpx.Client(
+        limits=httpx.Limits(max_connections=20, max_keepalive_connections=10, keepalive_expiry=60),
+        timeout=httpx.Timeout(60.0, connect=10.0),
+    ))
+
+
+def get_async_http_client():
+    """Shared keep-alive pool for the async Groq client; only used on :func:`get_loop_service`."""
+    return registry.get("async_http_client", lambda: httpx.AsyncClient(
+        limits=httpx.Limits(max_connections=20, max_keepalive_connections=10, keepalive_expiry=60),
+        timeout=httpx.Timeout(60.0, connect=10.0),
+    ))
+
+
+def get_chat_model(model):
+    """Return the process-wide ChatGroq client for ``model``."""
+    return registry.get(f"chat:{model}", lambda: ChatGroq(
+        model=model, http_client=get_http_client(), http_async_client=get_async_http_client()
+    ))
+
+
+def get_loop_service():
+    """Return the process-wide background event loop that runs all async generation.
+
+    The async Groq client pools connections per event loop, so it must only
+    be used from this one loop rather than a fresh ``asyncio.run`` per click.
+    """
+    return registry.get("loop_service", LoopService)
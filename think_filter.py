@@ -0,0 +1,214 @@
+"""Streaming removal of deepseek-r1 ``<think>`` blocks.
+
+``ThinkFilter`` drops the reasoning trace while the reply streams in, so
+callers never hold it in memory and can start rendering the answer as soon
+as ``</think>`` arrives. It also times the two phases separately (reasoning
+vs answer) and can enforce an opt-in reasoning budget.
+
+The budget is off unless ``REASONING_TOKEN_BUDGET`` is set to a positive
+number of streamed chunks (one chunk is about one token for Groq). When it
+runs out, :func:`stream_answer` closes the stream and asks the model to
+answer right away: the reasoning so far is closed with ``</think>`` and sent
+back as an assistant prefill. Use ``Benchmarks/bench_think_cap.py`` to check
+what a given budget does to report quality before enabling it.
+"""
+import os
+import time
+from typing import Iterator, Optional
+
+from langchain_core.messages import AIMessage
+
+from llm_cache import stream_with_cache
+
+THINK_OPEN = "<think>"
+THINK_CLOSE = "</think>"
+
+# Opt-in cap on reasoning chunks; 0 disables it.
+DEFAULT_REASONING_BUDGET = int(os.getenv("REASONING_TOKEN_BUDGET", "0"))
+
+
+def _partial_tag(text, tag):
+    """Length of the longest suffix of ``text`` that is a proper prefix of ``tag``."""
+    for size in range(min(len(tag) - 1, len(text)), 0, -1):
+        if text.endswith(tag[:size]):
+            return size
+    return 0
+
+
+class ThinkFilter:
+    """Incrementally drop ``<think>...</think>`` blocks from a streamed reply.
+
+    :meth:`feed` takes each chunk and returns the answer text it contained.
+    A tag split across chunks is held back until the next chunk decides it.
+    Leading whitespace of the answer is dropped, like the ``.strip()`` after
+    the old regex; callers strip the end.
+
+    Reasoning text is only kept when a budget is set, since the budget
+    continuation needs it for the prefill.
+    """
+
+    def __init__(self, budget_tokens: Optional[int] = None):
+        self.budget_tokens = DEFAULT_REASONING_BUDGET if budget_tokens is None else budget_tokens
+        self.in_reasoning = False
+        self.capped = False
+        self.reasoning_tokens = 0
+        self.answer_tokens = 0
+        self.reasoning_chars = 0
+        self.answer_chars = 0
+        self._reasoning = [] if self.budget_tokens else None
+        self._pending = ""
+        self._answer_started = False
+        self.start = time.perf_counter()
+        self.first_chunk = None
+        self.reasoning_start = None
+        self.reasoning_end = None
+        self.first_answer = None
+        self.end = None
+
+    @property
+    def exceeded(self) -> bool:
+        """True while reasoning has used up the budget (always False without one)."""
+        return bool(self.budget_tokens) and self.in_reasoning and self.reasoning_tokens >= self.budget_tokens
+
+    @property
+    def reasoning(self) -> str:
+        """The reasoning received so far; empty unless a budget is set."""
+        return "".join(self._reasoning or [])
+
+    def feed(self, chunk: str) -> str:
+        """Consume the next chunk and return the answer text in it."""
+        now = time.perf_counter()
+        if self.first_chunk is None:
+            self.first_chunk = now
+        text, self._pending = self._pending + chunk, ""
+        answer, reasoned = [], False
+        while text:
+            tag = THINK_CLOSE if self.in_reasoning else THINK_OPEN
+            index = text.find(tag)
+            if index == -1:
+                keep = _partial_tag(text, tag)
+                body, self._pending = text[:len(text) - keep], text[len(text) - keep:]
+            else:
+                body = text[:index]
+            if self.in_reasoning:
+                reasoned = reasoned or bool(body)
+                self.reasoning_chars += len(body)
+                if self._reasoning is not None:
+                    self._reasoning.append(body)
+            else:
+                answer.append(body)
+            if index == -1:
+                break
+            text = text[index + len(tag):]
+            self._toggle(now)
+
+        if reasoned:
+            self.reasoning_tokens += 1
+        return self._answer("".join(answer), now)
+
+    def cap(self):
+        """Stop the reasoning phase early: later chunks are treated as answer."""
+        if self.in_reasoning:
+            self.capped = True
+            self._pending = ""
+            self._toggle(time.perf_counter())
+
+    def close(self) -> str:
+        """Flush a held-back partial tag (it was answer text after all) and stop the clock."""
+        self.end = time.perf_counter()
+        text, self._pending = self._pending, ""
+        if self.in_reasoning:
+            return ""
+        return self._answer(text, self.end)
+
+    def _toggle(self, now):
+        self.in_reasoning = not self.in_reasoning
+        if self.in_reasoning:
+            self.reasoning_start = self.reasoning_start or now
+        else:
+            self.reasoning_end = now
+
+    def _answer(self, text, now):
+        if not self._answer_started:
+            text = text.lstrip()
+            if not text:
+                return ""
+            self._answer_started = True
+            self.first_answer = now
+        if text:
+            self.answer_tokens += 1
+            self.answer_chars += len(text)
+        return text
+
+    def stats(self):
+        """Phase timings in seconds from the filter's creation, plus chunk and character counts."""
+        def since(mark, origin=None):
+            origin = self.start if origin is None else origin
+            return round(mark - origin, 3) if mark is not None and origin is not None else None
+
+        end = self.end or time.perf_counter()
+        return {
+            "ttft_s": since(self.first_chunk),
+            "reasoning_s": since(self.reasoning_end or (end if self.in_reasoning else None), self.reasoning_start),
+            "answer_s": since(end, self.first_answer),
+            "total_s": since(end),
+            "reasoning_tokens": self.reasoning_tokens,
+            "answer_tokens": self.answer_tokens,
+            "reasoning_chars": self.reasoning_chars,
+            "answer_chars": self.answer_chars,
+            "budget_tokens": self.budget_tokens,
+            "capped": self.capped,
+        }
+
+
+def format_think_stats(stats):
+    """One-line summary of :meth:`ThinkFilter.stats` for the apps."""
+    line = (
+        f"Reasoning {stats['reasoning_s'] or 0:.1f}s ({stats['reasoning_tokens']} tokens), "
+        f"answer {stats['answer_s'] or 0:.1f}s ({stats['answer_tokens']} tokens)"
+    )
+    if stats["capped"]:
+        line += f" · reasoning capped at {stats['budget_tokens']} tokens"
+    return line
+
+
+def strip_think(text: str) -> str:
+    """Remove the ``<think>`` block(s) from a finished reply.
+
+    Unlike the old ``<think>.*?</think>`` regex, an unclosed block (a reply
+    cut off mid-reasoning) leaves no answer rather than the raw reasoning.
+    """
+    think_filter = ThinkFilter(budget_tokens=0)
+    return (think_filter.feed(text) + think_filter.close()).strip()
+
+
+def stream_answer(llm, messages, think_filter: Optional[ThinkFilter] = None, config=None) -> Iterator[str]:
+    """Stream ``llm``'s answer to ``messages`` with the reasoning removed.
+
+    Goes through the response cache like :func:`llm_cache.stream_with_cache`.
+    If ``think_filter`` has a budget and the reasoning exceeds it, the stream
+    is closed and a second request continues from the truncated reasoning,
+    closed with ``</think>``, so the model writes the answer immediately.
+    """
+    think_filter = think_filter or ThinkFilter()
+    chunks = stream_with_cache(llm, messages, config=config)
+    try:
+        for chunk in chunks:
+            answer = think_filter.feed(chunk)
+            if answer:
+                yield answer
+            if think_filter.exceeded:
+                break
+    finally:
+        chunks.close()
+
+    if think_filter.exceeded:
+        prefill = AIMessage(content=f"{THINK_OPEN}{think_filter.reasoning}\n{THINK_CLOSE}\n\n")
+        think_filter.cap()
+        for chunk in stream_with_cache(llm, [*messages, prefill], config=config):
+            answer = think_filter.feed(chunk)
+            if answer:
+                yield answer
+    tail = think_filter.close()
+    if tail:
+        yield tail
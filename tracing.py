@@ -0,0 +1,413 @@
+"""Lightweight span tracing for the report apps, the project generators and their chains.
+
+Usage:
+    from tracing import get_tracer
+    tracer = get_tracer()
+    with tracer.span("report.generate", device=device_name):
+        response = llm.invoke(messages, config=tracer.config())
+        with tracer.span("report.parse"):
+            ...
+
+    python tracing.py summary .traces/spans.jsonl
+    python tracing.py collector --port 4318 --output .traces/collected.jsonl
+
+``tracer.span`` times a block of our own code. The callback handler from
+``tracer.config()`` turns every LangChain run inside it (chains, prompts,
+models, parsers) into a child span; model spans carry token usage and, when
+streamed, time to first token.
+
+Export is chosen with ``TRACE_EXPORT``: ``off`` (default), ``jsonl`` (one
+span per line in ``TRACE_JSONL_PATH``; once the file passes
+``TRACE_JSONL_MAX_BYTES`` it is rotated to ``<path>.1``, so at most two
+files are kept) or ``otlp`` (OTLP/HTTP JSON to ``TRACE_OTLP_ENDPOINT``,
+e.g. the stand-in collector above or a real OpenTelemetry collector).
+"""
+import contextvars
+import json
+import logging
+import os
+import secrets
+import statistics
+import sys
+import threading
+import time
+import urllib.request
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List, Optional
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_EXPORT = os.getenv("TRACE_EXPORT", "off")
+DEFAULT_JSONL_PATH = os.getenv("TRACE_JSONL_PATH", ".traces/spans.jsonl")
+DEFAULT_JSONL_MAX_BYTES = int(os.getenv("TRACE_JSONL_MAX_BYTES", 50 * 1024 * 1024))
+DEFAULT_OTLP_ENDPOINT = os.getenv("TRACE_OTLP_ENDPOINT", "http://localhost:4318/v1/traces")
+SERVICE_NAME = os.getenv("TRACE_SERVICE_NAME", "langchain-projects")
+
+_current_span = contextvars.ContextVar("current_span", default=None)
+
+
+@dataclass
+class Span:
+    name: str
+    trace_id: str
+    span_id: str
+    parent_id: Optional[str] = None
+    kind: str = "internal"
+    start: float = field(default_factory=time.time)
+    end: Optional[float] = None
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    status: str = "ok"
+    error: Optional[str] = None
+
+    @property
+    def duration_ms(self):
+        return None if self.end is None else (self.end - self.start) * 1000
+
+    def to_dict(self):
+        data = asdict(self)
+        data["duration_ms"] = self.duration_ms
+        return data
+
+# ---------------- Exporters ---------------- #
+
+class JsonlExporter:
+    """Append finished spans to a local JSONL file, rotating it to ``<path>.1`` past ``max_bytes``."""
+
+    def __init__(self, path=DEFAULT_JSONL_PATH, max_bytes=DEFAULT_JSONL_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+
+    def export(self, spans: List[Span]):
+        lines = "".join(json.dumps(span.to_dict(), default=str) + "\n" for span in spans)
+        with self._lock:
+            try:
+                size = os.path.getsize(self.path)
+            except OSError:
+                size = 0
+            if self.max_bytes and size and size + len(lines) > self.max_bytes:
+                os.replace(self.path, self.path + ".1")
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(lines)
+
+
+def to_otlp(spans: List[Span], service_name=SERVICE_NAME):
+    """Convert spans to the OTLP/HTTP JSON ``ExportTraceServiceRequest`` shape."""
+    def value(v):
+        if isinstance(v, bool):
+            return {"boolValue": v}
+        if isinstance(v, int):
+            return {"intValue": str(v)}
+        if isinstance(v, float):
+            return {"doubleValue": v}
+        return {"stringValue": str(v)}
+
+    otlp_spans = []
+    for span in spans:
+        otlp_spans.append({
+            "traceId": span.trace_id,
+            "spanId": span.span_id,
+            "parentSpanId": span.parent_id or "",
+            "name": span.name,
+            "kind": 3 if span.kind == "llm" else 1,  # CLIENT for model calls, INTERNAL otherwise
+            "startTimeUnixNano": str(int(span.start * 1e9)),
+            "endTimeUnixNano": str(int((span.end or span.start) * 1e9)),
+            "attributes": [{"key": k, "value": value(v)} for k, v in span.attributes.items()],
+            "status": {"code": 2, "message": span.error or ""} if span.status == "error" else {"code": 1},
+        })
+    return {"resourceSpans": [{
+        "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": service_name}}]},
+        "scopeSpans": [{"scope": {"name": "tracing"}, "spans": otlp_spans}],
+    }]}
+
+
+class OTLPHttpExporter:
+    """POST spans as OTLP/HTTP JSON. Failures are logged, never raised into the app."""
+
+    def __init__(self, endpoint=DEFAULT_OTLP_ENDPOINT, timeout=2.0):
+        self.endpoint = endpoint
+        self.timeout = timeout
+
+    def export(self, spans: List[Span]):
+        body = json.dumps(to_otlp(spans)).encode("utf-8")
+        request = urllib.request.Request(self.endpoint, data=body, headers={"Content-Type": "application/json"})
+        try:
+            urllib.request.urlopen(request, timeout=self.timeout).close()
+        except OSError as e:
+            logger.warning("Trace export to %s failed: %s", self.endpoint, e)
+
+
+def create_exporter(kind=DEFAULT_EXPORT):
+    if kind == "off":
+        return None
+    if kind == "otlp":
+        return OTLPHttpExporter()
+    if kind == "jsonl":
+        return JsonlExporter()
+    raise ValueError(f"Unknown TRACE_EXPORT {kind!r} (expected jsonl, otlp or off)")
+
+# ---------------- Tracer ---------------- #
+
+class Tracer:
+    """Creates spans and exports each finished trace in one batch.
+
+    Spans are buffered per trace and handed to the exporter when the root
+    span ends, so a request costs one file append or one HTTP POST.
+    """
+
+    def __init__(self, exporter=None):
+        self.exporter = exporter
+        self._lock = threading.Lock()
+        self._pending: Dict[str, List[Span]] = {}
+        self._open: Dict[str, int] = {}
+        self._handler = TracingCallbackHandler(self)
+
+    @property
+    def enabled(self):
+        return self.exporter is not None
+
+    def start_span(self, name, parent: Optional[Span] = None, kind="internal", **attributes):
+        parent = parent if parent is not None else _current_span.get()
+        span = Span(
+            name=name,
+            trace_id=parent.trace_id if parent else secrets.token_hex(16),
+            span_id=secrets.token_hex(8),
+            parent_id=parent.span_id if parent else None,
+            kind=kind,
+            attributes=dict(attributes),
+        )
+        with self._lock:
+            self._open[span.trace_id] = self._open.get(span.trace_id, 0) + 1
+        return span
+
+    def end_span(self, span, error=None):
+        span.end = time.time()
+        if error is not None:
+            span.status = "error"
+            span.error = f"{type(error).__name__}: {error}"
+        with self._lock:
+            self._pending.setdefault(span.trace_id, []).append(span)
+            self._open[span.trace_id] -= 1
+            finished = self._open[span.trace_id] == 0
+            if finished:
+                del self._open[span.trace_id]
+                spans = self._pending.pop(span.trace_id)
+        if finished and self.exporter is not None:
+            self.exporter.export(spans)
+
+    @contextmanager
+    def span(self, name, **attributes):
+        """Time the enclosed block as a span; LangChain runs inside it become children."""
+        span = self.start_span(name, **attributes)
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            _current_span.reset(token)
+            self.end_span(span, error=e)
+            raise
+        _current_span.reset(token)
+        self.end_span(span)
+
+    def config(self, **config):
+        """A RunnableConfig with this tracer's callback handler attached (no-op when disabled)."""
+        if self.enabled:
+            config["callbacks"] = list(config.get("callbacks") or []) + [self._handler]
+        return config
+
+    def config_llm(self, llm):
+        """A copy of ``llm`` with the callback handler attached, for helpers that call the model themselves."""
+        if not self.enabled:
+            return llm
+        return llm.model_copy(update={"callbacks": list(llm.callbacks or []) + [self._handler]})
+
+# ---------------- LangChain callbacks ---------------- #
+
+def _run_name(serialized, kwargs, fallback):
+    if kwargs.get("name"):
+        return kwargs["name"]
+    if serialized:
+        if serialized.get("name"):
+            return serialized["name"]
+        if serialized.get("id"):
+            return serialized["id"][-1]
+    return fallback
+
+
+class TracingCallbackHandler(BaseCallbackHandler):
+    """Turns LangChain chain/model runs into spans under the tracer's current span."""
+
+    # Run in the caller's thread/task so the active span context is visible.
+    run_inline = True
+
+    def __init__(self, tracer):
+        self.tracer = tracer
+        self._spans: Dict[Any, Span] = {}
+        self._lock = threading.Lock()
+
+    def _start(self, run_id, parent_run_id, name, kind, **attributes):
+        with self._lock:
+            parent = self._spans.get(parent_run_id)
+        # Runs without a traced parent attach to whatever span is active in this context.
+        span = self.tracer.start_span(name, parent=parent, kind=kind, **attributes)
+        with self._lock:
+            self._spans[run_id] = span
+        return span
+
+    def _end(self, run_id, error=None):
+        with self._lock:
+            span = self._spans.pop(run_id, None)
+        if span is not None:
+            self.tracer.end_span(span, error=error)
+        return span
+
+    def on_chain_start(self, serialized, inputs, *, run_id, parent_run_id=None, **kwargs):
+        self._start(run_id, parent_run_id, _run_name(serialized, kwargs, "chain"), "chain")
+
+    def on_chain_end(self, outputs, *, run_id, **kwargs):
+        self._end(run_id)
+
+    def on_chain_error(self, error, *, run_id, **kwargs):
+        self._end(run_id, error)
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, parent_run_id=None, **kwargs):
+        model = (kwargs.get("invocation_params") or {}).get("model_name") or (kwargs.get("metadata") or {}).get("ls_model_name")
+        span = self._start(run_id, parent_run_id, _run_name(serialized, kwargs, "chat_model"), "llm")
+        if model:
+            span.attributes["llm.model"] = model
+        span.attributes["llm.input_messages"] = sum(len(batch) for batch in messages)
+
+    def on_llm_start(self, serialized, prompts, *, run_id, parent_run_id=None, **kwargs):
+        self._start(run_id, parent_run_id, _run_name(serialized, kwargs, "llm"), "llm")
+
+    def on_llm_new_token(self, token, *, run_id, **kwargs):
+        with self._lock:
+            span = self._spans.get(run_id)
+        if span is not None and "llm.ttft_ms" not in span.attributes:
+            span.attributes["llm.ttft_ms"] = round((time.time() - span.start) * 1000, 1)
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        with self._lock:
+            span = self._spans.get(run_id)
+        if span is not None:
+            usage = {}
+            for generations in response.generations:
+                for generation in generations:
+                    metadata = getattr(getattr(generation, "message", None), "usage_metadata", None) or {}
+                    for key in ("input_tokens", "output_tokens", "total_tokens"):
+                        usage[key] = usage.get(key, 0) + metadata.get(key, 0)
+            if not any(usage.values()):
+                token_usage = (response.llm_output or {}).get("token_usage") or {}
+                usage = {
+                    "input_tokens": token_usage.get("prompt_tokens", 0),
+                    "output_tokens": token_usage.get("completion_tokens", 0),
+                    "total_tokens": token_usage.get("total_tokens", 0),
+                }
+            for key, count in usage.items():
+                span.attributes[f"llm.{key}"] = count
+        self._end(run_id)
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        self._end(run_id, error)
+
+
+_tracer = None
+_tracer_lock = threading.Lock()
+
+
+def get_tracer():
+    """The process-wide tracer configured from ``TRACE_EXPORT``."""
+    global _tracer
+    if _tracer is None:
+        with _tracer_lock:
+            if _tracer is None:
+                _tracer = Tracer(create_exporter())
+    return _tracer
+
+# ---------------- CLI: summary and collector stand-in ---------------- #
+
+def summarize(path):
+    """Per span name: count, p50/p95/max duration and mean time to first token."""
+    by_name: Dict[str, List[dict]] = {}
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                span = json.loads(line)
+            except ValueError:
+                continue
+            by_name.setdefault(span["name"], []).append(span)
+
+    print(f"{'span':<40} {'count':>6} {'p50 ms':>9} {'p95 ms':>9} {'max ms':>9} {'ttft ms':>9}")
+    for name, spans in sorted(by_name.items(), key=lambda item: -sum(s["duration_ms"] or 0 for s in item[1])):
+        durations = sorted(s["duration_ms"] or 0 for s in spans)
+        ttfts = [s["attributes"]["llm.ttft_ms"] for s in spans if "llm.ttft_ms" in s["attributes"]]
+        p95 = durations[min(len(durations) - 1, round(0.95 * (len(durations) - 1)))]
+        ttft = f"{statistics.mean(ttfts):9.1f}" if ttfts else f"{'-':>9}"
+        print(f"{name[:40]:<40} {len(spans):>6} {statistics.median(durations):>9.1f} {p95:>9.1f} {durations[-1]:>9.1f} {ttft}")
+
+
+def run_collector(port, output):
+    """Minimal OTLP/HTTP JSON receiver that writes each received span as one JSONL line."""
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    exporter = JsonlExporter(output)
+
+    class CollectorHandler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+            spans = []
+            for resource in body.get("resourceSpans", []):
+                for scope in resource.get("scopeSpans", []):
+                    for s in scope.get("spans", []):
+                        attributes = {a["key"]: next(iter(a["value"].values())) for a in s.get("attributes", [])}
+                        spans.append(Span(
+                            name=s["name"],
+                            trace_id=s["traceId"],
+                            span_id=s["spanId"],
+                            parent_id=s.get("parentSpanId") or None,
+                            kind="llm" if s.get("kind") == 3 else "internal",
+                            start=int(s["startTimeUnixNano"]) / 1e9,
+                            end=int(s["endTimeUnixNano"]) / 1e9,
+                            attributes=attributes,
+                            status="error" if s.get("status", {}).get("code") == 2 else "ok",
+                            error=s.get("status", {}).get("message") or None,
+                        ))
+            exporter.export(spans)
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.end_headers()
+            self.wfile.write(b"{}")
+
+        def log_message(self, format, *args):
+            pass
+
+    print(f"Collecting OTLP/HTTP JSON on http://localhost:{port}/v1/traces into {output}")
+    ThreadingHTTPServer(("", port), CollectorHandler).serve_forever()
+
+
+def main():
+    import argparse
+
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = arg_parser.add_subparsers(dest="command", required=True)
+    summary = commands.add_parser("summary", help="Aggregate a spans JSONL file")
+    summary.add_argument("path", nargs="?", default=DEFAULT_JSONL_PATH)
+    collector = commands.add_parser("collector", help="Run the OTLP/HTTP JSON collector stand-in")
+    collector.add_argument("--port", type=int, default=4318)
+    collector.add_argument("--output", default=".traces/collected.jsonl")
+    args = arg_parser.parse_args()
+
+    if args.command == "summary":
+        summarize(args.path)
+    else:
+        run_collector(args.port, args.output)
+
+
+if __name__ == "__main__":
+    sys.exit(main())